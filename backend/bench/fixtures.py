@@ -0,0 +1,206 @@
+"""Offline copies of the upstream pages the scrapers parse.
+
+A file placed in bench/fixtures/ under the fixture's name (for example a
+freshly recorded `olx_search.html`) replaces the generated version, so
+real captures can be swapped in without touching the benchmarks. The
+generated pages follow the markup our selectors target and are sized
+like the live pages.
+"""
+import json
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OLX_PAGE_SIZE = 40
+OLX_TOTAL_PAGES = 5
+PAKWHEELS_PAGE_SIZE = 25
+DARAZ_CATALOG_SIZE = 40
+
+_MODELS = ["Honda Civic", "Toyota Corolla", "Suzuki Mehran", "Honda City", "Toyota Yaris",
+           "Suzuki Alto", "Kia Sportage", "Hyundai Tucson", "Suzuki Cultus", "Toyota Fortuner"]
+_CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Multan"]
+
+
+def _filler(rng, size: int) -> str:
+    """Inline script/markup noise standing in for the site's JS bundles"""
+    chunk = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789{}();=,.") for _ in range(1024))
+    return "".join(f"<script>var _b{i}='{chunk}';</script>" for i in range(size // 1024))
+
+
+def _listing(rng, n: int):
+    model = rng.choice(_MODELS)
+    year = rng.randint(2005, 2024)
+    price = rng.randint(8, 120) * 50000
+    return {
+        "id": 1000000000 + n,
+        "title": f"{model} {year} {rng.choice(['Oriel', 'GLi', 'VX', 'Turbo', 'AGS'])}",
+        "price": price,
+        "city": rng.choice(_CITIES),
+        "slug": f"{model.lower().replace(' ', '-')}-{year}",
+    }
+
+
+def olx_search_html(page: int = 1) -> str:
+    rng = random.Random(page)
+    cards = []
+    for i in range(OLX_PAGE_SIZE):
+        item = _listing(rng, page * 1000 + i)
+        cards.append(
+            '<li aria-label="Listing"><article>'
+            f'<a href="/item/{item["slug"]}-iid-{item["id"]}">'
+            f'<div><img src="https://images.olx.com.pk/thumbnails/{item["id"]}-240x180.webp" alt=""></div>'
+            f'<div aria-label="Title"><h2>{item["title"]}</h2></div>'
+            f'<div aria-label="Price"><span>Rs {item["price"]:,}</span></div>'
+            f'<div aria-label="Location"><span>{item["city"]}</span></div>'
+            '</a></article></li>'
+        )
+    pages = "".join(f'<a href="/items/q-car?page={n}">{n}</a>' for n in range(1, OLX_TOTAL_PAGES + 1))
+    if page < OLX_TOTAL_PAGES:
+        pages += f'<a data-testid="pagination-forward" href="/items/q-car?page={page + 1}">Next</a>'
+    else:
+        pages += '<button data-testid="pagination-forward" disabled>Next</button>'
+    return (
+        "<!DOCTYPE html><html><head><title>Cars in Pakistan | OLX</title></head><body>"
+        f"<div id='root'><ul class='_1aad128c'>{''.join(cards)}</ul><nav>{pages}</nav></div>"
+        f"{_filler(rng, 250_000)}</body></html>"
+    )
+
+
+def olx_api_json(page: int = 0) -> str:
+    rng = random.Random(1000 + page)
+    data = []
+    for i in range(OLX_PAGE_SIZE):
+        item = _listing(rng, page * 1000 + i)
+        data.append({
+            "id": item["id"],
+            "title": item["title"],
+            "price": {"value": {"raw": item["price"], "display": f"Rs {item['price']:,}"}},
+            "url": f"/item/{item['slug']}-iid-{item['id']}",
+            "images": [{"url": f"https://images.olx.com.pk/thumbnails/{item['id']}-800x600.webp"}],
+            "locations_resolved": {"ADMIN_LEVEL_3_name": item["city"]},
+        })
+    return json.dumps({"data": data, "metadata": {"total_pages": OLX_TOTAL_PAGES}})
+
+
+def pakwheels_search_html(page: int = 1) -> str:
+    rng = random.Random(2000 + page)
+    cards = []
+    for i in range(PAKWHEELS_PAGE_SIZE):
+        item = _listing(rng, page * 1000 + i)
+        ld = {
+            "@context": "https://schema.org",
+            "@type": "Car",
+            "name": item["title"],
+            "image": f"https://cache1.pakwheels.com/ad_pictures/{item['id']}.jpg",
+            "offers": {
+                "@type": "Offer",
+                "price": item["price"] * 10,
+                "priceCurrency": "PKR",
+                "url": f"https://www.pakwheels.com/used-cars/{item['slug']}-for-sale-in-{item['city'].lower()}-{item['id']}",
+            },
+        }
+        cards.append(
+            '<li class="search-listing-card">'
+            f'<script type="application/ld+json">{json.dumps(ld)}</script>'
+            f'<div class="search-title"><a href="#"><h3>{item["title"]}</h3></a></div>'
+            f'<div class="price-details">PKR {item["price"] * 10 / 100000:.2f} lacs</div>'
+            "</li>"
+        )
+    return (
+        "<!DOCTYPE html><html><head><title>Used Cars for Sale | PakWheels</title></head><body>"
+        f"<ul class='list-unstyled search-results'>{''.join(cards)}</ul>"
+        f"{_filler(rng, 400_000)}</body></html>"
+    )
+
+
+def daraz_product_html() -> str:
+    rng = random.Random(3000)
+    ld = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "BreadcrumbList", "itemListElement": []},
+            {
+                "@type": "Product",
+                "name": "Wireless Bluetooth Earbuds with Charging Case",
+                "image": "https://static-01.daraz.pk/p/earbuds.jpg",
+                "brand": {"@type": "Brand", "name": "Generic"},
+                "offers": {"@type": "Offer", "price": "2499", "priceCurrency": "PKR"},
+            },
+        ],
+    }
+    meta = (
+        '<meta property="og:title" content="Wireless Bluetooth Earbuds">'
+        '<meta property="og:image" content="https://static-01.daraz.pk/p/earbuds.jpg">'
+        '<meta property="og:site_name" content="Daraz.pk">'
+    )
+    body = "".join(
+        f"<div class='pdp-block'><span>{rng.random()}</span><p>Spec line {i}</p></div>" for i in range(8000)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>Earbuds | Daraz.pk</title>{meta}</head><body>"
+        f"{body}{_filler(rng, 1_200_000)}"
+        f'<script type="application/ld+json">{json.dumps(ld)}</script></body></html>'
+    )
+
+
+def daraz_catalog_json() -> str:
+    rng = random.Random(4000)
+    items = [
+        {
+            "name": f"Phone Case Model {i}",
+            "price": str(rng.randint(300, 5000)),
+            "priceShow": f"Rs. {rng.randint(300, 5000):,}",
+            "itemUrl": f"//www.daraz.pk/products/phone-case-i{500000 + i}.html",
+            "image": f"https://static-01.daraz.pk/p/case-{i}.jpg",
+        }
+        for i in range(DARAZ_CATALOG_SIZE)
+    ]
+    return json.dumps({"mods": {"listItems": items}})
+
+
+def olx_challenge_html() -> str:
+    """Bot-challenge page OLX returns when it blocks a client (no listings)"""
+    with open(os.path.join(BACKEND_DIR, "debug_olx.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def listing_photo_jpg() -> bytes:
+    """Full-size listing photo like the ones on retailer CDNs (needs Pillow)"""
+    import io
+    from PIL import Image
+
+    rng = random.Random(5000)
+    image = Image.effect_noise((1600, 1200), 40).convert("RGB")
+    image.paste((rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)), (200, 200, 1400, 1000))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+BUILDERS = {
+    "olx_search.html": olx_search_html,
+    "olx_api.json": olx_api_json,
+    "pakwheels_search.html": pakwheels_search_html,
+    "daraz_product.html": daraz_product_html,
+    "daraz_catalog.json": daraz_catalog_json,
+    "olx_challenge.html": olx_challenge_html,
+    "listing_photo.jpg": listing_photo_jpg,
+}
+
+_cache = {}
+
+
+def load(name: str, *args):
+    """Recorded fixture from bench/fixtures/ if present, else generated"""
+    key = (name, args)
+    if key not in _cache:
+        path = os.path.join(FIXTURE_DIR, name)
+        if not args and os.path.exists(path):
+            binary = name.endswith(".jpg")
+            with open(path, "rb" if binary else "r", encoding=None if binary else "utf-8") as f:
+                _cache[key] = f.read()
+        else:
+            _cache[key] = BUILDERS[name](*args)
+    return _cache[key]
@@ -0,0 +1,163 @@
+"""In-memory stand-in for Redis, enough of it for the job queue.
+
+Speaks RESP2 over TCP and implements the commands lib.jobs sends (plus
+PING), so the Redis job backend and `python -m worker` processes can be
+exercised without a Redis server.
+
+    python -m bench.redis_stub --port 6390
+    SEEKLY_JOB_QUEUE=redis://127.0.0.1:6390/0 python -m worker
+"""
+import argparse
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(values) -> bytes:
+    if values is None:
+        return b"*-1\r\n"
+    return b"*%d\r\n" % len(values) + b"".join(_bulk(value) for value in values)
+
+
+class RedisStub:
+    def __init__(self):
+        self.strings = {}  # key -> (value, expires_at or None)
+        self.lists = {}
+        self.zsets = {}  # key -> {member: score}
+        self.pushed = asyncio.Condition()
+
+    def _get(self, key):
+        found = self.strings.get(key)
+        if found is None:
+            return None
+        value, expires_at = found
+        if expires_at is not None and expires_at <= time.time():
+            del self.strings[key]
+            return None
+        return value
+
+    def _zrange(self, key, low, high):
+        low = float("-inf") if low == b"-inf" else float(low)
+        high = float("inf") if high == b"+inf" else float(high)
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        scores = [score for _, score in members]
+        return [member for member, _ in members[bisect.bisect_left(scores, low):bisect.bisect_right(scores, high)]]
+
+    async def execute(self, args):
+        command = args[0].upper()
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"GET":
+            return _bulk(self._get(args[1]))
+        if command == b"SET":
+            expires_at = None
+            if len(args) >= 5 and args[3].upper() == b"EX":
+                expires_at = time.time() + int(args[4])
+            self.strings[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(1 for key in args[1:] if self.strings.pop(key, None) or self.lists.pop(key, None)
+                          or self.zsets.pop(key, None))
+            return b":%d\r\n" % removed
+        if command in (b"LPUSH", b"RPUSH"):
+            items = self.lists.setdefault(args[1], deque())
+            for value in args[2:]:
+                items.appendleft(value) if command == b"LPUSH" else items.append(value)
+            async with self.pushed:
+                self.pushed.notify_all()
+            return b":%d\r\n" % len(items)
+        if command == b"LLEN":
+            return b":%d\r\n" % len(self.lists.get(args[1], ()))
+        if command == b"BRPOP":
+            keys, timeout = args[1:-1], float(args[-1])
+            deadline = time.monotonic() + (timeout or 1e9)
+            async with self.pushed:
+                while True:
+                    for key in keys:
+                        if self.lists.get(key):
+                            return _array([key, self.lists[key].pop()])
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return _array(None)
+                    try:
+                        await asyncio.wait_for(self.pushed.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+        if command == b"ZADD":
+            zset = self.zsets.setdefault(args[1], {})
+            # XX: only update members already there
+            existing_only = args[2].upper() == b"XX"
+            pairs = args[3:] if existing_only else args[2:]
+            added = 0
+            for score, member in zip(pairs[::2], pairs[1::2]):
+                if existing_only and member not in zset:
+                    continue
+                added += member not in zset
+                zset[member] = float(score)
+            return b":%d\r\n" % added
+        if command == b"ZREM":
+            zset = self.zsets.get(args[1], {})
+            return b":%d\r\n" % sum(1 for member in args[2:] if zset.pop(member, None) is not None)
+        if command == b"ZCARD":
+            return b":%d\r\n" % len(self.zsets.get(args[1], {}))
+        if command == b"ZRANGEBYSCORE":
+            members = self._zrange(args[1], args[2], args[3])
+            if len(args) >= 7 and args[4].upper() == b"LIMIT":
+                offset, count = int(args[5]), int(args[6])
+                members = members[offset:offset + count]
+            return _array(members)
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(await self.execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def start(port: int = 0):
+    """Serve from a background thread, returns the bound port"""
+    ready = threading.Event()
+    bound = {}
+
+    async def serve():
+        server = await asyncio.start_server(RedisStub().handle, "127.0.0.1", port)
+        bound["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return bound["port"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    print(f"Redis stand-in on redis://127.0.0.1:{start(args.port)}/0")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,129 @@
+"""Local stand-in for the retailer sites, replaying bench fixtures.
+
+Requests are routed on the Host header, so the app can keep its real
+upstream URLs and only point lib.http at this server via
+SEEKLY_UPSTREAM_OVERRIDE. Latency and error rate are configurable to
+exercise timeouts, retries and rate-limit backoff. Pages carry an ETag
+and a Last-Modified date and answer a matching conditional GET with 304.
+
+    python -m bench.replay_server --port 8765 --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from bench import fixtures
+
+
+def _page(query: dict, default: int) -> int:
+    try:
+        return int(query.get("page", [default])[0])
+    except ValueError:
+        return default
+
+
+def route(host: str, path: str, query: dict):
+    """Return (status, content type, body) for an upstream request"""
+    if path.endswith((".jpg", ".jpeg", ".webp", ".png")):
+        return 200, "image/jpeg", fixtures.load("listing_photo.jpg")
+    if "olx" in host:
+        if path.startswith("/api/relevance"):
+            page = _page(query, 0)
+            if page >= fixtures.OLX_TOTAL_PAGES:
+                return 200, "application/json", '{"data": [], "metadata": {}}'
+            return 200, "application/json", fixtures.load("olx_api.json", page)
+        if path.startswith("/challenge"):
+            return 200, "text/html", fixtures.load("olx_challenge.html")
+        page = _page(query, 1)
+        if page > fixtures.OLX_TOTAL_PAGES:
+            return 200, "text/html", "<html><body><ul class='_1aad128c'></ul></body></html>"
+        return 200, "text/html", fixtures.load("olx_search.html", page)
+    if "pakwheels" in host:
+        return 200, "text/html", fixtures.load("pakwheels_search.html", _page(query, 1))
+    if "daraz" in host:
+        if path.startswith("/catalog"):
+            return 200, "application/json", fixtures.load("daraz_catalog.json")
+        return 200, "text/html", fixtures.load("daraz_product.html")
+    return 404, "text/plain", "unknown upstream"
+
+
+# Fixtures never change while the server runs
+LAST_MODIFIED = formatdate(time.time(), usegmt=True)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        if self.error_rate and random.random() < self.error_rate:
+            status, content_type, body = random.choice([429, 503]), "text/plain", "try again"
+        else:
+            parsed = urlparse(self.path)
+            host = self.headers.get("Host", "")
+            status, content_type, body = route(host, parsed.path, parse_qs(parsed.query))
+
+        payload = body if isinstance(body, bytes) else body.encode("utf-8")
+        validators = {}
+        if status == 200:
+            validators = {"ETag": f'"{hashlib.md5(payload).hexdigest()}"', "Last-Modified": LAST_MODIFIED}
+            if self.headers.get("If-None-Match") == validators["ETag"]:
+                status, payload = 304, b""
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", content_type if isinstance(body, bytes) else f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in validators.items():
+            self.send_header(name, value)
+        if status == 429:
+            self.send_header("Retry-After", "0.2")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs under concurrent connection
+    # setup, adding 1s retransmit stalls that have nothing to do with us
+    request_queue_size = 128
+
+
+def start(port: int = 0, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0):
+    """Serve fixtures from a background thread, returns the server"""
+    handler = type("ConfiguredReplayHandler", (ReplayHandler,), {
+        "latency": latency_ms / 1000,
+        "jitter": jitter_ms / 1000,
+        "error_rate": error_rate,
+    })
+    server = ReplayServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start(args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Replaying fixtures on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
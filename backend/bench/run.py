@@ -0,0 +1,328 @@
+"""Offline scraper benchmarks.
+
+Runs each benchmark in its own subprocess (so peak RSS is per benchmark),
+prints items/sec, p50/p99 latency and peak RSS, and exits non-zero when a
+result crosses bench/thresholds.json.
+
+    cd backend
+    python -m bench.run                      # everything
+    python -m bench.run olx_extract_v2 e2e_scrape_olx
+    python -m bench.run --latency-ms 50 --error-rate 0.02
+    python -m bench.run olx_parse_inline olx_parse_pool --parse-workers 4
+    python -m bench.run olx_refetch olx_revalidate   # page cache off / on
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from bench import fixtures
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+
+def _timed(func, iterations: int):
+    """(latencies, items, seconds) of `iterations` calls after one untimed warm-up call"""
+    func()
+    latencies = []
+    items = 0
+    began = time.perf_counter()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        items += func()
+        latencies.append(time.perf_counter() - started)
+    return latencies, items, time.perf_counter() - began
+
+
+def bench_olx_extract_v2(args):
+    from selectolax.parser import HTMLParser
+    from providers.olx import extract_olx_item_v2
+
+    html = fixtures.load("olx_search.html", 1)
+
+    def run():
+        tree = HTMLParser(html)
+        return sum(1 for li in tree.css('ul._1aad128c li[aria-label="Listing"]') if extract_olx_item_v2(li))
+
+    return _timed(run, args.iterations)
+
+
+def bench_olx_extract_optimized(args):
+    from providers.olx_selenium import extract_items_from_html
+
+    html = fixtures.load("olx_search.html", 1)
+    return _timed(lambda: len(extract_items_from_html(html)), args.iterations)
+
+
+def bench_structured_data_daraz(args):
+    from lib.structured_parser import parse_structured_data
+
+    html = fixtures.load("daraz_product.html")
+    return _timed(lambda: 1 if parse_structured_data(html).get("title") else 0, args.iterations)
+
+
+def bench_pakwheels_listings(args):
+    from providers.pakwheels import parse_pakwheels_listings
+
+    html = fixtures.load("pakwheels_search.html", 1)
+    return _timed(lambda: len(parse_pakwheels_listings(html)), args.iterations)
+
+
+def bench_thumbnail(args):
+    from lib.thumbnails import make_thumbnail
+
+    photo = fixtures.load("listing_photo.jpg")
+    return _timed(lambda: 1 if make_thumbnail(photo, 240) else 0, args.iterations)
+
+
+def _parse_pages(args, workers: int):
+    """Parse --parse-batch OLX pages concurrently per op through the parse pool"""
+    os.environ["SEEKLY_PARSE_WORKERS"] = str(workers)
+    os.environ["SEEKLY_PARSE_INLINE_BELOW"] = "0"
+    from lib import parse_pool
+    from providers.olx import parse_olx_page
+
+    pages = [fixtures.load("olx_search.html", page).encode() for page in range(1, args.parse_batch + 1)]
+    url = "https://www.olx.com.pk/items/q-car"
+
+    async def run():
+        # Start the workers before timing anything
+        await asyncio.gather(*(parse_pool.parse(parse_olx_page, page, url) for page in pages))
+        latencies = []
+        items = 0
+        began = time.perf_counter()
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            results = await asyncio.gather(*(parse_pool.parse(parse_olx_page, page, url) for page in pages))
+            latencies.append(time.perf_counter() - started)
+            items += sum(len(parse_pool.unpack(packed)) for packed, _ in results)
+        return latencies, items, time.perf_counter() - began
+
+    try:
+        return asyncio.run(run())
+    finally:
+        parse_pool.shutdown()
+
+
+def bench_olx_parse_inline(args):
+    return _parse_pages(args, 0)
+
+
+def bench_olx_parse_pool(args):
+    return _parse_pages(args, args.parse_workers)
+
+
+def _refetch(args, page_cache: bool):
+    """Re-scrape one unchanged OLX search (3 pages) per op, with or without the page cache"""
+    server = __import__("bench.replay_server", fromlist=["start"]).start(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate
+    )
+    os.environ["SEEKLY_UPSTREAM_OVERRIDE"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["SEEKLY_PAGE_CACHE_DB"] = ":memory:" if page_cache else ""
+
+    from lib import http, rate_limit
+    rate_limit.HOST_RATES.clear()
+    rate_limit.DEFAULT_RATE = (100_000.0, 100_000)
+    from providers.olx import scrape_olx_search_httpx
+
+    url = "https://www.olx.com.pk/items/q-car"
+
+    async def run():
+        # The first scrape fills the page cache
+        await scrape_olx_search_httpx(url)
+        latencies = []
+        items = 0
+        began = time.perf_counter()
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            items += len(await scrape_olx_search_httpx(url))
+            latencies.append(time.perf_counter() - started)
+        elapsed = time.perf_counter() - began
+        await http.close_clients()
+        return latencies, items, elapsed
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.shutdown()
+
+
+def bench_olx_refetch(args):
+    return _refetch(args, False)
+
+
+def bench_olx_revalidate(args):
+    return _refetch(args, True)
+
+
+def _e2e(args, path_for):
+    """Drive the ASGI app against the replay server with N concurrent clients"""
+    server = __import__("bench.replay_server", fromlist=["start"]).start(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate
+    )
+    os.environ["SEEKLY_UPSTREAM_OVERRIDE"] = f"http://127.0.0.1:{server.server_port}"
+    # The app stores what it scrapes, keep that out of the real listing store
+    os.environ["SEEKLY_STORE_DB"] = ":memory:"
+
+    import httpx
+    from lib import rate_limit
+    if not args.polite:
+        # Measure our own overhead, not the politeness budget
+        rate_limit.HOST_RATES.clear()
+        rate_limit.DEFAULT_RATE = (100_000.0, 100_000)
+    import main
+
+    async def run():
+        latencies = []
+        items = 0
+        elapsed = 0.0
+        semaphore = asyncio.Semaphore(args.concurrency)
+        transport = httpx.ASGITransport(app=main.app)
+        async with main.lifespan(main.app), \
+                httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            async def one(n):
+                nonlocal items
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(path_for(n))
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code == 200:
+                        items += response.json().get("count", 0)
+
+            # Lazy imports, first connections and compiled plans stay out of the numbers
+            await client.get(path_for("warmup"))
+            began = time.perf_counter()
+            await asyncio.gather(*(one(n) for n in range(args.requests)))
+            elapsed = time.perf_counter() - began
+        return latencies, items, elapsed
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.shutdown()
+
+
+def bench_e2e_scrape_olx(args):
+    # A distinct query per request keeps the result cache out of the numbers
+    return _e2e(args, lambda n: f"/scrape?url=https://www.olx.com.pk/items/q-car-{n}")
+
+
+def bench_e2e_scrape_pakwheels(args):
+    return _e2e(args, lambda n: f"/scrape?url=https://www.pakwheels.com/used-cars/search/-/?q=car{n}")
+
+
+def bench_e2e_search(args):
+    return _e2e(args, lambda n: f"/search?q=car{n}")
+
+
+BENCHMARKS = {
+    "olx_extract_v2": bench_olx_extract_v2,
+    "olx_extract_optimized": bench_olx_extract_optimized,
+    "structured_data_daraz": bench_structured_data_daraz,
+    "pakwheels_listings": bench_pakwheels_listings,
+    "thumbnail": bench_thumbnail,
+    "olx_parse_inline": bench_olx_parse_inline,
+    "olx_parse_pool": bench_olx_parse_pool,
+    "olx_refetch": bench_olx_refetch,
+    "olx_revalidate": bench_olx_revalidate,
+    "e2e_scrape_olx": bench_e2e_scrape_olx,
+    "e2e_scrape_pakwheels": bench_e2e_scrape_pakwheels,
+    "e2e_search": bench_e2e_search,
+}
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_child(name: str, args) -> dict:
+    # Only the timed region counts: setup, fixtures and warm-up are excluded
+    latencies, items, elapsed = BENCHMARKS[name](args)
+    return {
+        "name": name,
+        "ops": len(latencies),
+        "items": items,
+        "items_per_sec": round(items / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def check(result: dict, thresholds: dict):
+    limits = thresholds.get(result["name"], {})
+    failures = []
+    if "min_items_per_sec" in limits and result["items_per_sec"] < limits["min_items_per_sec"]:
+        failures.append(f"items/sec {result['items_per_sec']} < {limits['min_items_per_sec']}")
+    if "max_p99_ms" in limits and result["p99_ms"] > limits["max_p99_ms"]:
+        failures.append(f"p99 {result['p99_ms']}ms > {limits['max_p99_ms']}ms")
+    if "max_rss_mb" in limits and result["peak_rss_mb"] > limits["max_rss_mb"]:
+        failures.append(f"peak RSS {result['peak_rss_mb']}MB > {limits['max_rss_mb']}MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=50, help="loops for parser benchmarks")
+    parser.add_argument("--requests", type=int, default=50, help="requests for e2e benchmarks")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--parse-batch", type=int, default=8, help="pages parsed concurrently per parse-pool op")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for olx_parse_pool (compare against olx_parse_inline)")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--polite", action="store_true", help="keep the production rate limits")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args)))
+        return
+
+    names = args.names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    with open(THRESHOLDS_PATH) as f:
+        thresholds = json.load(f)
+
+    passthrough = [arg for arg in sys.argv[1:] if arg not in names]
+    results = []
+    regressions = 0
+    print(f"{'benchmark':<24}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>9}")
+    for name in names:
+        completed = subprocess.run(
+            [sys.executable, "-m", "bench.run", "--child", name, *passthrough],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            print(f"{name:<24}FAILED\n{completed.stderr.strip()}")
+            regressions += 1
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        failures = check(result, thresholds)
+        regressions += bool(failures)
+        results.append({**result, "regressions": failures})
+        print(f"{name:<24}{result['items_per_sec']:>12}{result['p50_ms']:>10}{result['p99_ms']:>10}"
+              f"{result['peak_rss_mb']:>9}  {'; '.join(failures)}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import re
+
+from lib.urls import canonical_listing_url
+
+_NON_WORD = re.compile(r"[\W_]+")
+_NON_DIGIT = re.compile(r"\D+")
+
+
+def listing_fingerprint(item):
+    """Cheap near-duplicate key: normalized title plus the price digits.
+
+    Returns None when the title or price is missing, since placeholders
+    like "Price not available" would make unrelated listings collide.
+    """
+    title = _NON_WORD.sub(" ", (item.title or "").lower()).strip()
+    price = _NON_DIGIT.sub("", item.price or "")
+    if not title or not price or title.startswith("no title"):
+        return None
+    return title, price
+
+
+class ResultAccumulator:
+    """Collects listings, dropping repeats in O(1) per item.
+
+    Items are matched on their canonical URL, and optionally on a
+    title/price fingerprint to catch the same listing reposted on another
+    page or retailer.
+    """
+
+    __slots__ = ("items", "duplicates", "_urls", "_fingerprints")
+
+    def __init__(self, fingerprints: bool = True):
+        self.items = []
+        self.duplicates = 0
+        self._urls = set()
+        self._fingerprints = set() if fingerprints else None
+
+    def add(self, item) -> bool:
+        if not item:
+            return False
+
+        url = item.url
+        key = canonical_listing_url(url) if url else None
+        if key is not None and key in self._urls:
+            self.duplicates += 1
+            return False
+
+        fingerprint = None
+        if self._fingerprints is not None:
+            fingerprint = listing_fingerprint(item)
+            if fingerprint is not None and fingerprint in self._fingerprints:
+                self.duplicates += 1
+                return False
+            if fingerprint is not None:
+                self._fingerprints.add(fingerprint)
+
+        if key is not None:
+            self._urls.add(key)
+        self.items.append(item)
+        return True
+
+    def extend(self, items):
+        """Add a batch, returning only the items that were new"""
+        return [item for item in items if self.add(item)]
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from lib.executor import run_blocking
+from lib.serialize import dumps
+from lib.singleflight import SingleFlight
+from lib.urls import normalize_url, retailer_for_url
+
+# (fresh, stale) lifetimes in seconds. Stale entries are still served while
+# a background refresh runs.
+RETAILER_TTLS = {
+    "olx": (300, 1800),
+    "pakwheels": (600, 3600),
+    "daraz": (900, 3600),
+}
+DEFAULT_TTL = (300, 900)
+
+MAX_ENTRIES = int(os.getenv("SEEKLY_CACHE_MAX_ENTRIES", "512"))
+DISK_PATH = os.getenv("SEEKLY_CACHE_DB")
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "fresh_until", "stale_until")
+
+    def __init__(self, value, stored_at, fresh_for, stale_for):
+        self.value = value
+        self.stored_at = stored_at
+        self.fresh_until = stored_at + fresh_for
+        self.stale_until = stored_at + stale_for
+
+
+class _DiskTier:
+    """SQLite copy of the cache so warm entries survive a restart"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, stored_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, value, stored_at: float):
+        payload = dumps(value).decode()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, payload, stored_at),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ResultCache:
+    """LRU result cache with single-flight loading and stale-while-revalidate.
+
+    `get_or_fetch` returns `(value, status)` where status is one of
+    "hit", "stale", "coalesced" (joined an in-flight fetch) or "miss".
+    `decode` rebuilds a value read back from the disk tier, which stores
+    plain JSON.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, disk_path: str = DISK_PATH, decode=None):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._flights = SingleFlight()
+        self._refreshing = set()
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        self._decode = decode
+
+    async def get_or_fetch(self, url: str, fetcher):
+        key = normalize_url(url)
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry is None and self._disk is not None:
+            entry = await self._load_from_disk(key, url)
+
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                return entry.value, "hit"
+            if key not in self._flights:
+                # Claim the key before the task starts so concurrent stale
+                # hits see the refresh and don't start their own
+                future = self._flights.claim(key)
+                task = asyncio.create_task(self._flights.run(key, self._fetch, key, url, fetcher, future=future))
+                self._refreshing.add(task)
+                task.add_done_callback(self._refresh_done)
+            return entry.value, "stale"
+
+        value, coalesced = await self._flights.do(key, self._fetch, key, url, fetcher)
+        return value, "coalesced" if coalesced else "miss"
+
+    def invalidate(self, url: str):
+        self._entries.pop(normalize_url(url), None)
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+    async def _fetch(self, key: str, url: str, fetcher):
+        value = await fetcher(url)
+        if value:
+            await self._store(key, url, value)
+        return value
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background cache refresh failed: {task.exception()}")
+
+    async def _store(self, key: str, url: str, value):
+        stored_at = time.time()
+        self._remember(key, _Entry(value, stored_at, *self._ttl(url)))
+        if self._disk is not None:
+            await run_blocking(self._disk.put, key, value, stored_at)
+
+    async def _load_from_disk(self, key: str, url: str):
+        found = await run_blocking(self._disk.get, key)
+        if found is None:
+            return None
+        value, stored_at = found
+        if self._decode is not None:
+            value = self._decode(value)
+        entry = _Entry(value, stored_at, *self._ttl(url))
+        if time.time() < entry.stale_until:
+            self._remember(key, entry)
+            return entry
+        return None
+
+    def _remember(self, key: str, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _ttl(self, url: str):
+        return RETAILER_TTLS.get(retailer_for_url(url), DEFAULT_TTL)
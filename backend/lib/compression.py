@@ -0,0 +1,111 @@
+"""Response compression negotiated from Accept-Encoding.
+
+zstd and brotli are used when their (optional) packages are installed,
+gzip always works. Whole JSON/text bodies above SEEKLY_COMPRESS_MIN_BYTES
+are compressed; streamed responses (NDJSON/SSE) and images pass through
+untouched so events still reach clients as they happen.
+"""
+import gzip
+import os
+
+from lib.executor import run_blocking
+
+try:
+    import brotli
+except ImportError:  # optional, br is simply not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, zstd is simply not offered
+    zstandard = None
+
+MIN_SIZE = int(os.getenv("SEEKLY_COMPRESS_MIN_BYTES", "1024"))
+# Bodies this large are compressed on the executor instead of the event loop
+OFFLOAD_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/plain", b"text/html", b"application/javascript")
+
+# Fast levels: the point is time to first render, not the last byte
+ENCODERS = {"gzip": lambda body: gzip.compress(body, compresslevel=5, mtime=0)}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=4)
+if zstandard is not None:
+    _zstd = zstandard.ZstdCompressor(level=3)
+    ENCODERS["zstd"] = _zstd.compress
+
+# Preferred first when a client rates several equally
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def choose_encoding(accept_encoding: str):
+    """Best supported coding in an Accept-Encoding header, None for identity"""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        offered[name.strip().lower()] = quality
+    wildcard = offered.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in PREFERENCE:
+        if name not in ENCODERS:
+            continue
+        quality = offered.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether it's compressible
+                start = message
+                return
+
+            headers = list(start.get("headers", []))
+            names = {name.lower() for name, _ in headers}
+            content_type = next((value for name, value in headers if name.lower() == b"content-type"), b"")
+            compressible = content_type.startswith(COMPRESSIBLE_TYPES)
+            body = message.get("body", b"")
+            if compressible:
+                headers.append((b"vary", b"Accept-Encoding"))
+            if (compressible and not message.get("more_body", False) and b"content-encoding" not in names
+                    and len(body) >= self.min_size):
+                encode = ENCODERS[encoding]
+                body = await run_blocking(encode, body) if len(body) >= OFFLOAD_SIZE else encode(body)
+                headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+                headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(body)).encode())]
+                message = {**message, "body": body}
+            passthrough = True
+            await send({**start, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
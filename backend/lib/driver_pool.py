@@ -0,0 +1,171 @@
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from lib.metrics import stage
+
+POOL_SIZE = int(os.getenv("SEEKLY_DRIVER_POOL_SIZE", "3"))
+MAX_PAGES_PER_DRIVER = int(os.getenv("SEEKLY_DRIVER_MAX_PAGES", "50"))
+BORROW_TIMEOUT = float(os.getenv("SEEKLY_DRIVER_BORROW_TIMEOUT", "60"))
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path() -> str:
+    """Resolve the chromedriver binary once per process"""
+    global _driver_path
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                _driver_path = os.getenv("SEEKLY_CHROMEDRIVER_PATH")
+                if not _driver_path:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "pages", "created_at")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Bounded pool of warm WebDriver sessions.
+
+    The pool size is also the concurrency cap: at most `size` sessions are
+    borrowed at once, further callers block until one is returned.
+    `prepare`, when given, runs once before the first session is started
+    (e.g. resolving the driver binary), so it happens on first use even
+    when nothing warmed the pool up; a failed run is retried next time.
+
+    Async callers hand browser work to run(), which uses the pool's own
+    `size` threads: work waiting for a session queues there instead of
+    holding threads of the shared run_blocking executor, and queued work
+    is dropped when its caller is cancelled.
+    """
+
+    def __init__(self, factory, size: int = POOL_SIZE, max_pages: int = MAX_PAGES_PER_DRIVER, prepare=None):
+        self._factory = factory
+        self._prepare = prepare
+        self._prepare_lock = threading.Lock()
+        self._size = size
+        self._max_pages = max_pages
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._closed = False
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @contextmanager
+    def session(self, timeout: float = BORROW_TIMEOUT):
+        """Borrow a driver for one page load, return it afterwards"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser session available")
+
+        pooled = None
+        try:
+            pooled = self._checkout()
+            yield pooled.driver
+        except Exception as e:
+            if pooled is not None and _is_driver_error(e):
+                print(f"Discarding crashed browser session: {e}")
+                self._discard(pooled)
+                pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                pooled.pages += 1
+                self._checkin(pooled)
+            self._slots.release()
+
+    async def run(self, func, *args, **kwargs):
+        """Run blocking browser work on one of the pool's threads.
+
+        The caller's context variables go along, as with run_blocking.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._size, thread_name_prefix="seekly-browser")
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(context.run, func, *args, **kwargs))
+
+    def close(self):
+        """Quit all idle sessions and stop handing out new ones"""
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled)
+
+    def _checkout(self) -> _PooledDriver:
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                self._prepared()
+                with stage("selenium", "driver_start"):
+                    return _PooledDriver(self._factory())
+
+            if _is_healthy(pooled.driver):
+                return pooled
+            print("Browser session failed health check, replacing it.")
+            self._discard(pooled)
+
+    def _prepared(self):
+        if self._prepare is None:
+            return
+        with self._prepare_lock:
+            if self._prepare is not None:
+                with stage("selenium", "driver_prepare"):
+                    self._prepare()
+                self._prepare = None
+
+    def _checkin(self, pooled: _PooledDriver):
+        if self._closed or pooled.pages >= self._max_pages:
+            self._discard(pooled)
+        else:
+            self._idle.put(pooled)
+
+    def _discard(self, pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+
+def _is_healthy(driver) -> bool:
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def _is_driver_error(error: Exception) -> bool:
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    # Wait timeouts leave the session usable, anything else from the driver does not
+    return isinstance(error, WebDriverException) and not isinstance(error, TimeoutException)
@@ -0,0 +1,25 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+MAX_WORKERS = int(os.getenv("SEEKLY_BLOCKING_WORKERS", "8"))
+
+# One executor for all blocking work (Selenium, sync parsers) in the process
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="seekly-blocking")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the app-wide executor.
+
+    The caller's context variables go along, so per-request timings keep
+    working inside the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(context.run, func, *args, **kwargs))
+
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,71 @@
+import time
+from collections import deque
+
+
+class HealthTracker:
+    """Rolling success record for one upstream path.
+
+    The path is reported unavailable once the recent failure rate crosses
+    `max_failure_rate` (over at least `min_samples` calls). After
+    `cooldown` seconds one trial call is let through; its outcome decides
+    whether the path opens again. Successful calls that report their
+    duration feed a moving average latency.
+    """
+
+    def __init__(self, window: int = 20, min_samples: int = 5,
+                 max_failure_rate: float = 0.5, cooldown: float = 120.0,
+                 latency_weight: float = 0.3):
+        self._outcomes = deque(maxlen=window)
+        self._min_samples = min_samples
+        self._max_failure_rate = max_failure_rate
+        self._cooldown = cooldown
+        self._disabled_until = 0.0
+        self._latency_weight = latency_weight
+        self.latency = None
+        self.last_attempt = 0.0
+
+    @property
+    def state(self) -> str:
+        """"closed" (healthy), "open" (skipped) or "half_open" (trial due)"""
+        if self._disabled_until == 0.0:
+            return "closed"
+        return "half_open" if time.monotonic() >= self._disabled_until else "open"
+
+    @property
+    def success_rate(self) -> float:
+        if not self._outcomes:
+            return 1.0
+        return 1 - self._outcomes.count(False) / len(self._outcomes)
+
+    def available(self) -> bool:
+        if self._disabled_until == 0.0:
+            return True
+        if time.monotonic() >= self._disabled_until:
+            # Half-open: allow a trial, push the deadline so only one goes through
+            self._disabled_until = time.monotonic() + self._cooldown
+            return True
+        return False
+
+    def record(self, success: bool, elapsed: float = None):
+        self.last_attempt = time.monotonic()
+        self._outcomes.append(success)
+        if success:
+            self._disabled_until = 0.0
+            if elapsed is not None:
+                self.latency = elapsed if self.latency is None else (
+                    self._latency_weight * elapsed + (1 - self._latency_weight) * self.latency)
+            return
+        failures = self._outcomes.count(False)
+        if (len(self._outcomes) >= self._min_samples
+                and failures / len(self._outcomes) >= self._max_failure_rate):
+            self._disabled_until = time.monotonic() + self._cooldown
+            self._outcomes.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "available": self.state != "open",
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_failures": self._outcomes.count(False),
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+        }
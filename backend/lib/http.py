@@ -0,0 +1,205 @@
+import importlib.util
+import os
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+import httpx
+
+from lib.metrics import UPSTREAM_BYTES, stage
+from lib.rate_limit import limiter_for, observe_status
+from lib.urls import retailer_for_url
+
+# Per-upstream connection budgets, anything else gets DEFAULT_LIMITS
+HOST_LIMITS = {
+    "www.olx.com.pk": httpx.Limits(max_connections=40, max_keepalive_connections=20, keepalive_expiry=60.0),
+    "www.pakwheels.com": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+    "www.daraz.pk": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+}
+DEFAULT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0)
+TIMEOUT = httpx.Timeout(30.0, connect=10.0, pool=float(os.getenv("SEEKLY_HTTP_POOL_TIMEOUT", "10")))
+
+# HTTP/2 needs the optional `h2` package, brotli decoding needs `brotli`
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Send every upstream request to this base URL instead (with the original
+# Host header), used to replay recorded pages in benchmarks
+UPSTREAM_OVERRIDE = os.getenv("SEEKLY_UPSTREAM_OVERRIDE")
+
+# Hosts past this many share one client, stats entry and rate limiter,
+# so a stream of distinct hostnames can't grow them without bound
+MAX_HOSTS = int(os.getenv("SEEKLY_HTTP_MAX_HOSTS", "32"))
+OTHER_HOSTS = "*"
+
+_clients = {}
+_stats = {}
+
+
+class HostStats:
+    __slots__ = ("requests", "errors", "new_connections", "reused_connections",
+                 "pool_wait_total", "pool_wait_max")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+
+    def as_dict(self):
+        waited = self.new_connections + self.reused_connections
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_ratio": round(self.reused_connections / waited, 3) if waited else None,
+            "pool_wait_avg_ms": round(self.pool_wait_total / waited * 1000, 2) if waited else None,
+            "pool_wait_max_ms": round(self.pool_wait_max * 1000, 2),
+        }
+
+
+class _ConnectionTrace:
+    """httpcore trace hook telling apart fresh and reused connections.
+
+    Pool wait is the time from sending the request until a connection is
+    either opened (fresh) or starts writing headers (reused).
+    """
+
+    __slots__ = ("stats", "started", "connected")
+
+    def __init__(self, stats: HostStats):
+        self.stats = stats
+        self.started = time.perf_counter()
+        self.connected = False
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.started":
+            self.connected = True
+            self._record_wait()
+            self.stats.new_connections += 1
+        elif event_name.endswith("send_request_headers.started") and not self.connected:
+            self.connected = True
+            self._record_wait()
+            self.stats.reused_connections += 1
+
+    def _record_wait(self):
+        waited = time.perf_counter() - self.started
+        self.stats.pool_wait_total += waited
+        if waited > self.stats.pool_wait_max:
+            self.stats.pool_wait_max = waited
+
+
+def _new_client(host: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2,
+        limits=HOST_LIMITS.get(host, DEFAULT_LIMITS),
+        timeout=TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+def init_clients():
+    """Open one client per known upstream, called from the app lifespan"""
+    if not HTTP2:
+        print("h2 is not installed, upstream clients fall back to HTTP/1.1")
+    for host in HOST_LIMITS:
+        get_client(host)
+
+
+async def close_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def pool_key(host: str) -> str:
+    """The host's own pool key, or OTHER_HOSTS once MAX_HOSTS hosts have one"""
+    if host in HOST_LIMITS or host in _stats or len(_stats) < MAX_HOSTS:
+        return host
+    return OTHER_HOSTS
+
+
+def get_client(host: str) -> httpx.AsyncClient:
+    client = _clients.get(host)
+    if client is None:
+        client = _clients[host] = _new_client(host)
+        _stats.setdefault(host, HostStats())
+    return client
+
+
+async def _send(url: str, method: str, stream: bool, kwargs: dict):
+    """Pace and send one request, returns (response, pool key)"""
+    parsed = urlparse(url)
+    host = parsed.netloc
+    key = pool_key(host)
+    client = get_client(key)
+    stats = _stats[key]
+    retailer = retailer_for_url(url)
+
+    if UPSTREAM_OVERRIDE:
+        url = UPSTREAM_OVERRIDE.rstrip("/") + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), "Host": host}
+
+    with stage(retailer, "throttle"):
+        await limiter_for(key).acquire()
+    stats.requests += 1
+    follow_redirects = kwargs.pop("follow_redirects", httpx.USE_CLIENT_DEFAULT)
+    extensions = kwargs.pop("extensions", {})
+    extensions["trace"] = _ConnectionTrace(stats)
+    request = client.build_request(method, url, extensions=extensions, **kwargs)
+    try:
+        with stage(retailer, "fetch"):
+            response = await client.send(request, stream=stream, follow_redirects=follow_redirects)
+    except httpx.HTTPError:
+        stats.errors += 1
+        raise
+    observe_status(key, response.status_code, response.headers.get("Retry-After"))
+    return response, key
+
+
+async def fetch(url: str, method: str = "GET", **kwargs) -> httpx.Response:
+    """Send a request through the shared client for the URL's host.
+
+    Requests are paced by the host's token bucket, and 429/5xx responses
+    slow that bucket down.
+    """
+    response, key = await _send(url, method, False, kwargs)
+    UPSTREAM_BYTES.inc(len(response.content), host=key)
+    return response
+
+
+@asynccontextmanager
+async def open_stream(url: str, method: str = "GET", **kwargs):
+    """Like fetch(), but the body is left unread for the caller to stream"""
+    response, key = await _send(url, method, True, kwargs)
+    try:
+        yield response
+    finally:
+        UPSTREAM_BYTES.inc(response.num_bytes_downloaded, host=key)
+        await response.aclose()
+
+
+def http_stats() -> dict:
+    return {host: stats.as_dict() for host, stats in _stats.items()}
+
+
+# Prometheus name, type and HostStats field for each pool counter
+_POOL_METRICS = (
+    ("seekly_upstream_requests_total", "counter", "requests"),
+    ("seekly_upstream_errors_total", "counter", "errors"),
+    ("seekly_upstream_connections_opened_total", "counter", "new_connections"),
+    ("seekly_upstream_connections_reused_total", "counter", "reused_connections"),
+    ("seekly_upstream_pool_wait_seconds_total", "counter", "pool_wait_total"),
+    ("seekly_upstream_pool_wait_max_seconds", "gauge", "pool_wait_max"),
+)
+
+
+def http_metric_lines():
+    """Connection pool counters in Prometheus text format, for /metrics"""
+    for name, kind, field in _POOL_METRICS:
+        yield f"# TYPE {name} {kind}"
+        for host, stats in _stats.items():
+            yield f'{name}{{host="{host}"}} {getattr(stats, field)}'
@@ -0,0 +1,425 @@
+"""Scrape job queue with an in-process and a Redis backend.
+
+POST /jobs enqueues a job per URL and the client polls (or waits on) its
+record; workers claim jobs and run the scrape. /scrape calls are queued
+(and waited on) too when the backend is shared, and run inline with the
+in-process one. With the in-process backend (SEEKLY_JOB_QUEUE=memory, the
+default) the workers are tasks in the API process. With SEEKLY_JOB_QUEUE=redis://host:port/db, separate
+`python -m worker` processes on any node consume the same queue, and the
+API runs no workers unless SEEKLY_JOB_WORKERS says so.
+
+Both backends enforce per-retailer caps on running jobs
+(SEEKLY_JOB_CAPS, e.g. "olx=4,pakwheels=4,daraz=2"), retry failed jobs
+with exponential backoff up to SEEKLY_JOB_ATTEMPTS, and keep finished
+records for SEEKLY_JOB_RESULT_TTL seconds. A Redis job holds a lease of
+SEEKLY_JOB_LEASE seconds, which its worker renews while the job runs; a
+job whose worker vanished is retried once the lease runs out.
+
+A job record is a dict: id, url, retailer, status ("queued", "running",
+"retrying", "done" or "failed"), attempts, error, result, created and
+updated.
+"""
+import asyncio
+import heapq
+import json
+import os
+import random
+import secrets
+import time
+from collections import deque
+
+from lib.metrics import JOBS, stage
+from lib.serialize import dumps
+from lib.urls import retailer_for_url
+
+JOB_QUEUE = os.getenv("SEEKLY_JOB_QUEUE", "memory")
+JOB_WORKERS = int(os.getenv("SEEKLY_JOB_WORKERS", "8" if JOB_QUEUE == "memory" else "0"))
+MAX_ATTEMPTS = int(os.getenv("SEEKLY_JOB_ATTEMPTS", "3"))
+JOB_TIMEOUT = float(os.getenv("SEEKLY_JOB_TIMEOUT", "120"))
+# Renewed every third of its length, so only a dead worker lets it lapse
+JOB_LEASE = float(os.getenv("SEEKLY_JOB_LEASE", "30"))
+RESULT_TTL = int(os.getenv("SEEKLY_JOB_RESULT_TTL", "600"))
+BACKOFF_BASE = float(os.getenv("SEEKLY_JOB_BACKOFF", "2"))
+BACKOFF_MAX = 60.0
+DEFAULT_CAP = 2
+
+
+def parse_caps(text: str) -> dict:
+    caps = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            caps[name.strip().lower()] = int(value)
+    return caps
+
+
+RETAILER_CAPS = parse_caps(os.getenv("SEEKLY_JOB_CAPS", "olx=4,pakwheels=4,daraz=2"))
+
+FINISHED = ("done", "failed")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures retrying cannot fix"""
+
+
+def backoff(attempts: int) -> float:
+    """Delay before retry number `attempts`, with jitter"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def new_record(url: str) -> dict:
+    now = time.time()
+    return {
+        "id": secrets.token_urlsafe(12),
+        "url": url,
+        "retailer": retailer_for_url(url),
+        "status": "queued",
+        "attempts": 0,
+        "error": None,
+        "result": None,
+        "created": now,
+        "updated": now,
+    }
+
+
+class MemoryJobQueue:
+    """Jobs held in this process, for a single API instance"""
+
+    name = "memory"
+
+    def __init__(self, caps: dict = None):
+        self.caps = RETAILER_CAPS if caps is None else caps
+        self._jobs = {}
+        self._queues = {}  # retailer -> deque of job ids
+        self._delayed = []  # heap of (due, job id)
+        self._running = {}  # retailer -> running count
+        self._expiry = deque()  # (expires_at, job id) of finished jobs
+        self._changed = asyncio.Condition()
+
+    def _cap(self, retailer: str) -> int:
+        return self.caps.get(retailer, DEFAULT_CAP)
+
+    async def enqueue(self, url: str) -> str:
+        record = new_record(url)
+        async with self._changed:
+            self._prune()
+            self._jobs[record["id"]] = record
+            self._queues.setdefault(record["retailer"], deque()).append(record["id"])
+            self._changed.notify_all()
+        return record["id"]
+
+    def _promote(self, now: float):
+        while self._delayed and self._delayed[0][0] <= now:
+            _, job_id = heapq.heappop(self._delayed)
+            record = self._jobs.get(job_id)
+            if record is not None:
+                self._queues.setdefault(record["retailer"], deque()).append(job_id)
+
+    def _take(self):
+        for retailer, queue in self._queues.items():
+            if queue and self._running.get(retailer, 0) < self._cap(retailer):
+                self._running[retailer] = self._running.get(retailer, 0) + 1
+                return self._jobs[queue.popleft()]
+        return None
+
+    async def claim(self, timeout: float = 1.0):
+        """Next runnable job, or None when none frees up within `timeout`"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with self._changed:
+            while True:
+                self._promote(time.time())
+                record = self._take()
+                if record is not None:
+                    record.update(status="running", attempts=record["attempts"] + 1, updated=time.time())
+                    return record
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                if self._delayed:
+                    remaining = min(remaining, max(0.0, self._delayed[0][0] - time.time()))
+                try:
+                    async with asyncio.timeout(remaining):
+                        await self._changed.wait()
+                except TimeoutError:
+                    pass
+
+    async def renew(self, record: dict):
+        pass  # jobs can't outlive this process, nothing to lease
+
+    async def finish(self, record: dict, result):
+        record.update(status="done", result=result, error=None, updated=time.time())
+        await self._release(record)
+
+    async def fail(self, record: dict, error: str, retry: bool = True):
+        if retry and record["attempts"] < MAX_ATTEMPTS:
+            record.update(status="retrying", error=error, updated=time.time())
+            heapq.heappush(self._delayed, (time.time() + backoff(record["attempts"]), record["id"]))
+        else:
+            record.update(status="failed", error=error, updated=time.time())
+        await self._release(record)
+
+    async def _release(self, record: dict):
+        async with self._changed:
+            self._running[record["retailer"]] -= 1
+            if record["status"] in FINISHED:
+                self._expiry.append((time.time() + RESULT_TTL, record["id"]))
+            self._changed.notify_all()
+
+    def _prune(self):
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            self._jobs.pop(self._expiry.popleft()[1], None)
+
+    async def get(self, job_id: str):
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float):
+        """The job's record once finished, or as it stands when `timeout` runs out"""
+        record = self._jobs.get(job_id)
+        if record is None:
+            return None
+        async with self._changed:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._changed.wait_for(lambda: record["status"] in FINISHED)
+            except TimeoutError:
+                pass
+        return record
+
+    async def status(self) -> dict:
+        return {
+            "backend": self.name,
+            "queued": {retailer: len(queue) for retailer, queue in self._queues.items()},
+            "running": dict(self._running),
+            "delayed": len(self._delayed),
+        }
+
+    async def close(self):
+        pass
+
+
+class RedisJobQueue:
+    """Jobs in Redis, shared by API instances and worker processes.
+
+    Keys under `prefix`: job:<id> holds the JSON record, queue:<retailer>
+    a list of waiting ids, running:<retailer> a sorted set of ids by
+    lease deadline and `delayed` a sorted set of ids by retry time. When
+    several processes race to move an id, the one whose ZREM removed it
+    wins.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, caps: dict = None, prefix: str = "seekly:jobs:"):
+        from lib.resp import RespClient
+
+        self.caps = RETAILER_CAPS if caps is None else caps
+        self.retailers = tuple(self.caps) + ("unknown",)
+        self.prefix = prefix
+        self.redis = RespClient(url)
+        self._next_sweep = 0.0
+
+    def _key(self, *parts) -> str:
+        return self.prefix + ":".join(parts)
+
+    def _cap(self, retailer: str) -> int:
+        return self.caps.get(retailer, DEFAULT_CAP)
+
+    async def _save(self, record: dict, ttl: int = None):
+        record["updated"] = time.time()
+        # Unfinished records get a generous TTL too, so nothing leaks forever
+        await self.redis.execute("SET", self._key("job", record["id"]), dumps(record), "EX", ttl or 24 * 3600)
+
+    async def get(self, job_id: str):
+        data = await self.redis.execute("GET", self._key("job", job_id))
+        return None if data is None else json.loads(data)
+
+    async def enqueue(self, url: str) -> str:
+        record = new_record(url)
+        retailer = record["retailer"] if record["retailer"] in self.retailers else "unknown"
+        record["retailer"] = retailer
+        await self._save(record)
+        await self.redis.execute("LPUSH", self._key("queue", retailer), record["id"])
+        return record["id"]
+
+    async def _sweep(self):
+        """Queue retries that are due and re-run jobs whose worker's lease ran out"""
+        now = time.time()
+        for job_id in await self.redis.execute("ZRANGEBYSCORE", self._key("delayed"), "-inf", now, "LIMIT", 0, 100):
+            if await self.redis.execute("ZREM", self._key("delayed"), job_id) == 1:
+                record = await self.get(job_id.decode())
+                if record is not None:
+                    await self.redis.execute("LPUSH", self._key("queue", record["retailer"]), job_id)
+        for retailer in self.retailers:
+            running = self._key("running", retailer)
+            for job_id in await self.redis.execute("ZRANGEBYSCORE", running, "-inf", now, "LIMIT", 0, 100):
+                if await self.redis.execute("ZREM", running, job_id) == 1:
+                    record = await self.get(job_id.decode())
+                    if record is not None and record["status"] == "running":
+                        await self._retry_or_fail(record, "Worker lost (lease expired)", True)
+
+    async def claim(self, timeout: float = 1.0):
+        if time.time() >= self._next_sweep:
+            self._next_sweep = time.time() + 1.0
+            await self._sweep()
+
+        open_queues = []
+        for retailer in self.retailers:
+            if await self.redis.execute("ZCARD", self._key("running", retailer)) < self._cap(retailer):
+                open_queues.append(self._key("queue", retailer))
+        if not open_queues:
+            await asyncio.sleep(min(timeout, 0.2))
+            return None
+
+        popped = await self.redis.execute("BRPOP", *open_queues, max(1, int(timeout)))
+        if popped is None:
+            return None
+        queue_key, job_id = popped
+        retailer = queue_key.decode().rsplit(":", 1)[1]
+        running = self._key("running", retailer)
+        await self.redis.execute("ZADD", running, time.time() + JOB_LEASE, job_id)
+        if await self.redis.execute("ZCARD", running) > self._cap(retailer):
+            # Another worker took the last slot first, put the job back at the front
+            await self.redis.execute("ZREM", running, job_id)
+            await self.redis.execute("RPUSH", queue_key, job_id)
+            return None
+
+        record = await self.get(job_id.decode())
+        if record is None:
+            await self.redis.execute("ZREM", running, job_id)
+            return None
+        record.update(status="running", attempts=record["attempts"] + 1)
+        await self._save(record)
+        return record
+
+    async def renew(self, record: dict):
+        """Extend the lease of a running job (XX: never revive one the sweep took back)"""
+        await self.redis.execute(
+            "ZADD", self._key("running", record["retailer"]), "XX", time.time() + JOB_LEASE, record["id"]
+        )
+
+    async def finish(self, record: dict, result):
+        record.update(status="done", result=result, error=None)
+        await self._save(record, RESULT_TTL)
+        await self.redis.execute("ZREM", self._key("running", record["retailer"]), record["id"])
+
+    async def fail(self, record: dict, error: str, retry: bool = True):
+        await self._retry_or_fail(record, error, retry)
+        await self.redis.execute("ZREM", self._key("running", record["retailer"]), record["id"])
+
+    async def _retry_or_fail(self, record: dict, error: str, retry: bool):
+        if retry and record["attempts"] < MAX_ATTEMPTS:
+            record.update(status="retrying", error=error)
+            await self._save(record)
+            await self.redis.execute("ZADD", self._key("delayed"), time.time() + backoff(record["attempts"]), record["id"])
+        else:
+            record.update(status="failed", error=error)
+            await self._save(record, RESULT_TTL)
+
+    async def wait(self, job_id: str, timeout: float):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.02
+        while True:
+            record = await self.get(job_id)
+            if record is None or record["status"] in FINISHED or loop.time() >= deadline:
+                return record
+            await asyncio.sleep(min(delay, max(0.0, deadline - loop.time())))
+            delay = min(delay * 2, 0.5)
+
+    async def status(self) -> dict:
+        queued, running = {}, {}
+        for retailer in self.retailers:
+            queued[retailer] = await self.redis.execute("LLEN", self._key("queue", retailer))
+            running[retailer] = await self.redis.execute("ZCARD", self._key("running", retailer))
+        return {
+            "backend": self.name,
+            "queued": queued,
+            "running": running,
+            "delayed": await self.redis.execute("ZCARD", self._key("delayed")),
+        }
+
+    async def close(self):
+        await self.redis.close()
+
+
+def create_job_queue(spec: str = JOB_QUEUE):
+    if spec == "memory":
+        return MemoryJobQueue()
+    if spec.startswith(("redis://", "rediss://", "valkey://")):
+        return RedisJobQueue(spec)
+    raise ValueError(f"Unknown SEEKLY_JOB_QUEUE backend: {spec}")
+
+
+class JobWorker:
+    """Claims jobs and runs `handler(url)` for each, `concurrency` at a time.
+
+    A handler raising PermanentJobError or ValueError fails the job at
+    once; any other error or a run longer than SEEKLY_JOB_TIMEOUT is
+    retried with backoff. The job's lease is renewed while it runs.
+    """
+
+    def __init__(self, queue, handler, concurrency: int = JOB_WORKERS):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self._tasks = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self):
+        while True:
+            try:
+                record = await self.queue.claim(timeout=1.0)
+                if record is not None:
+                    await self._run(record)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Queue backend trouble, back off instead of spinning
+                print(f"Job queue error: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _heartbeat(self, record: dict):
+        while True:
+            await asyncio.sleep(JOB_LEASE / 3)
+            try:
+                await self.queue.renew(record)
+            except Exception as e:
+                print(f"Could not renew job {record['id']}: {e}")
+
+    async def _run(self, record: dict):
+        retailer = record["retailer"]
+        try:
+            heartbeat = asyncio.create_task(self._heartbeat(record))
+            try:
+                with stage(retailer, "job"):
+                    async with asyncio.timeout(JOB_TIMEOUT):
+                        result = await self.handler(record["url"])
+            finally:
+                heartbeat.cancel()
+        except (PermanentJobError, ValueError) as e:
+            JOBS.inc(retailer=retailer, outcome="failed")
+            await self.queue.fail(record, str(e), retry=False)
+        except Exception as e:
+            retry = record["attempts"] < MAX_ATTEMPTS
+            JOBS.inc(retailer=retailer, outcome="retried" if retry else "failed")
+            await self.queue.fail(record, str(e) or type(e).__name__, retry=retry)
+        else:
+            JOBS.inc(retailer=retailer, outcome="done")
+            await self.queue.finish(record, result)
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass(slots=True)
+class Listing:
+    """One search result as every provider emits it.
+
+    Slotted, so a listing is a fixed-size object rather than a dict, and
+    serialized straight to JSON by lib.serialize.
+    """
+
+    retailer: str
+    title: str
+    price: str
+    currency: str
+    url: str
+    image: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Listing":
+        return cls(**{name: data.get(name) for name in FIELDS})
+
+
+FIELDS = tuple(field.name for field in fields(Listing))
@@ -0,0 +1,213 @@
+"""In-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain dicts behind a lock, cheap enough to
+update from hot paths and from executor threads. `stage()` times one step
+of a scrape into a histogram and, while a request opted into it, into
+that request's Server-Timing header.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds, sized for everything from a parse (ms) to a browser fallback (tens of s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Send Server-Timing on every response, otherwise only when asked for
+SERVER_TIMING = os.getenv("SEEKLY_SERVER_TIMING", "0") == "1"
+SERVER_TIMING_REQUEST_HEADER = b"x-server-timing"
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_label_text(self.labels, key)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_label_text(self.labels, key, le)} {values[-1]}"
+            yield f"{self.name}_sum{_label_text(self.labels, key)} {values[-2]}"
+            yield f"{self.name}_count{_label_text(self.labels, key)} {values[-1]}"
+
+
+REQUEST_SECONDS = Histogram(
+    "seekly_request_seconds", "API request latency", ("route", "status"))
+STAGE_SECONDS = Histogram(
+    "seekly_stage_seconds", "Time spent in one step of a scrape", ("provider", "stage"))
+PROVIDER_ATTEMPTS = Counter(
+    "seekly_provider_attempts_total", "Scrape attempts per provider engine and outcome",
+    ("provider", "engine", "outcome"))
+ITEMS_EXTRACTED = Counter(
+    "seekly_items_extracted_total", "Listings extracted per provider engine", ("provider", "engine"))
+UPSTREAM_BYTES = Counter(
+    "seekly_upstream_bytes_total", "Response body bytes fetched from upstreams", ("host",))
+CACHE_LOOKUPS = Counter(
+    "seekly_cache_lookups_total", "Result cache lookups by outcome", ("status",))
+JOBS = Counter(
+    "seekly_jobs_total", "Scrape job runs by outcome (done, retried, failed)", ("retailer", "outcome"))
+PAGE_CACHE = Counter(
+    "seekly_page_cache_total", "Page fetches by revalidation outcome (new, changed, unchanged, not_modified)",
+    ("provider", "outcome"))
+
+
+class ServerTiming:
+    """Per-request stage totals rendered as a Server-Timing header"""
+
+    __slots__ = ("_totals", "_lock")
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            total, count = self._totals.get(name, (0.0, 0))
+            self._totals[name] = (total + seconds, count + 1)
+
+    def header(self) -> str:
+        with self._lock:
+            totals = list(self._totals.items())
+        return ", ".join(
+            f'{name};dur={total * 1000:.1f};desc="x{count}"' if count > 1 else f"{name};dur={total * 1000:.1f}"
+            for name, (total, count) in totals
+        )
+
+
+_server_timing = ContextVar("seekly_server_timing", default=None)
+
+
+@contextmanager
+def stage(provider: str, name: str):
+    """Time one scrape stage, e.g. `with stage("olx", "parse"):`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, provider=provider, stage=name)
+        timing = _server_timing.get()
+        if timing is not None:
+            timing.add(f"{provider}-{name}", elapsed)
+
+
+def record_attempt(provider: str, engine: str, outcome: str, items: int = 0):
+    """Count one engine attempt ("ok", "empty", "error") and what it produced"""
+    PROVIDER_ATTEMPTS.inc(provider=provider, engine=engine, outcome=outcome)
+    if items:
+        ITEMS_EXTRACTED.inc(items, provider=provider, engine=engine)
+
+
+def render_metrics(extra_lines=()) -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every request per route.
+
+    Adds a Server-Timing header with the request's scrape stages when
+    SEEKLY_SERVER_TIMING=1 or the client sends `X-Server-Timing: 1`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timing = None
+        if SERVER_TIMING or dict(scope["headers"]).get(SERVER_TIMING_REQUEST_HEADER) == b"1":
+            timing = ServerTiming()
+        token = _server_timing.set(timing)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timing is not None:
+                    timing.add("app", time.perf_counter() - started)
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", timing.header().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _server_timing.reset(token)
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
@@ -0,0 +1,203 @@
+"""Raw-page cache with HTTP revalidation for the httpx providers.
+
+Every parsed search page is kept in SQLite with its validators (ETag,
+Last-Modified), a hash of the body, the body itself (zlib-compressed) and
+the parser's output. The next fetch of that URL is conditional; a 304, or
+a 200 whose body hashes the same, reuses the stored output instead of
+parsing again. The body is kept so a page can be re-parsed after the
+parser changes without going upstream.
+
+The cache lives in memory per process unless SEEKLY_PAGE_CACHE_DB points
+it at a file, so keeping pages on disk is opt-in; an empty value turns it
+off. It is opened on first use, not at import.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from lib.executor import run_blocking
+from lib.http import fetch
+from lib.metrics import PAGE_CACHE, stage
+from lib.parse_pool import parse
+from lib.urls import retailer_for_url
+
+PAGE_CACHE_PATH = os.getenv("SEEKLY_PAGE_CACHE_DB", ":memory:")
+MAX_PAGES = int(os.getenv("SEEKLY_PAGE_CACHE_MAX_PAGES", "2000"))
+COMPRESS_LEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    digest BLOB NOT NULL,
+    body BLOB NOT NULL,
+    parser TEXT NOT NULL,
+    parsed TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_stored_at ON pages (stored_at);
+"""
+
+
+def _encode(parsed) -> str:
+    return json.dumps(parsed, ensure_ascii=False, separators=(",", ":"))
+
+
+class _Page:
+    __slots__ = ("etag", "last_modified", "digest", "body", "parser", "parsed")
+
+    def __init__(self, etag, last_modified, digest, body, parser, parsed):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.body = body
+        self.parser = parser
+        self.parsed = parsed
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    def __init__(self, path: str = PAGE_CACHE_PATH, max_pages: int = MAX_PAGES):
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self._writes = 0
+
+    def get(self, url: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, digest, body, parser, parsed FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        return None if row is None else _Page(*row)
+
+    def put(self, url: str, response, digest: bytes, parser: str, parsed):
+        body = zlib.compress(response.content, COMPRESS_LEVEL)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 digest, body, parser, _encode(parsed), time.time()),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune()
+            self._db.commit()
+
+    def touch(self, url: str, response):
+        """Keep the stored page, taking any new validators the response sent"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+                "stored_at = ? WHERE url = ?",
+                (response.headers.get("ETag"), response.headers.get("Last-Modified"), time.time(), url),
+            )
+            self._db.commit()
+
+    def reparsed(self, url: str, parser: str, parsed):
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET parser = ?, parsed = ? WHERE url = ?", (parser, _encode(parsed), url)
+            )
+            self._db.commit()
+
+    def _prune(self):
+        self._db.execute(
+            "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_pages,),
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """The shared PageCache, None when SEEKLY_PAGE_CACHE_DB is empty"""
+    global _page_cache
+    if _page_cache is None and PAGE_CACHE_PATH:
+        with _page_cache_lock:
+            if _page_cache is None:
+                _page_cache = PageCache()
+    return _page_cache
+
+
+def _parser_name(parser) -> str:
+    return f"{parser.__module__}.{parser.__qualname__}"
+
+
+async def fetch_parsed(url: str, parser, *args, headers: dict = None):
+    """Fetch `url` and return `parser(body, *args)`, run through the parse pool.
+
+    With the page cache on, the request carries the stored validators and
+    an unchanged page (304 or same body hash) returns the stored result
+    without parsing. `parser` must return JSON-serializable data; what
+    comes back from the cache is that data after a JSON round trip.
+    """
+    retailer = retailer_for_url(url)
+    page_cache = get_page_cache()
+    if page_cache is None:
+        response = await fetch(url, headers=headers)
+        response.raise_for_status()
+        with stage(retailer, "parse"):
+            return await parse(parser, response.content, *args)
+
+    name = _parser_name(parser)
+    cached = await run_blocking(page_cache.get, url)
+    if cached is not None:
+        headers = {**(headers or {}), **cached.validators()}
+
+    response = await fetch(url, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        PAGE_CACHE.inc(provider=retailer, outcome="not_modified")
+        await run_blocking(page_cache.touch, url, response)
+        return await _reuse(page_cache, url, cached, name, parser, args)
+    response.raise_for_status()
+
+    digest = hashlib.blake2b(response.content, digest_size=16).digest()
+    if cached is not None and cached.digest == digest:
+        PAGE_CACHE.inc(provider=retailer, outcome="unchanged")
+        await run_blocking(page_cache.touch, url, response)
+        return await _reuse(page_cache, url, cached, name, parser, args)
+
+    PAGE_CACHE.inc(provider=retailer, outcome="changed" if cached is not None else "new")
+    with stage(retailer, "parse"):
+        parsed = await parse(parser, response.content, *args)
+    await run_blocking(page_cache.put, url, response, digest, name, parsed)
+    return parsed
+
+
+async def _reuse(page_cache: PageCache, url: str, cached: _Page, name: str, parser, args):
+    if cached.parser == name:
+        with stage(retailer_for_url(url), "page_cache"):
+            return json.loads(cached.parsed)
+    # Stored under another parser, parse the stored body instead of refetching
+    with stage(retailer_for_url(url), "parse"):
+        parsed = await parse(parser, zlib.decompress(cached.body), *args)
+    await run_blocking(page_cache.reparsed, url, name, parsed)
+    return parsed
+
+
+def close():
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is not None:
+            _page_cache.close()
+            _page_cache = None
@@ -0,0 +1,120 @@
+"""Cursor pagination and field projection for result endpoints.
+
+A response asked for with `limit` returns its first page and parks the
+full result list in memory under a random id. The opaque cursor it hands
+out (set id, offset and page size) serves the following pages from that
+list, so paging through a search never scrapes again. Result sets expire
+after SEEKLY_RESULT_SET_TTL seconds and the least recently used are
+dropped beyond SEEKLY_RESULT_SETS.
+"""
+import base64
+import os
+import secrets
+import time
+from collections import OrderedDict
+
+from lib.listing import FIELDS
+
+RESULT_SET_TTL = float(os.getenv("SEEKLY_RESULT_SET_TTL", "900"))
+MAX_RESULT_SETS = int(os.getenv("SEEKLY_RESULT_SETS", "256"))
+
+
+class CursorError(ValueError):
+    pass
+
+
+class CursorExpired(LookupError):
+    pass
+
+
+class ResultSets:
+    """Result lists (with their response metadata) kept for cursor paging"""
+
+    def __init__(self, ttl: float = RESULT_SET_TTL, max_sets: int = MAX_RESULT_SETS):
+        self.ttl = ttl
+        self.max_sets = max_sets
+        self._sets = OrderedDict()  # id -> (items, meta, expires_at)
+
+    def add(self, items, meta: dict) -> str:
+        set_id = secrets.token_urlsafe(9)
+        self._sets[set_id] = (items, meta, time.monotonic() + self.ttl)
+        while len(self._sets) > self.max_sets:
+            self._sets.popitem(last=False)
+        return set_id
+
+    def get(self, set_id: str):
+        found = self._sets.get(set_id)
+        if found is None or found[2] < time.monotonic():
+            self._sets.pop(set_id, None)
+            return None
+        self._sets.move_to_end(set_id)
+        return found[0], found[1]
+
+
+result_sets = ResultSets()
+
+
+def encode_cursor(set_id: str, offset: int, limit: int) -> str:
+    return base64.urlsafe_b64encode(f"{set_id}:{offset}:{limit}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        set_id, offset, limit = raw.rsplit(":", 2)
+        offset, limit = int(offset), int(limit)
+    except ValueError:
+        raise CursorError("Malformed cursor")
+    # A zero page size would hand back the same cursor forever
+    if offset < 0 or limit < 1:
+        raise CursorError("Malformed cursor")
+    return set_id, offset, limit
+
+
+def parse_fields(fields: str):
+    """`fields=title,price` -> ("title", "price"), None for every field"""
+    if not fields:
+        return None
+    wanted = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in wanted if name not in FIELDS]
+    if unknown:
+        raise CursorError(f"Unknown fields: {', '.join(unknown)} (choose from {', '.join(FIELDS)})")
+    return wanted or None
+
+
+def project(items, fields):
+    if not fields:
+        return items
+    return [
+        {name: item.get(name) for name in fields} if isinstance(item, dict)
+        else {name: getattr(item, name) for name in fields}
+        for item in items
+    ]
+
+
+def paginate(payload: dict, limit: int = None, fields=None) -> dict:
+    """First page of a response's `data`, with a cursor when more remain"""
+    items = payload["data"]
+    next_cursor = None
+    if limit is not None and len(items) > limit:
+        meta = {key: value for key, value in payload.items() if key != "data"}
+        next_cursor = encode_cursor(result_sets.add(items, meta), limit, limit)
+        page = items[:limit]
+    else:
+        page = items
+    return {**payload, "data": project(page, fields), "count": len(page), "total": len(items),
+            "next_cursor": next_cursor}
+
+
+def resume(cursor: str, limit: int = None, fields=None) -> dict:
+    """The page a cursor points at, raises CursorExpired once its set is gone"""
+    set_id, offset, page_size = decode_cursor(cursor)
+    found = result_sets.get(set_id)
+    if found is None:
+        raise CursorExpired("Cursor expired, repeat the search")
+    items, meta = found
+    limit = limit or page_size
+    page = items[offset:offset + limit]
+    end = offset + len(page)
+    return {**meta, "data": project(page, fields), "count": len(page), "total": len(items),
+            "next_cursor": encode_cursor(set_id, end, limit) if end < len(items) else None}
@@ -0,0 +1,100 @@
+"""Optional process pool for CPU-bound HTML parsing.
+
+With SEEKLY_PARSE_WORKERS=0 (the default) everything parses inline. With
+workers, fetchers hand the raw response bytes to a worker process, which
+parses and extracts there and sends back compact records (one plain
+tuple per listing) instead of a DOM or pickled objects.
+While fewer than SEEKLY_PARSE_INLINE_BELOW parses are in flight, parsing
+stays inline anyway, since a lightly loaded process gains nothing from
+the round trip.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from lib.listing import Listing
+
+PARSE_WORKERS = int(os.getenv("SEEKLY_PARSE_WORKERS", "0"))
+INLINE_BELOW = int(os.getenv("SEEKLY_PARSE_INLINE_BELOW", "1"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_inflight = 0
+_inflight_lock = threading.Lock()
+
+
+def _warm_up():
+    # Compile the extraction plans once per worker, not on its first job
+    import providers.schemas  # noqa: F401
+
+
+def get_pool():
+    global _pool
+    if _pool is None and PARSE_WORKERS > 0:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the parent runs threads and holds sockets
+                _pool = ProcessPoolExecutor(
+                    max_workers=PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+    return _pool
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def pack(items) -> list:
+    """Listings -> value tuples, a much smaller pickle than the objects"""
+    return [item.as_tuple() for item in items]
+
+
+def unpack(packed) -> list:
+    return [Listing(*row) for row in packed]
+
+
+def _claim() -> bool:
+    """Reserve a parse slot, True when the work should go to the pool"""
+    global _inflight
+    with _inflight_lock:
+        _inflight += 1
+        return get_pool() is not None and _inflight > INLINE_BELOW
+
+
+def _release():
+    global _inflight
+    with _inflight_lock:
+        _inflight -= 1
+
+
+async def parse(func, *args):
+    """Run `func(*args)` in a parse worker, or inline when that doesn't pay off.
+
+    `func` must be a picklable module-level function, ideally returning
+    pack()ed records.
+    """
+    try:
+        if _claim():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_pool(), func, *args)
+        return func(*args)
+    finally:
+        _release()
+
+
+def parse_blocking(func, *args):
+    """parse() for callers already on a worker thread (Selenium)"""
+    try:
+        if _claim():
+            return get_pool().submit(func, *args).result()
+        return func(*args)
+    finally:
+        _release()
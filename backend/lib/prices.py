@@ -0,0 +1,32 @@
+import re
+from typing import Optional
+
+# "Rs 12.50 Lacs", "PKR 1,250,000", "Rs. 1.2 crore", "3.5 million"
+_PRICE = re.compile(
+    r"(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|lacs?|crores?|cr|arab|thousand|k|million|mn|m)?\b",
+    re.IGNORECASE,
+)
+
+UNITS = {
+    "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5,
+    "crore": 1e7, "crores": 1e7, "cr": 1e7,
+    "arab": 1e9,
+    "thousand": 1e3, "k": 1e3,
+    "million": 1e6, "mn": 1e6, "m": 1e6,
+}
+
+
+def parse_price(price) -> Optional[float]:
+    """Numeric rupee amount of a display price, None when there is none"""
+    if isinstance(price, (int, float)):
+        return float(price)
+    if not price:
+        return None
+    match = _PRICE.search(str(price))
+    if match is None:
+        return None
+    amount = float(match.group("amount").replace(",", ""))
+    unit = match.group("unit")
+    if unit:
+        amount *= UNITS[unit.lower()]
+    return amount
@@ -0,0 +1,205 @@
+"""On-demand sampling profiler for slow requests.
+
+While enabled, a fraction (SEEKLY_PROFILE_RATE) of requests to the
+profiled paths (SEEKLY_PROFILE_PATHS, /scrape and /search by default) is
+sampled: a background thread snapshots every thread's Python stack each
+SEEKLY_PROFILE_INTERVAL_MS, so blocking work on the executor (Selenium
+waits, parsing) shows up next to the event loop's. Profiles of requests
+slower than SEEKLY_PROFILE_SLOW_MS are kept in a ring buffer of
+SEEKLY_PROFILE_KEEP and served as collapsed stacks, the input of
+flamegraph.pl, speedscope and most flame graph viewers.
+
+Samples cover the whole process, so a profile taken while other requests
+ran includes their work too. When disabled the middleware only checks a
+flag and no thread runs.
+"""
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+ENABLED = os.getenv("SEEKLY_PROFILE", "0") == "1"
+SAMPLE_RATE = float(os.getenv("SEEKLY_PROFILE_RATE", "0.1"))
+SLOW_MS = float(os.getenv("SEEKLY_PROFILE_SLOW_MS", "1000"))
+INTERVAL_MS = float(os.getenv("SEEKLY_PROFILE_INTERVAL_MS", "10"))
+KEEP = int(os.getenv("SEEKLY_PROFILE_KEEP", "20"))
+PATHS = tuple(path.strip() for path in os.getenv("SEEKLY_PROFILE_PATHS", "/scrape,/search").split(",") if path.strip())
+MAX_DEPTH = 128
+
+# Idle pool workers blocked on their work queue are not worth a sample:
+# concurrent.futures workers wait in C right inside _worker, others in
+# queue.Queue.get
+_IDLE_FRAMES = {("_worker", "thread.py")}
+_IDLE_WAIT = (("wait", "threading.py"), ("get", "queue.py"))
+
+
+def _where(frame):
+    return frame.f_code.co_name, os.path.basename(frame.f_code.co_filename)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame, thread_name: str):
+    """One stack as "thread;outermost;...;innermost", None for an idle worker"""
+    leaf = _where(frame)
+    if leaf in _IDLE_FRAMES or (leaf == _IDLE_WAIT[0] and frame.f_back and _where(frame.f_back) == _IDLE_WAIT[1]):
+        return None
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class Profile:
+    __slots__ = ("id", "method", "path", "query", "status", "started_at", "duration_ms", "samples", "stacks")
+
+    def __init__(self, profile_id: int, method: str, path: str, query: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.query = query
+        self.status = None
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.samples = 0
+        self.stacks = Counter()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Samples stacks while at least one profiled request is in flight"""
+
+    def __init__(self, enabled: bool = ENABLED, rate: float = SAMPLE_RATE, slow_ms: float = SLOW_MS,
+                 interval_ms: float = INTERVAL_MS, keep: int = KEEP, paths=PATHS):
+        self.enabled = enabled
+        self.rate = rate
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.paths = paths
+        self.captured = deque(maxlen=keep)
+        self.profiled = 0
+        self._ids = itertools.count(1)
+        self._active = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def configure(self, enabled: bool = None, rate: float = None, slow_ms: float = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if rate is not None:
+            self.rate = rate
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+
+    def wants(self, path: str) -> bool:
+        return path.startswith(self.paths) and random.random() < self.rate
+
+    def begin(self, method: str, path: str, query: str) -> Profile:
+        profile = Profile(next(self._ids), method, path, query)
+        with self._lock:
+            self._active.add(profile)
+            self.profiled += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="seekly-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def end(self, profile: Profile, duration_ms: float, status: int):
+        profile.duration_ms = round(duration_ms, 1)
+        profile.status = status
+        with self._lock:
+            self._active.discard(profile)
+            if duration_ms >= self.slow_ms:
+                self.captured.append(profile)
+
+    def _sample(self):
+        own = threading.get_ident()
+        interval = self.interval_ms / 1000
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                collapse(frame, names.get(ident, str(ident)))
+                for ident, frame in sys._current_frames().items()
+                if ident != own
+            ]
+            stacks = [stack for stack in stacks if stack]
+            with self._lock:
+                if not self._active:
+                    # The next begin() starts a fresh thread
+                    self._thread = None
+                    return
+                # Under the lock, so a profile is never touched once end() returned
+                for profile in self._active:
+                    profile.samples += 1
+                    profile.stacks.update(stacks)
+            time.sleep(interval)
+
+    def get(self, profile_id: int):
+        return next((profile for profile in self.captured if profile.id == profile_id), None)
+
+    def clear(self):
+        self.captured.clear()
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval_ms,
+            "paths": list(self.paths),
+            "profiled": self.profiled,
+            "in_flight": len(self._active),
+            "captured": [profile.summary() for profile in reversed(self.captured)],
+        }
+
+
+profiler = Profiler()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling a sampled fraction of requests while the profiler is on"""
+
+    def __init__(self, app, profiler: Profiler = profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.enabled or scope["type"] != "http" or not self.profiler.wants(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        profile = self.profiler.begin(scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1"))
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.end(profile, (time.perf_counter() - started) * 1000, status)
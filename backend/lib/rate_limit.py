@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+# host -> (requests per second, burst)
+HOST_RATES = {
+    "www.olx.com.pk": (4.0, 4),
+    "www.pakwheels.com": (2.0, 2),
+    "www.daraz.pk": (4.0, 4),
+}
+DEFAULT_RATE = (5.0, 5)
+
+# Backoff never drops a host below this fraction of its base rate
+MIN_RATE_FACTOR = 0.1
+RECOVERY_FACTOR = 1.1
+
+
+class TokenBucket:
+    """Token bucket that halves its rate on throttling and slowly recovers.
+
+    Callers reserve a token up front and sleep for however long the
+    reservation says, so concurrent callers are spaced out instead of
+    retrying in a tight loop. Works from both threads and coroutines.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, retry_after: float = None):
+        """Upstream pushed back (429/5xx): halve the rate and pause the host"""
+        with self._lock:
+            self.rate = max(self.base_rate * MIN_RATE_FACTOR, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+
+    def reward(self):
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate * RECOVERY_FACTOR)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def limiter_for(host: str) -> TokenBucket:
+    bucket = _buckets.get(host)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(host)
+            if bucket is None:
+                bucket = _buckets[host] = TokenBucket(*HOST_RATES.get(host, DEFAULT_RATE))
+    return bucket
+
+
+def observe_status(host: str, status_code: int, retry_after: str = None):
+    """Feed a response status back into the host's limiter"""
+    bucket = limiter_for(host)
+    if status_code == 429 or status_code >= 500:
+        try:
+            delay = float(retry_after) if retry_after else None
+        except ValueError:
+            delay = None
+        bucket.penalize(delay)
+    else:
+        bucket.reward()
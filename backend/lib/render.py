@@ -0,0 +1,218 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from lib.metrics import stage
+
+# Resources a scraper never needs, dropped before they hit the network
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "scorecardresearch.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "analytics.tiktok.com",
+)
+# The same list as Chrome DevTools URL patterns, for Selenium sessions
+BLOCKED_URL_PATTERNS = [f"*{domain}*" for domain in BLOCKED_DOMAINS] + [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm", "*.m3u8",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif",
+]
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+RENDER_TIMEOUT_MS = int(os.getenv("SEEKLY_RENDER_TIMEOUT_MS", "30000"))
+# Contexts kept open on the shared browser, each rendering one page at a time
+RENDER_CONTEXTS = int(os.getenv("SEEKLY_RENDER_CONTEXTS", "4"))
+# Pages a context renders before it is replaced, bounding cookie and cache growth
+CONTEXT_MAX_USES = int(os.getenv("SEEKLY_RENDER_CONTEXT_USES", "50"))
+
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+
+def is_blocked(url: str, resource_type: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).netloc
+    return any(host == domain or host.endswith("." + domain) for domain in BLOCKED_DOMAINS)
+
+
+async def _route(route):
+    request = route.request
+    if is_blocked(request.url, request.resource_type):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def get_browser():
+    """Launch the shared headless Chromium on first use"""
+    global _playwright, _browser
+    if _browser is None or not _browser.is_connected():
+        async with _browser_lock:
+            if _browser is None or not _browser.is_connected():
+                from playwright.async_api import async_playwright
+                if _playwright is None:
+                    _playwright = await async_playwright().start()
+                with stage("browser", "launch"):
+                    _browser = await _playwright.chromium.launch(headless=True)
+    return _browser
+
+
+async def close_browser():
+    global _playwright, _browser
+    await context_pool.close()
+    if _browser is not None:
+        await _browser.close()
+        _browser = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+
+
+async def new_context(browser=None):
+    """Isolated browser context with heavy resources blocked"""
+    browser = browser or await get_browser()
+    context = await browser.new_context(user_agent=USER_AGENT, service_workers="block")
+    await context.route("**/*", _route)
+    return context
+
+
+class NavigationBlocked(Exception):
+    pass
+
+
+async def _guard_navigation(page, allow_navigation, blocked: list):
+    """Abort top-level navigations (redirects included) to URLs `allow_navigation` refuses"""
+
+    async def guard(route):
+        request = route.request
+        if request.is_navigation_request() and request.frame == page.main_frame and not allow_navigation(request.url):
+            blocked.append(request.url)
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    await page.route("**/*", guard)
+
+
+async def render_in_context(context, url: str, wait_selector: str = None, timeout: int = RENDER_TIMEOUT_MS,
+                            allow_navigation=None) -> str:
+    """Load `url` in a fresh page of `context` and return its HTML.
+
+    The snapshot is taken as soon as `wait_selector` is attached to the
+    DOM, or once the network goes idle when no selector is given. Hitting
+    the timeout still returns whatever has rendered. With
+    `allow_navigation`, the page may only navigate to URLs it accepts;
+    anything else raises NavigationBlocked.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    page = await context.new_page()
+    blocked = []
+    try:
+        if allow_navigation is not None:
+            await _guard_navigation(page, allow_navigation, blocked)
+        try:
+            with stage("browser", "navigation"):
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        except Exception:
+            if blocked:
+                raise NavigationBlocked(f"Navigation to {blocked[0]} blocked")
+            raise
+        try:
+            with stage("browser", "wait"):
+                if wait_selector:
+                    await page.wait_for_selector(wait_selector, state="attached", timeout=timeout)
+                else:
+                    await page.wait_for_load_state("networkidle", timeout=timeout)
+        except PlaywrightTimeoutError:
+            print(f"Render wait timed out for {url}, using partial page")
+        if blocked or (allow_navigation is not None and not allow_navigation(page.url)):
+            raise NavigationBlocked(f"Navigation to {blocked[0] if blocked else page.url} blocked")
+        return await page.content()
+    finally:
+        await page.close()
+
+
+class ContextPool:
+    """Isolated contexts on the shared browser, reused across renders.
+
+    At most `size` pages render at once, one per checked-out context;
+    further renders wait for a context to come back. A context that
+    failed a render is closed rather than reused.
+    """
+
+    def __init__(self, size: int = RENDER_CONTEXTS, max_uses: int = CONTEXT_MAX_USES):
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = []  # (context, uses)
+        self._slots = asyncio.Semaphore(size)
+        self._in_use = 0
+
+    @asynccontextmanager
+    async def context(self):
+        async with self._slots:
+            context, uses = None, 0
+            while self._idle:
+                context, uses = self._idle.pop()
+                if context.browser is not None and context.browser.is_connected():
+                    break
+                context = None
+            if context is None:
+                with stage("browser", "context"):
+                    context, uses = await new_context(), 0
+            self._in_use += 1
+            try:
+                yield context
+            except BaseException:
+                await _close_quietly(context)
+                raise
+            else:
+                if uses + 1 >= self.max_uses:
+                    await _close_quietly(context)
+                else:
+                    self._idle.append((context, uses + 1))
+            finally:
+                self._in_use -= 1
+
+    async def render(self, url: str, wait_selector: str = None, timeout: int = RENDER_TIMEOUT_MS,
+                     allow_navigation=None) -> str:
+        async with self.context() as context:
+            return await render_in_context(context, url, wait_selector, timeout, allow_navigation)
+
+    def status(self) -> dict:
+        return {"size": self.size, "idle": len(self._idle), "in_use": self._in_use}
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for context, _ in idle:
+            await _close_quietly(context)
+
+
+async def _close_quietly(context):
+    try:
+        await context.close()
+    except Exception as e:
+        print(f"Could not close browser context: {e}")
+
+
+context_pool = ContextPool()
+
+
+async def render(url: str, wait_selector: str = None, timeout: int = RENDER_TIMEOUT_MS,
+                 allow_navigation=None) -> str:
+    """Render `url` in a pooled context on the shared browser"""
+    return await context_pool.render(url, wait_selector, timeout, allow_navigation)
@@ -0,0 +1,97 @@
+"""Minimal asyncio Redis (RESP2) client.
+
+Covers the handful of commands the job queue sends, with no dependency,
+so the queue runs against Redis, Valkey, KeyDB or the bench stand-in
+alike. Connections are pooled; a blocking command (BRPOP) simply holds
+its connection until it returns.
+"""
+import asyncio
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    pass
+
+
+def _encode(args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        elif isinstance(arg, float):
+            data = repr(arg).encode()
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Redis closed the connection")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise RespError(f"Unexpected reply: {line!r}")
+
+
+class RespClient:
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", max_connections: int = 32):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        for command in ((("AUTH", self.password),) if self.password else ()) + ((("SELECT", self.db),) if self.db else ()):
+            writer.write(_encode(command))
+            await writer.drain()
+            reply = await _read_reply(reader)
+            if isinstance(reply, RespError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    async def execute(self, *args):
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            reader, writer = connection
+            try:
+                writer.write(_encode(args))
+                await writer.drain()
+                reply = await _read_reply(reader)
+            except BaseException:
+                # A half-read reply leaves the stream unusable
+                writer.close()
+                raise
+            self._idle.append(connection)
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
@@ -0,0 +1,273 @@
+"""Declarative listing schemas compiled into single-pass extraction plans.
+
+A Schema names the listing container and, per output field, a CSS
+selector, the attribute to read (text when None), a post-processor and a
+default. Compiling it parses every selector once; the resulting plan
+walks each card's subtree a single time, resolving all fields as their
+first match goes by and stopping as soon as every field is found.
+
+Each field resolves to the node HTMLParser.css_first returns. With
+comma-separated alternatives that is the first alternative matching
+anywhere in the card, not the first match in document order: the Modest
+engine behind HTMLParser returns each alternative's matches in turn, and
+the plan ranks matches the same way.
+
+Supported selector syntax is the subset our retailers need: tag names,
+.class, [attr], [attr=v], [attr*=v], [attr^=v], [attr$=v], [attr~=v],
+descendant combinators and comma-separated alternatives.
+"""
+import re
+
+from selectolax.parser import HTMLParser
+
+_COMPOUND = re.compile(r"""
+    (?P<tag>[a-zA-Z][\w-]*|\*)?
+    (?P<rest>(?:\.[\w-]+|\[[^\]]+\])*)
+""", re.VERBOSE)
+_PART = re.compile(r"""\.([\w-]+)|\[\s*([\w:-]+)\s*(?:([*^$~]?=)\s*(?:"([^"]*)"|'([^']*)'|([^\]\s]+)))?\s*\]""")
+
+
+class SelectorError(ValueError):
+    pass
+
+
+class _Compound:
+    __slots__ = ("tag", "classes", "attrs")
+
+    def __init__(self, text: str):
+        match = _COMPOUND.fullmatch(text)
+        if not match or not text:
+            raise SelectorError(f"Unsupported selector part: {text!r}")
+        tag = match.group("tag")
+        self.tag = None if tag in (None, "*") else tag.lower()
+        self.classes = []
+        self.attrs = []
+        for cls, name, op, double, single, bare in _PART.findall(match.group("rest")):
+            if cls:
+                self.classes.append(cls)
+            else:
+                value = double or single or bare
+                self.attrs.append((name.lower(), op or None, value))
+
+    def matches(self, tag: str, attributes: dict) -> bool:
+        if self.tag is not None and tag != self.tag:
+            return False
+        if self.classes:
+            present = (attributes.get("class") or "").split()
+            if any(cls not in present for cls in self.classes):
+                return False
+        for name, op, value in self.attrs:
+            if name not in attributes:
+                return False
+            actual = attributes[name] or ""
+            if op is None:
+                continue
+            if op == "=" and actual != value:
+                return False
+            if op == "*=" and value not in actual:
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+            if op == "$=" and not actual.endswith(value):
+                return False
+            if op == "~=" and value not in actual.split():
+                return False
+        return True
+
+
+def _split_commas(selector: str):
+    parts, depth, current = [], 0, []
+    for char in selector:
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _split_spaces(selector: str):
+    parts, depth, current = [], 0, []
+    for char in selector:
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char.isspace() and depth == 0:
+            if current:
+                parts.append("".join(current))
+                current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def compile_selector(selector: str):
+    """Parse a selector into alternatives, each a list of compounds"""
+    alternatives = []
+    for alternative in _split_commas(selector):
+        parts = _split_spaces(alternative)
+        if any(part in (">", "+", "~") for part in parts):
+            raise SelectorError(f"Only descendant combinators are supported: {selector!r}")
+        alternatives.append([_Compound(part) for part in parts])
+    return alternatives
+
+
+def _matches_chain(node, chain, tag, attributes, root) -> bool:
+    """Does `node` match the descendant chain, looking no higher than root?"""
+    if not chain[-1].matches(tag, attributes):
+        return False
+    wanted = len(chain) - 2
+    ancestor = node.parent
+    while wanted >= 0 and ancestor is not None:
+        if chain[wanted].matches(ancestor.tag, ancestor.attributes):
+            wanted -= 1
+        if ancestor is root:
+            break
+        ancestor = ancestor.parent
+    return wanted < 0
+
+
+def _descendants(root):
+    """Element nodes under root in document order.
+
+    Node.traverse() keeps walking into the root's following siblings, so
+    the subtree is walked by hand.
+    """
+    stack = []
+    node = root.child
+    while node is not None or stack:
+        if node is None:
+            node = stack.pop()
+        sibling = node.next
+        if sibling is not None:
+            stack.append(sibling)
+        if node.tag[0] not in "-_":  # skip text and comment nodes
+            yield node
+        node = node.child
+
+
+def _text(node) -> str:
+    """Text of a node and its children, whitespace runs collapsed to one space"""
+    return " ".join(node.text().split())
+
+
+class Field:
+    """How to read one output field from a card"""
+
+    __slots__ = ("selector", "attr", "post", "default")
+
+    def __init__(self, selector: str, attr: str = None, post=None, default=None):
+        self.selector = selector
+        self.attr = attr
+        self.post = post
+        self.default = default
+
+
+class Schema:
+    """Per-retailer description of a listing card.
+
+    `static` values are copied into every record, and `record` (dict by
+    default) is called with the merged fields as keyword arguments.
+    `build`, when given, instead turns the extracted field dict into the
+    final record (or None to drop the card) for retailers whose output is
+    not a plain field mapping.
+    """
+
+    def __init__(self, name: str, container: str, fields: dict, static: dict = None, build=None, record=dict):
+        self.name = name
+        self.container = container
+        self.fields = fields
+        self.static = static or {}
+        self.build = build
+        self.record = record
+
+    def compile(self) -> "ExtractionPlan":
+        return ExtractionPlan(self)
+
+
+class ExtractionPlan:
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.container = schema.container
+        self._fields = []
+        # Rules are indexed by the tag their last compound requires so most
+        # nodes are rejected with one dict lookup
+        self._rules_by_tag = {}
+        self._untagged_rules = []
+        for index, (name, field) in enumerate(schema.fields.items()):
+            self._fields.append((name, field))
+            for order, chain in enumerate(compile_selector(field.selector)):
+                last = chain[-1]
+                # Attribute every candidate must carry, checked before full matching
+                required = last.attrs[0][0] if last.attrs else ("class" if last.classes else None)
+                rule = (index, order, chain, required)
+                if last.tag is None:
+                    self._untagged_rules.append(rule)
+                else:
+                    self._rules_by_tag.setdefault(last.tag, []).append(rule)
+
+    def _read(self, card) -> dict:
+        found = {}
+        # field index -> alternative order of the best match so far; a
+        # field is settled once its first alternative has matched
+        best = {}
+        remaining = len(self._fields)
+        rules_by_tag = self._rules_by_tag
+        untagged = self._untagged_rules
+        for node in _descendants(card):
+            tag = node.tag
+            rules = rules_by_tag.get(tag)
+            if rules is None and not untagged:
+                continue
+            attributes = node.attributes
+            for candidates in (rules, untagged):
+                if not candidates:
+                    continue
+                for index, order, chain, required in candidates:
+                    if index in best and best[index] <= order:
+                        continue
+                    if required is not None and required not in attributes:
+                        continue
+                    if not _matches_chain(node, chain, tag, attributes, card):
+                        continue
+                    name, field = self._fields[index]
+                    found[name] = _text(node) if field.attr is None else attributes.get(field.attr)
+                    best[index] = order
+                    if order == 0:
+                        remaining -= 1
+            if remaining == 0:
+                break
+        return found
+
+    def extract(self, card):
+        """Extract one record from a card node"""
+        try:
+            found = self._read(card)
+            values = {}
+            for name, field in self._fields:
+                value = found.get(name)
+                if value is not None and field.post is not None:
+                    value = field.post(value)
+                values[name] = field.default if value in (None, "") else value
+            if self.schema.build is not None:
+                return self.schema.build(values)
+            return self.schema.record(**self.schema.static, **values)
+        except Exception as e:
+            print(f"Error extracting {self.schema.name} item: {e}")
+            return None
+
+    def cards(self, page):
+        tree = HTMLParser(page) if isinstance(page, (str, bytes)) else page
+        return tree.css(self.container)
+
+    def extract_all(self, page):
+        """Extract every card on a page (HTML string or parsed tree)"""
+        return [record for record in map(self.extract, self.cards(page)) if record]
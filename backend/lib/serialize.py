@@ -0,0 +1,37 @@
+import json
+
+from fastapi.responses import Response
+
+from lib.listing import Listing
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is the fallback
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Listing):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """JSON bytes for API payloads, listings included"""
+    if orjson is not None:
+        # orjson serializes (slotted) dataclasses natively
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class JSONBytesResponse(Response):
+    """JSON response rendered with dumps(), skipping response_model validation.
+
+    Routes keep their response_model for the OpenAPI schema; FastAPI
+    sends a returned Response as is.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
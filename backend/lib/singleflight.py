@@ -0,0 +1,66 @@
+import asyncio
+
+
+class SingleFlight:
+    """Concurrent calls for the same key share one in-flight call.
+
+    The first caller for a key leads: it awaits the work and hands the
+    result or exception to everyone who joined meanwhile. Waiters join
+    through asyncio.shield, so a waiter going away never cancels the
+    leader's work. If the leader itself is cancelled, the next waiter
+    takes over the call.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __contains__(self, key) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def claim(self, key) -> asyncio.Future:
+        """Mark `key` in flight now, for a run(..., future=) started later (e.g. in a task)"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    async def run(self, key, func, *args, future: asyncio.Future = None):
+        """Lead the call for `key`: await func(*args) and share its outcome"""
+        if future is None:
+            future = self.claim(key)
+        try:
+            value = await func(*args)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures don't log "never retrieved"
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled (e.g. the client went away): release the waiters
+            future.cancel()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def do(self, key, func, *args):
+        """func(*args), or the result of the call already in flight for `key`.
+
+        Returns `(value, coalesced)`, coalesced being True when the value
+        came from another caller's call.
+        """
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self.run(key, func, *args), False
+            try:
+                return await asyncio.shield(inflight), True
+            except asyncio.CancelledError:
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The leader was cancelled, lead (or join whoever got there first)
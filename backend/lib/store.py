@@ -0,0 +1,287 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from lib.listing import FIELDS as _LISTING_FIELDS, Listing
+from lib.prices import parse_price
+from lib.urls import canonical_listing_url, normalize_url, retailer_for_url
+
+# Watches and crawled listings outlive restarts; ":memory:" keeps them per process
+STORE_PATH = os.getenv("SEEKLY_STORE_DB", "seekly_store.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    url TEXT PRIMARY KEY,
+    query TEXT,
+    priority INTEGER NOT NULL,
+    interval REAL NOT NULL,
+    max_pages INTEGER NOT NULL,
+    next_run REAL NOT NULL,
+    last_run REAL,
+    last_error TEXT,
+    last_new INTEGER
+);
+CREATE INDEX IF NOT EXISTS watches_query ON watches (query);
+CREATE TABLE IF NOT EXISTS listings (
+    key TEXT PRIMARY KEY,
+    retailer TEXT NOT NULL,
+    title TEXT NOT NULL,
+    price TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    url TEXT NOT NULL,
+    image TEXT,
+    price_value REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watch_listings (
+    watch_url TEXT NOT NULL,
+    key TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (watch_url, key)
+);
+"""
+
+# Title index kept in sync with `listings` by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+    title, content='listings', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS listings_fts_insert AFTER INSERT ON listings BEGIN
+    INSERT INTO listings_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS listings_fts_delete AFTER DELETE ON listings BEGIN
+    INSERT INTO listings_fts (listings_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS listings_fts_update AFTER UPDATE OF title ON listings BEGIN
+    INSERT INTO listings_fts (listings_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    INSERT INTO listings_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+"""
+
+_QUERY_FIELDS = _LISTING_FIELDS + ("price_value", "first_seen", "last_seen")
+_WATCH_FIELDS = ("url", "query", "priority", "interval", "max_pages", "next_run",
+                 "last_run", "last_error", "last_new")
+
+SORTS = {
+    "relevance": None,
+    "newest": "l.first_seen DESC",
+    "price_asc": "l.price_value IS NULL, l.price_value ASC",
+    "price_desc": "l.price_value IS NULL, l.price_value DESC",
+}
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_query(text: str) -> str:
+    """Every word must match, the last one as a prefix (type-ahead)"""
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+
+class ListingStore:
+    """SQLite store of scraped listings, watched searches and their crawls.
+
+    Listings are keyed by canonical URL, with a full-text title index and
+    a numeric price column for range queries.
+
+    All methods are blocking, call them through run_blocking from async code.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        indexed = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'listings_fts'"
+        ).fetchone()
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+            if not indexed:
+                self._db.execute("INSERT INTO listings_fts (listings_fts) VALUES ('rebuild')")
+            self.full_text = True
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5, keyword queries fall back to LIKE
+            print(f"Full-text index unavailable: {e}")
+            self.full_text = False
+        self._db.commit()
+
+    def _migrate(self):
+        """Bring stores created before the price index up to date"""
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(listings)")}
+        if "price_value" not in columns:
+            self._db.execute("ALTER TABLE listings ADD COLUMN price_value REAL")
+            rows = self._db.execute("SELECT key, price FROM listings").fetchall()
+            self._db.executemany(
+                "UPDATE listings SET price_value = ? WHERE key = ?",
+                [(parse_price(price), key) for key, price in rows],
+            )
+        self._db.executescript("""
+            CREATE INDEX IF NOT EXISTS listings_price ON listings (price_value);
+            CREATE INDEX IF NOT EXISTS listings_retailer ON listings (retailer COLLATE NOCASE, price_value);
+        """)
+
+    def add_watch(self, url: str, query: str = None, priority: int = 10,
+                  interval: float = 600, max_pages: int = 3) -> dict:
+        """Register (or update) a watched search URL, due immediately"""
+        url = normalize_url(url)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO watches (url, query, priority, interval, max_pages, next_run) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (url) DO UPDATE SET "
+                "query = excluded.query, priority = excluded.priority, "
+                "interval = excluded.interval, max_pages = excluded.max_pages",
+                (url, query, priority, interval, max_pages, time.time()),
+            )
+            self._db.commit()
+        return self.get_watch(url)
+
+    def remove_watch(self, url: str) -> bool:
+        url = normalize_url(url)
+        with self._lock:
+            removed = self._db.execute("DELETE FROM watches WHERE url = ?", (url,)).rowcount
+            self._db.execute("DELETE FROM watch_listings WHERE watch_url = ?", (url,))
+            self._db.commit()
+        return bool(removed)
+
+    def get_watch(self, url: str):
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(_WATCH_FIELDS)} FROM watches WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        return dict(zip(_WATCH_FIELDS, row)) if row else None
+
+    def list_watches(self, query: str = None) -> list:
+        sql = f"SELECT {', '.join(_WATCH_FIELDS)} FROM watches"
+        params = ()
+        if query is not None:
+            sql += " WHERE query = ?"
+            params = (query,)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY priority, next_run", params).fetchall()
+        return [dict(zip(_WATCH_FIELDS, row)) for row in rows]
+
+    def due_watches(self, now: float) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(_WATCH_FIELDS)} FROM watches WHERE next_run <= ? "
+                "ORDER BY priority, next_run", (now,)
+            ).fetchall()
+        return [dict(zip(_WATCH_FIELDS, row)) for row in rows]
+
+    def finish_run(self, url: str, next_run: float, new_count: int = 0, error: str = None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE watches SET last_run = ?, next_run = ?, last_new = ?, last_error = ? WHERE url = ?",
+                (time.time(), next_run, new_count, error, url),
+            )
+            self._db.commit()
+
+    def _upsert(self, items, now: float) -> list:
+        """Upsert listings by canonical URL, returns their keys. Caller holds the lock."""
+        rows = []
+        for item in items:
+            if not item or not item.url:
+                continue
+            record = {field: getattr(item, field) or "" for field in _LISTING_FIELDS}
+            record["retailer"] = record["retailer"] or retailer_for_url(record["url"])
+            record["image"] = record["image"] or None
+            rows.append((
+                canonical_listing_url(record["url"]),
+                *(record[f] for f in _LISTING_FIELDS),
+                parse_price(item.price),
+                now,
+                now,
+            ))
+        self._db.executemany(
+            "INSERT INTO listings (key, retailer, title, price, currency, url, image, price_value, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+            "title = excluded.title, price = excluded.price, currency = excluded.currency, "
+            "url = excluded.url, image = excluded.image, price_value = excluded.price_value, "
+            "last_seen = excluded.last_seen",
+            rows,
+        )
+        return [row[0] for row in rows]
+
+    def ingest(self, items) -> int:
+        """Upsert scraped items outside of any watch, returns how many were written"""
+        with self._lock:
+            keys = self._upsert(items, time.time())
+            self._db.commit()
+        return len(keys)
+
+    def save(self, watch_url: str, items) -> int:
+        """Upsert crawled items for a watch, returns how many were new to it"""
+        now = time.time()
+        with self._lock:
+            keys = self._upsert(items, now)
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO watch_listings (watch_url, key, first_seen) VALUES (?, ?, ?)",
+                [(watch_url, key, now) for key in keys],
+            )
+            new_count = self._db.total_changes - before
+            self._db.commit()
+        return new_count
+
+    def query(self, text: str = None, min_price: float = None, max_price: float = None,
+              retailer: str = None, sort: str = "relevance", limit: int = 50, offset: int = 0) -> list:
+        """Filter stored listings by keywords, price range and retailer"""
+        joins, where, params = [], [], []
+        match = _fts_query(text) if text else None
+        if match and self.full_text:
+            joins.append("JOIN listings_fts f ON f.rowid = l.rowid")
+            where.append("listings_fts MATCH ?")
+            params.append(match)
+        elif text:
+            for token in _TOKEN.findall(text) or [text]:
+                where.append("l.title LIKE ?")
+                params.append(f"%{token}%")
+        if min_price is not None:
+            where.append("l.price_value >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            where.append("l.price_value <= ?")
+            params.append(max_price)
+        if retailer:
+            where.append("l.retailer = ? COLLATE NOCASE")
+            params.append(retailer)
+
+        order = SORTS[sort]
+        if order is None:
+            order = "f.rank" if match and self.full_text else SORTS["newest"]
+        sql = (
+            f"SELECT {', '.join('l.' + f for f in _QUERY_FIELDS)} FROM listings l {' '.join(joins)}"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._db.execute(sql, (*params, limit, offset)).fetchall()
+        return [dict(zip(_QUERY_FIELDS, row)) for row in rows]
+
+    def results(self, watch_urls, limit: int = 200) -> list:
+        """Stored listings of the given watches, newest first"""
+        watch_urls = [normalize_url(url) for url in watch_urls]
+        if not watch_urls:
+            return []
+        placeholders = ", ".join("?" * len(watch_urls))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join('l.' + f for f in _LISTING_FIELDS)} FROM listings l "
+                f"JOIN (SELECT key, MAX(first_seen) AS seen, MIN(rowid) AS position FROM watch_listings "
+                f"WHERE watch_url IN ({placeholders}) GROUP BY key) w ON w.key = l.key "
+                "ORDER BY w.seen DESC, w.position LIMIT ?",
+                (*watch_urls, limit),
+            ).fetchall()
+        return [Listing(*row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,133 @@
+import time
+
+from lib.health import HealthTracker
+from lib.metrics import record_attempt
+
+# Success rates below this don't make a method look any more expensive
+MIN_SUCCESS_RATE = 0.05
+# A method ranked down by failures is retried first after this many seconds
+PROBE_INTERVAL = 60.0
+
+
+class NoHealthyMethod(Exception):
+    pass
+
+
+class BlockedPage(Exception):
+    """Raised by an engine whose page is not a real result (bot challenge, error page)"""
+
+
+class StrategyRouter:
+    """Chooses between a retailer's extraction methods.
+
+    Every method has its own HealthTracker, i.e. a circuit breaker plus a
+    moving average of how long successful runs take. Methods are tried
+    cheapest first, where the expected cost is that latency divided by the
+    recent success rate (the configured prior until a run was measured).
+    Methods with an open circuit are skipped; once their cooldown ends
+    they get a single probe run in their normal place in the order. A
+    method that would be the cheapest if it worked, but was pushed down by
+    recent failures, is tried first again every `probe_interval` seconds.
+    """
+
+    def __init__(self, retailer: str, costs: dict, probe_interval: float = PROBE_INTERVAL, **health_options):
+        self.retailer = retailer
+        self._costs = dict(costs)
+        self._probe_interval = probe_interval
+        self._health = {method: HealthTracker(**health_options) for method in costs}
+
+    def health(self, method: str) -> HealthTracker:
+        return self._health[method]
+
+    def expected_cost(self, method: str) -> float:
+        health = self._health[method]
+        latency = health.latency if health.latency is not None else self._costs[method]
+        return latency / max(health.success_rate, MIN_SUCCESS_RATE)
+
+    def plan(self, methods=None) -> list:
+        """Methods worth trying now, cheapest first"""
+        candidates = [
+            method for method in (methods or self._costs)
+            if self._health[method].state != "open"
+        ]
+        ordered = sorted(candidates, key=self.expected_cost)
+        if len(ordered) < 2:
+            return ordered
+
+        best_cost = self.expected_cost(ordered[0])
+        now = time.monotonic()
+        for method in ordered[1:]:
+            health = self._health[method]
+            latency = health.latency if health.latency is not None else self._costs[method]
+            if latency < best_cost and now - health.last_attempt >= self._probe_interval:
+                # Claim the probe so concurrent requests don't all retry it
+                health.last_attempt = now
+                ordered.remove(method)
+                ordered.insert(0, method)
+                break
+        return ordered
+
+    def record(self, method: str, success: bool, elapsed: float = None):
+        self._health[method].record(success, elapsed)
+
+    async def run(self, engines: dict):
+        """Yield batches from the cheapest healthy engine, falling back by cost.
+
+        `engines` maps method names to zero-argument callables returning an
+        async iterator of item batches. The first engine that finishes
+        cleanly ends the run, even with no items: a healthy engine finding
+        nothing means the search has no results. Only an engine that raises
+        (BlockedPage for a challenge or error page served as a result)
+        hands over to the next one. Latency is measured over the engine's
+        own awaits, not the time the consumer spends between batches.
+        Raises the last error if nothing was produced and an engine failed,
+        and NoHealthyMethod if all circuits are open.
+        """
+        error = None
+        tried = False
+        produced = 0
+        for method in self.plan(engines):
+            # Claims the single probe slot of a half-open method
+            if not self._health[method].available():
+                continue
+            tried = True
+            iterator = engines[method]().__aiter__()
+            elapsed = 0.0
+            count = 0
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        items = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        elapsed += time.perf_counter() - started
+                        break
+                    elapsed += time.perf_counter() - started
+                    count += len(items)
+                    produced += len(items)
+                    yield items
+            except Exception as e:
+                self.record(method, False)
+                record_attempt(self.retailer, method, "error", count)
+                print(f"{self.retailer} {method} failed: {e}")
+                error = e
+                continue
+            finally:
+                # Also runs when the consumer stops early
+                aclose = getattr(iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            self.record(method, True, elapsed)
+            record_attempt(self.retailer, method, "ok" if count else "empty", count)
+            return
+
+        if not tried:
+            raise NoHealthyMethod(f"Every {self.retailer} method is failing, try again later")
+        if error is not None and not produced:
+            raise error
+
+    def snapshot(self) -> dict:
+        return {
+            method: {**health.snapshot(), "expected_cost_ms": round(self.expected_cost(method) * 1000, 1)}
+            for method, health in self._health.items()
+        }
@@ -0,0 +1,29 @@
+from fastapi.responses import StreamingResponse
+
+from lib.serialize import dumps
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_event(event: dict, fmt: str) -> bytes:
+    payload = dumps(event)
+    if fmt == "sse":
+        return f"event: {event.get('type', 'message')}\ndata: ".encode() + payload + b"\n\n"
+    return payload + b"\n"
+
+
+def stream_events(events, fmt: str = "ndjson") -> StreamingResponse:
+    """Wrap an async iterator of event dicts as an NDJSON or SSE response"""
+    async def body():
+        async for event in events:
+            yield encode_event(event, fmt)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        # Stop reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
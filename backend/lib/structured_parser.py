@@ -1,34 +1,104 @@
 import json
-from bs4 import BeautifulSoup
+import re
+from html import unescape
+
+# One pass over the raw HTML picking out only JSON-LD scripts and <meta>
+# tags; no DOM is built, so memory stays flat on multi-MB product pages.
+# Quoted attribute values are matched whole so a ">" inside one does not
+# end the tag.
+_ATTR_UNIT = r"""(?:[^>"']|"[^"]*"|'[^']*')"""
+_TAGS = re.compile(
+    rf"""<script\b(?={_ATTR_UNIT}*?["']?application/ld\+json){_ATTR_UNIT}*>(?P<json>.*?)</script\s*>"""
+    rf"|<meta\b(?P<meta>{_ATTR_UNIT}*)>",
+    re.IGNORECASE | re.DOTALL,
+)
+_ATTRS = re.compile(r"""([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+PRODUCT_TYPES = {"Product", "Offer", "Car", "Vehicle", "IndividualProduct"}
+
+
+def _meta_attrs(raw: str) -> dict:
+    return {
+        name.lower(): unescape(double or single or bare)
+        for name, double, single, bare in _ATTRS.findall(raw)
+    }
+
+
+def _flatten(data):
+    """Yield every JSON-LD node, unwrapping lists and @graph containers"""
+    if isinstance(data, list):
+        for entry in data:
+            yield from _flatten(entry)
+    elif isinstance(data, dict):
+        if "@graph" in data:
+            yield from _flatten(data["@graph"])
+        if "@type" in data or "@graph" not in data:
+            yield data
+
+
+def parse_json_ld(text: str) -> list:
+    """Decode one JSON-LD block into a flat list of nodes"""
+    try:
+        return list(_flatten(json.loads(text)))
+    except (TypeError, ValueError):
+        return []
+
+
+def extract_structured_data(html: str):
+    """Return (JSON-LD nodes, meta property/name -> content) in one pass"""
+    nodes = []
+    meta = {}
+    for match in _TAGS.finditer(html):
+        block = match.group("json")
+        if block is not None:
+            nodes.extend(parse_json_ld(block))
+            continue
+        attrs = _meta_attrs(match.group("meta"))
+        key = attrs.get("property") or attrs.get("name")
+        if key and "content" in attrs:
+            # Last one wins, as it did with the BeautifulSoup parser
+            meta[key] = attrs["content"]
+    return nodes, meta
+
+
+def is_product(node: dict) -> bool:
+    node_type = node.get("@type")
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return any(t in PRODUCT_TYPES for t in types)
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _name(value):
+    value = _first(value)
+    return value.get("name") if isinstance(value, dict) else value
+
 
 def parse_structured_data(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+    nodes, og_data = extract_structured_data(html)
 
     # JSON-LD
-    for script in soup.find_all("script", {"type": "application/ld+json"}):
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, dict) and data.get("@type") in ["Product", "Offer"]:
-                return {
-                    "title": data.get("name"),
-                    "price": data.get("offers", {}).get("price"),
-                    "currency": data.get("offers", {}).get("priceCurrency"),
-                    "image": data.get("image"),
-                    "retailer": data.get("brand"),
-                }
-        except Exception:
-            continue
+    for data in nodes:
+        if is_product(data):
+            offers = _first(data.get("offers")) or {}
+            if not isinstance(offers, dict):
+                offers = {}
+            image = _first(data.get("image"))
+            return {
+                "title": data.get("name"),
+                "price": offers.get("price", data.get("price")),
+                "currency": offers.get("priceCurrency"),
+                "image": image.get("url") if isinstance(image, dict) else image,
+                "retailer": _name(data.get("brand")),
+            }
 
     # OG fallback
-    og_data = {}
-    for meta in soup.find_all("meta"):
-        if meta.get("property") and meta.get("content"):
-            og_data[meta["property"]] = meta["content"]
-
     return {
         "title": og_data.get("og:title"),
         "image": og_data.get("og:image"),
-        "price": og_data.get("og:price:amount"),
-        "currency": og_data.get("og:price:currency"),
+        "price": og_data.get("og:price:amount") or og_data.get("product:price:amount"),
+        "currency": og_data.get("og:price:currency") or og_data.get("product:price:currency"),
         "retailer": og_data.get("og:site_name"),
     }
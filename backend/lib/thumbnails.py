@@ -0,0 +1,255 @@
+"""Listing image thumbnails for the /img proxy.
+
+Source images come through the shared upstream clients, are shrunk and
+re-encoded to WebP on a small thread pool (Pillow releases the GIL while
+decoding, resizing and encoding) and kept in a size-bounded LRU
+directory keyed by a hash of the URL and width. Pillow is optional;
+without it the proxy redirects to the original image.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from urllib.parse import quote, urljoin, urlparse
+
+from lib.http import open_stream
+from lib.metrics import stage
+from lib.singleflight import SingleFlight
+
+# Pillow is optional (/img redirects to the source without it) and is only
+# imported once the first thumbnail is made
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+THUMB_DIR = os.getenv("SEEKLY_THUMB_DIR") or os.path.join(tempfile.gettempdir(), "seekly-thumbs")
+THUMB_CACHE_BYTES = int(float(os.getenv("SEEKLY_THUMB_CACHE_MB", "256")) * 1024 * 1024)
+THUMB_WORKERS = int(os.getenv("SEEKLY_THUMB_WORKERS", str(os.cpu_count() or 2)))
+THUMB_QUALITY = int(os.getenv("SEEKLY_THUMB_QUALITY", "70"))
+# Base URL listing images are rewritten to, e.g. "/img" or "https://api.example.com/img"
+IMAGE_PROXY = os.getenv("SEEKLY_IMAGE_PROXY", "").rstrip("/")
+
+WIDTHS = (96, 160, 240, 320, 480, 640)
+DEFAULT_WIDTH = 240
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+MAX_REDIRECTS = 3
+IMAGE_HEADERS = {"Accept": "image/avif,image/webp,image/*,*/*;q=0.8"}
+
+# Only retailer image hosts are proxied, the endpoint is not an open relay
+ALLOWED_HOST_SUFFIXES = ("olx.com.pk", "pakwheels.com", "daraz.pk", "lazcdn.com", "slatic.net") + tuple(
+    host.strip() for host in os.getenv("SEEKLY_IMG_HOSTS", "").split(",") if host.strip()
+)
+
+_executor = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="seekly-thumbs")
+
+
+class ThumbnailError(Exception):
+    pass
+
+
+def is_allowed(url: str) -> bool:
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    return parsed.scheme in ("http", "https") and any(
+        host == suffix or host.endswith("." + suffix) for suffix in ALLOWED_HOST_SUFFIXES
+    )
+
+
+def snap_width(width: int) -> int:
+    """Nearest supported width, so arbitrary sizes can't flood the cache"""
+    return min(WIDTHS, key=lambda allowed: abs(allowed - width))
+
+
+def thumbnail_key(url: str, width: int) -> str:
+    return f"{hashlib.sha256(url.encode()).hexdigest()[:32]}-{width}"
+
+
+def make_thumbnail(data: bytes, width: int, quality: int = THUMB_QUALITY) -> bytes:
+    """Shrink an image to fit width x width and encode it as WebP"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEG decoders can scale down while decoding, far cheaper than a full decode
+        image.draft("RGB", (width, width))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        image.thumbnail((width, width), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=quality, method=4)
+        return out.getvalue()
+
+
+class DiskLRU:
+    """Files under `root` evicted least-recently-used once `max_bytes` is exceeded.
+
+    Recency survives restarts through file mtimes, which hits refresh.
+    """
+
+    def __init__(self, root: str = THUMB_DIR, max_bytes: int = THUMB_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._sizes = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".webp")
+
+    def _load(self):
+        found = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".webp"):
+                    continue
+                stat = os.stat(os.path.join(directory, name))
+                found.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+            self._total += size
+        self._evict()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            self._sizes.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._sizes.pop(key, 0)
+            return None
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        partial = f"{path}.{threading.get_ident()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+        with self._lock:
+            self._total += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._sizes), "bytes": self._total, "max_bytes": self.max_bytes}
+
+
+_disk = None
+_disk_lock = threading.Lock()
+_flights = SingleFlight()
+
+
+def get_disk() -> DiskLRU:
+    """The thumbnail directory, indexed on first use (blocking, run it off the event loop)"""
+    global _disk
+    if _disk is None:
+        with _disk_lock:
+            if _disk is None:
+                _disk = DiskLRU()
+    return _disk
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+async def get_thumbnail(url: str, width: int):
+    """WebP thumbnail bytes for an image URL, returns (data, cache status)"""
+    key = thumbnail_key(url, width)
+    # Indexing the directory walks every file, keep it off the event loop
+    disk = _disk or await _run(get_disk)
+    data = await _run(disk.get, key)
+    if data is not None:
+        return data, "hit"
+
+    data, coalesced = await _flights.do(key, _build_and_store, url, width, key)
+    return data, "coalesced" if coalesced else "miss"
+
+
+async def _build_and_store(url: str, width: int, key: str) -> bytes:
+    data = await _build(url, width)
+    await _run(get_disk().put, key, data)
+    return data
+
+
+async def _download(url: str) -> bytes:
+    """Source image bytes, refusing bodies over MAX_SOURCE_BYTES and redirects off the allowlist"""
+    for _ in range(MAX_REDIRECTS + 1):
+        async with open_stream(url, headers=IMAGE_HEADERS, follow_redirects=False) as response:
+            if response.is_redirect:
+                url = urljoin(url, response.headers.get("location", ""))
+                if not is_allowed(url):
+                    raise ThumbnailError("Image redirected off the retailer hosts")
+                continue
+            if response.status_code != 200:
+                raise ThumbnailError(f"Image upstream answered {response.status_code}")
+            declared = response.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > MAX_SOURCE_BYTES:
+                raise ThumbnailError("Source image is too large")
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > MAX_SOURCE_BYTES:
+                    raise ThumbnailError("Source image is too large")
+            return bytes(body)
+    raise ThumbnailError("Too many image redirects")
+
+
+async def _build(url: str, width: int) -> bytes:
+    from PIL import Image
+
+    data = await _download(url)
+    with stage("img", "resize"):
+        try:
+            return await _run(make_thumbnail, data, width)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            raise ThumbnailError(f"Not a usable image: {e}")
+
+
+def proxied(image: str, width: int = DEFAULT_WIDTH):
+    """The proxy URL for a listing image when SEEKLY_IMAGE_PROXY is set"""
+    if not IMAGE_PROXY or not image or not is_allowed(image):
+        return image
+    return f"{IMAGE_PROXY}?url={quote(image, safe='')}&w={width}"
+
+
+def rewrite_images(items):
+    """Copies of listings (or listing dicts) with images pointing at the proxy.
+
+    Applied where results leave the providers for clients; the listing
+    store and the page cache keep the original URLs.
+    """
+    if not IMAGE_PROXY:
+        return items
+    return [
+        {**item, "image": proxied(item.get("image"))} if isinstance(item, dict)
+        else replace(item, image=proxied(item.image))
+        for item in items
+    ]
+
+
+def close():
+    _executor.shutdown(wait=False, cancel_futures=True)
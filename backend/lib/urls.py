@@ -0,0 +1,64 @@
+import re
+from urllib.parse import urlparse, parse_qs, parse_qsl, urlencode, urlunparse
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "referrer", "source"}
+
+# /item/honda-civic-2018-iid-1234567890 -> 1234567890
+OLX_ITEM_ID = re.compile(r"/item/(?:[^/]*-)?iid-(\d+)")
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys and comparisons"""
+    parsed = urlparse(url.strip())
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+        and not (key == "page" and value == "1")
+    ]
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((
+        (parsed.scheme or "https").lower(),
+        parsed.netloc.lower(),
+        path,
+        parsed.params,
+        urlencode(sorted(query)),
+        "",
+    ))
+
+
+def canonical_listing_url(url: str) -> str:
+    """Key identifying one listing regardless of slug, host alias or tracking"""
+    normalized = normalize_url(url)
+    parsed = urlparse(normalized)
+    host = parsed.netloc[4:] if parsed.netloc.startswith("www.") else parsed.netloc
+    if "olx" in host:
+        item_id = OLX_ITEM_ID.search(parsed.path)
+        if item_id:
+            return f"olx:{item_id.group(1)}"
+    return urlunparse(parsed._replace(scheme="https", netloc=host))
+
+
+def retailer_for_url(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    for retailer in ("olx", "pakwheels", "daraz"):
+        if retailer in host:
+            return retailer
+    return "unknown"
+
+
+def get_current_page_number(url: str) -> int:
+    """Page number in a search URL's ?page= parameter, 1 when absent"""
+    page_param = parse_qs(urlparse(url).query).get("page", ["1"])
+    try:
+        return int(page_param[0])
+    except (ValueError, IndexError):
+        return 1
+
+
+def create_page_url(base_url: str, page: int) -> str:
+    """The search URL for a specific page number"""
+    parsed_url = urlparse(base_url)
+    query_params = parse_qs(parsed_url.query)
+    query_params["page"] = [str(page)]
+    return urlunparse(parsed_url._replace(query=urlencode(query_params, doseq=True)))
@@ -1,10 +1,45 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
 from fastapi import FastAPI, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from services.dynamic import scrape_dynamic
+from fastapi.responses import PlainTextResponse
+from services.dynamic import scrape_dynamic_cached, iter_dynamic_events, result_cache, job_queue, create_job_worker
+from lib import executor, http, page_cache, parse_pool, render, thumbnails
+from lib.streaming import stream_events
+from lib.compression import CompressionMiddleware
+from lib.metrics import MetricsMiddleware, render_metrics
+from lib.profiler import ProfilerMiddleware
+from providers import registry
+from models import ScrapeResponse
+from routers import admin, images, jobs, products, query, search, watches
+from routers.search import paged_response, parse_fields_or_422, resume_or_error
+from services.crawler import crawler
+from services import listings
 
-app = FastAPI(title="Seekly API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http.init_clients()
+    if registry.WARMUP:
+        # Imports, selectors and chromedriver resolved before the first request pays for them
+        await registry.warm_up()
+    crawler.start()
+    job_worker = create_job_worker()
+    job_worker.start()
+    yield
+    await job_worker.stop()
+    await job_queue.close()
+    await crawler.stop()
+    await http.close_clients()
+    await render.close_browser()
+    registry.close_providers()
+    result_cache.close()
+    page_cache.close()
+    listings.close()
+    executor.shutdown()
+    parse_pool.shutdown()
+    thumbnails.close()
+
+app = FastAPI(title="Seekly API", version="0.1.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -15,50 +50,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class SearchResult(BaseModel):
-    retailer: str
-    title: str
-    price: str  # Changed to string to handle currency symbols
-    currency: str
-    url: str
-    image: Optional[str] = None
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
-class ScrapeResponse(BaseModel):
-    success: bool
-    data: List[SearchResult]
-    count: int
-    source: str
+app.include_router(search.router)
+app.include_router(watches.router)
+app.include_router(query.router)
+app.include_router(products.router)
+app.include_router(images.router)
+app.include_router(jobs.router)
+app.include_router(admin.router)
 
 @app.get("/")
-def home():
+async def home():
     return {"message": "Seekly API is running 🚀", "version": "0.1.0"}
 
 @app.get("/scrape", response_model=ScrapeResponse)
-def scrape_item(url: str = Query(..., description="URL to scrape")):
+async def scrape_item(
+    url: Optional[str] = Query(None, description="URL to scrape"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size, returns a next_cursor when more remain"),
+    cursor: Optional[str] = Query(None, description="next_cursor of a previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated listing fields to return"),
+):
+    projection = parse_fields_or_422(fields)
+    if cursor:
+        return resume_or_error(cursor, limit, projection)
+    if not url:
+        raise HTTPException(status_code=422, detail="url is required")
     try:
-        result = scrape_dynamic(url)
-        return {
+        result, cache_status = await scrape_dynamic_cached(url)
+        return paged_response({
             "success": True,
             "data": result,
             "count": len(result),
-            "source": "OLX" if "olx" in url.lower() else "Unknown"
-        }
+            "source": "OLX" if "olx" in url.lower() else "Unknown",
+            "cached": cache_status != "miss",
+            "cache": cache_status,
+        }, limit, projection)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
-@app.get("/search", response_model=ScrapeResponse)
-def search_items(url: str = Query(..., description="URL to scrape")):
+@app.get("/scrape/stream")
+async def scrape_item_stream(
+    url: str = Query(..., description="URL to scrape"),
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="Stream encoding"),
+):
+    return stream_events(iter_dynamic_events(url), format)
+
+@app.get("/health")
+async def health_check():
     try:
-        result = scrape_dynamic(url)
-        return {
-            "success": True,
-            "data": result,
-            "count": len(result),
-            "source": "OLX" if "olx" in url.lower() else "Unknown"
-        }
+        jobs_status = await job_queue.status()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+        jobs_status = {"backend": job_queue.name, "error": str(e)}
+    return {"status": "healthy", "service": "seekly-scraper", "strategies": registry.strategies_status(), "crawler": crawler.status(), "render": render.context_pool.status(), "jobs": jobs_status, "providers": registry.providers_status()}
 
-@app.get("/health")
-def health_check():
-    return {"status": "healthy", "service": "seekly-scraper"}
\ No newline at end of file
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus exposition of request, stage, provider and upstream pool metrics"""
+    return PlainTextResponse(render_metrics(http.http_metric_lines()), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/http")
+async def http_metrics():
+    return http.http_stats()
@@ -0,0 +1,66 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class SearchResult(BaseModel):
+    retailer: str
+    title: str
+    price: str  # Changed to string to handle currency symbols
+    currency: str
+    url: str
+    image: Optional[str] = None
+
+class ScrapeResponse(BaseModel):
+    success: bool
+    data: List[SearchResult]
+    count: int
+    source: str
+    cached: bool = False
+    cache: Optional[str] = None  # hit, stale, coalesced, miss or store
+    total: Optional[int] = None  # size of the whole result set when paginated
+    next_cursor: Optional[str] = None
+
+class ProviderStatus(BaseModel):
+    status: str  # ok, error or timeout
+    elapsed_ms: float
+    count: int = 0
+    error: Optional[str] = None
+
+class SearchResponse(ScrapeResponse):
+    providers: Dict[str, ProviderStatus] = {}
+
+class Watch(BaseModel):
+    url: str
+    query: Optional[str] = None
+    priority: int
+    interval: float
+    max_pages: int
+    next_run: float
+    last_run: Optional[float] = None
+    last_error: Optional[str] = None
+    last_new: Optional[int] = None
+
+class StoredListing(SearchResult):
+    price_value: Optional[float] = None
+    first_seen: float
+    last_seen: float
+
+class Job(BaseModel):
+    id: str
+    url: str
+    retailer: str
+    status: str  # queued, running, retrying, done or failed
+    attempts: int
+    error: Optional[str] = None
+    created: float
+    updated: float
+    count: Optional[int] = None
+    data: Optional[List[SearchResult]] = None
+
+class ProductBatchRequest(BaseModel):
+    urls: List[str]
+
+class QueryResponse(BaseModel):
+    success: bool
+    data: List[StoredListing]
+    count: int
+    elapsed_ms: float
@@ -1,16 +1,36 @@
-from playwright.async_api import async_playwright
-from lib.structured_parser import parse_structured_data
+from lib.http import fetch
+from lib.listing import Listing
+from providers.products import scrape_product
 
 async def scrape_daraz(url: str):
-    async with async_playwright() as p:
-        browser =await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.goto(url, timeout=60000)
-        html = await page.content()
-        await browser.close()
-
-    data = parse_structured_data(html)
-    if data:
-        data["url"] = url
-        data["retailer"] = "Daraz"
+    """Product data of one Daraz page, rendered only when the HTML lacks it"""
+    data, _ = await scrape_product(url)
     return data
+
+async def search_daraz(query: str, limit: int = 40):
+    """Search Daraz through the catalog's JSON (ajax) view"""
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "application/json, text/plain, */*",
+    }
+    response = await fetch(
+        "https://www.daraz.pk/catalog/",
+        headers=headers,
+        params={"ajax": "true", "q": query},
+    )
+    response.raise_for_status()
+
+    items = []
+    for item in response.json().get("mods", {}).get("listItems", [])[:limit]:
+        item_url = item.get("itemUrl") or item.get("productUrl") or ""
+        if item_url.startswith("//"):
+            item_url = f"https:{item_url}"
+        items.append(Listing(
+            retailer="Daraz",
+            title=item.get("name", "No title available"),
+            price=item.get("priceShow") or item.get("price") or "Price not available",
+            currency="PKR",
+            url=item_url,
+            image=item.get("image"),
+        ))
+    return items
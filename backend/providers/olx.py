@@ -1,188 +1,227 @@
-import httpx
+from lib.http import fetch
+from lib.accumulator import ResultAccumulator
+from lib.metrics import stage
+from lib.strategy import StrategyRouter, NoHealthyMethod, BlockedPage
+from lib.page_cache import fetch_parsed
+from lib.parse_pool import pack, unpack
+from lib.listing import Listing
+from providers.schemas import OLX_PLAN
 from selectolax.parser import HTMLParser
-from urllib.parse import urljoin, urlparse, parse_qs, urlunparse, urlencode
+from lib.urls import create_page_url, get_current_page_number
+from urllib.parse import urlparse, parse_qs, quote, unquote
+import os
 import re
 import time
+import asyncio
 
 def extract_olx_item_v2(card):
-    try:
-        # Title
-        title_tag = card.css_first('div[aria-label="Title"] h2')
-        title = title_tag.text().strip() if title_tag else "No title available"
-
-        # Price
-        price_tag = card.css_first('div[aria-label="Price"] span')
-        price = price_tag.text().strip() if price_tag else "Price not available"
-
-        # URL
-        a_tag = card.css_first('a[href*="/item/"]')
-        href = a_tag.attributes.get("href") if a_tag else None
-        url = urljoin("https://www.olx.com.pk", href) if href else "#"
-
-        # Image
-        img_tag = card.css_first('img')
-        image_url = img_tag.attributes.get("src") if img_tag else None
-
-        return {
-            "retailer": "OLX",
-            "title": title,
-            "price": price,
-            "currency": "PKR",
-            "url": url,
-            "image": image_url
-        }
-    except Exception as e:
-        print(f"Error extracting item: {e}")
-        return None
+    return OLX_PLAN.extract(card)
 
-def scrape_olx_search_httpx(url: str, max_pages: int = 3):
+async def scrape_olx_search_httpx(url: str, max_pages: int = 3, max_items: int = None):
     """Scrape OLX with proper pagination support"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
+    results = ResultAccumulator()
+    async for items in iter_olx_search_httpx(url, max_pages=max_pages, max_items=max_items):
+        results.extend(items)
+    return results.items
+
+HTML_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+async def fetch_olx_page(page_url: str):
+    """Fetch and parse one results page, returns (items, last page number or None)"""
+    packed, last_page = await fetch_parsed(page_url, parse_olx_page, page_url, headers=HTML_HEADERS)
+    return unpack(packed), last_page
 
-    all_items = []
+def parse_olx_page(html, page_url: str):
+    """Parse a results page (raw bytes or text), returns (packed items, last page)"""
+    tree = HTMLParser(html)
+    items = OLX_PLAN.extract_all(tree)
+    # Real result pages, empty ones included, are full site pages; the bot
+    # challenge is a bare script page without even a title
+    if not items and tree.css_first("title") is None:
+        raise BlockedPage(f"OLX served a challenge instead of {page_url}")
+    return pack(items), read_last_page(tree, get_current_page_number(page_url))
+
+def read_last_page(tree, page_num: int):
+    """Highest page number the pagination links point to"""
+    if tree.css_first('button[data-testid="pagination-forward"][disabled]'):
+        return page_num
+
+    last_page = page_num
+    for link in tree.css('a[href*="page="]'):
+        last_page = max(last_page, get_current_page_number(link.attributes.get("href") or ""))
+    if last_page == page_num and tree.css_first('a[data-testid="pagination-forward"]'):
+        # A next button without numbered links, the real count is unknown
+        return None
+    return last_page
+
+async def iter_olx_search_httpx(url: str, max_pages: int = 3, max_items: int = None):
+    """Yield the items of each OLX results page as soon as it is parsed.
+
+    The first page is fetched alone to learn how many pages exist, the rest
+    are fetched concurrently (paced by the per-host rate limiter) and
+    yielded in completion order. Stops once `max_items` have been yielded.
+    """
     current_page = get_current_page_number(url)
-    
-    with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-        for page_num in range(current_page, current_page + max_pages):
+    wanted_last = current_page + max_pages - 1
+
+    print(f"Scraping page {current_page}...")
+    # A failing first page is an engine failure, the caller decides on fallbacks
+    items, last_page = await fetch_olx_page(create_page_url(url, current_page))
+
+    if not items:
+        print("No products found on this page, stopping pagination.")
+        return
+
+    print(f"Found {len(items)} products on page {current_page}")
+    remaining = max_items
+    if remaining is not None:
+        items = items[:remaining]
+        remaining -= len(items)
+    yield items
+
+    if last_page is not None:
+        wanted_last = min(wanted_last, last_page)
+    if wanted_last <= current_page or remaining == 0:
+        return
+
+    pages = [
+        asyncio.ensure_future(fetch_olx_page(create_page_url(url, page_num)))
+        for page_num in range(current_page + 1, wanted_last + 1)
+    ]
+    try:
+        for page in asyncio.as_completed(pages):
             try:
-                print(f"Scraping page {page_num}...")
-                
-                # Create URL for this page
-                page_url = create_page_url(url, page_num)
-                
-                resp = client.get(page_url, headers=headers)
-                resp.raise_for_status()
-
-                tree = HTMLParser(resp.text)
-                
-                # Check if we got a valid response with products
-                product_list = tree.css('ul._1aad128c li[aria-label="Listing"]')
-                
-                if not product_list:
-                    print("No products found on this page, stopping pagination.")
-                    break
-                
-                print(f"Found {len(product_list)} products on page {page_num}")
-                
-                for li in product_list:
-                    item = extract_olx_item_v2(li)
-                    if item:
-                        # Check for duplicates by URL
-                        if not any(existing_item['url'] == item['url'] for existing_item in all_items):
-                            all_items.append(item)
-                
-                # Check if there are more pages by looking for next button
-                next_button = tree.css_first('a[data-testid="pagination-forward"]')
-                if not next_button and page_num < (current_page + max_pages - 1):
-                    # Also check for disabled next button (indicating last page)
-                    disabled_next = tree.css_first('button[data-testid="pagination-forward"][disabled]')
-                    if disabled_next:
-                        print("Reached the last page, stopping pagination.")
-                        break
-                
-                time.sleep(1)  # Be polite with delays between requests
-                
+                items, _ = await page
             except Exception as e:
-                print(f"Error scraping page {page_num}: {e}")
+                print(f"Error scraping page: {e}")
+                continue
+            if not items:
+                continue
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            yield items
+            if remaining == 0:
+                print(f"Reached {max_items} items, stopping pagination.")
                 break
+    finally:
+        for page in pages:
+            page.cancel()
 
-    return all_items
+API_URL = "https://www.olx.com.pk/api/relevance/v4/search"
+API_MAX_ITEMS = int(os.getenv("SEEKLY_OLX_API_MAX_ITEMS", "100"))
+API_MAX_PAGES = int(os.getenv("SEEKLY_OLX_API_MAX_PAGES", "10"))
 
-def get_current_page_number(url: str) -> int:
-    """Extract current page number from URL"""
+# Prior cost in seconds of each OLX extraction method, until measured
+OLX_METHOD_COSTS = {
+    "api": 0.5,
+    "html": 1.5,
+    "selenium": 8.0,
+    "selenium_basic": 20.0,
+}
+
+# Shared by every OLX code path so they all learn which methods work
+olx_strategies = StrategyRouter("olx", OLX_METHOD_COSTS)
+
+class OlxApiError(Exception):
+    pass
+
+def build_api_params(url: str) -> dict:
+    """Translate a site search URL into relevance API parameters"""
     parsed_url = urlparse(url)
     query_params = parse_qs(parsed_url.query)
-    page_param = query_params.get('page', ['1'])
-    try:
-        return int(page_param[0])
-    except (ValueError, IndexError):
-        return 1
+    params = {
+        'category': extract_category_from_url(parsed_url.path),
+        'facet_limit': '100',
+        'lang': 'en',
+        'location': extract_location_from_url(parsed_url.path),
+        'location_facet_limit': '20',
+        'query': query_params.get('q', [''])[0] or extract_query_from_url(parsed_url.path),
+        'spellcheck': 'true',
+    }
+    # Filters and sorting use the same names on the site and the API
+    for key in ('filter', 'sorting'):
+        if key in query_params:
+            params[key] = query_params[key][0]
+    return params
 
-def create_page_url(base_url: str, page: int) -> str:
-    """Create URL for specific page number"""
-    parsed_url = urlparse(base_url)
-    query_params = parse_qs(parsed_url.query)
+async def fetch_olx_api_page(url: str, params: dict, page: int):
+    """Fetch one 0-based API page, returns (items, total page count or None)"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'application/json, text/plain, */*',
+        'Referer': url,
+    }
+    response = await fetch(API_URL, headers=headers, params={**params, 'page': str(page)})
+    response.raise_for_status()
+    
+    with stage("olx", "api_parse"):
+        data = response.json()
+        if not isinstance(data, dict) or not isinstance(data.get('data'), list):
+            raise OlxApiError("Unexpected API response shape")
+        items = [extract_olx_api_item(item) for item in data['data']]
+    total_pages = (data.get('metadata') or {}).get('total_pages')
+    return items, total_pages if isinstance(total_pages, int) else None
+
+def extract_olx_api_item(item: dict):
+    price_info = item.get('price') or {}
+    return Listing(
+        retailer="OLX",
+        title=item.get('title', 'No title available'),
+        price=(price_info.get('value') or {}).get('display', 'Price not available'),
+        currency="PKR",
+        url=f"https://www.olx.com.pk{item.get('url', '')}",
+        image=item.get('images', [{}])[0].get('url') if item.get('images') else None,
+    )
+
+async def iter_olx_search_api(url: str, max_items: int = API_MAX_ITEMS, max_pages: int = API_MAX_PAGES):
+    """Yield OLX API results page by page until `max_items` are collected.
+
+    The first page (the URL's own page, the API is 0-based) tells us the
+    page size, the pages still needed to reach `max_items` are then
+    fetched concurrently. Raises if the first page fails, later page
+    failures only shorten the result.
+    """
+    params = build_api_params(url)
+    first_page = get_current_page_number(url) - 1
     
-    # Update page parameter
-    query_params['page'] = [str(page)]
+    items, total_pages = await fetch_olx_api_page(url, params, first_page)
+    items = items[:max_items]
+    yield items
+    remaining = max_items - len(items)
+    if not items or remaining <= 0:
+        return
     
-    # Rebuild query string
-    new_query = urlencode(query_params, doseq=True)
+    pages_needed = min(max_pages - 1, -(-remaining // len(items)))
+    last_page = first_page + pages_needed
+    if total_pages is not None:
+        last_page = min(last_page, total_pages - 1)
     
-    # Reconstruct URL
-    return urlunparse((
-        parsed_url.scheme,
-        parsed_url.netloc,
-        parsed_url.path,
-        parsed_url.params,
-        new_query,
-        parsed_url.fragment
-    ))
-
-def scrape_olx_search_api(url: str, max_items: int = 50):
-    """API-based approach for OLX with pagination"""
+    pages = [
+        asyncio.ensure_future(fetch_olx_api_page(url, params, page))
+        for page in range(first_page + 1, last_page + 1)
+    ]
     try:
-        # Extract search parameters from URL
-        parsed_url = urlparse(url)
-        query_params = parse_qs(parsed_url.query)
-        search_query = query_params.get('q', [''])[0]
-        category = extract_category_from_url(parsed_url.path)
-        
-        # Determine page number
-        page_num = get_current_page_number(url)
-        
-        api_url = "https://www.olx.com.pk/api/relevance/v4/search"
-        params = {
-            'category': category,
-            'facet_limit': '100',
-            'lang': 'en',
-            'location': '1000001',  # Pakistan
-            'location_facet_limit': '20',
-            'page': str(page_num - 1),  # API uses 0-based indexing
-            'query': search_query,
-            'spellcheck': 'true',
-        }
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json, text/plain, */*',
-            'Referer': url,
-        }
-        
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(api_url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            items = []
-            
-            for item in data.get('data', [])[:max_items]:
-                title = item.get('title', 'No title available')
-                price_info = item.get('price', {})
-                price = price_info.get('value', {}).get('display', 'Price not available')
-                
-                items.append({
-                    "retailer": "OLX",
-                    "title": title,
-                    "price": price,
-                    "currency": "PKR",
-                    "url": f"https://www.olx.com.pk{item.get('url', '')}",
-                    "image": item.get('images', [{}])[0].get('url') if item.get('images') else None
-                })
-            
-            return items
-            
-    except Exception as e:
-        print(f"API method failed: {e}")
-        # Fallback to HTML scraping for single page
-        return scrape_olx_search_httpx(url, max_pages=1)
+        for page in asyncio.as_completed(pages):
+            try:
+                items, _ = await page
+            except Exception as e:
+                print(f"API page failed: {e}")
+                continue
+            items = items[:remaining]
+            if items:
+                remaining -= len(items)
+                yield items
+            if remaining <= 0:
+                break
+    finally:
+        for page in pages:
+            page.cancel()
 
 def extract_category_from_url(path: str) -> str:
     """Extract category from URL path"""
@@ -192,21 +231,95 @@ def extract_category_from_url(path: str) -> str:
         return category_match.group(1)
     return 'all'
 
-def scrape_olx_search(url: str, max_pages: int = 3):
-    """Main OLX scraping function"""
+def extract_location_from_url(path: str) -> str:
+    """Extract location ID from URL path"""
+    # Example: /lahore_g4060673/q-civic -> '4060673'
+    location_match = re.search(r'_g(\d+)', path)
+    if location_match:
+        return location_match.group(1)
+    return '1000001'  # Pakistan
+
+def extract_query_from_url(path: str) -> str:
+    """Extract search term from URL path"""
+    # Example: /items/q-honda-civic -> 'honda civic'
+    query_match = re.search(r'/q-([^/]+)', path)
+    if query_match:
+        return unquote(query_match.group(1)).replace('-', ' ')
+    return ''
+
+def build_search_url(query: str) -> str:
+    return f"https://www.olx.com.pk/items/q-{quote(query.strip().replace(' ', '-'))}"
+
+async def iter_search_olx(query: str, max_pages: int = 1):
+    """Search OLX by keyword, yielding one batch per page"""
+    async for items in iter_olx_search(build_search_url(query), max_pages=max_pages):
+        yield items
+
+async def iter_olx_search(url: str, max_pages: int = 3, max_items: int = None):
+    """Yield OLX results in batches from the cheapest healthy method"""
     print(f"Scraping OLX URL: {url}")
     
-    # For single page requests, try API first
-    if get_current_page_number(url) == 1:
-        try:
-            print("Trying API method...")
-            api_results = scrape_olx_search_api(url)
-            if api_results:
-                print(f"API returned {len(api_results)} items")
-                return api_results
-        except Exception as api_error:
-            print(f"API method failed: {api_error}")
-    
-    # Fallback to HTML scraping with pagination
-    print("Using HTML method with pagination...")
-    return scrape_olx_search_httpx(url, max_pages=max_pages)
\ No newline at end of file
+    # Cheapest healthy method first, methods that keep failing are skipped
+    async for items in olx_strategies.run({
+        "api": lambda: iter_olx_search_api(url, max_items=max_items or API_MAX_ITEMS, max_pages=max_pages),
+        "html": lambda: iter_olx_search_httpx(url, max_pages=max_pages, max_items=max_items),
+    }):
+        yield items
+
+async def iter_scrape_olx(url: str):
+    """Yield the listings of an OLX search URL, for /scrape.
+
+    JSON API when healthy, browsers only once the cheaper paths fail.
+    """
+    async for items in olx_strategies.run({
+        "api": lambda: iter_olx_search_api(url),
+        "html": lambda: iter_olx_search_httpx(url),
+        "selenium": lambda: _selenium().iter_olx_async(url, max_pages=5),
+        "selenium_basic": lambda: _iter_selenium_basic(url),
+    }):
+        yield items
+
+def _selenium():
+    # Selenium takes a few hundred ms to import, only pay for it once a browser is needed
+    from providers import olx_selenium
+    return olx_selenium
+
+async def _iter_selenium_basic(url: str):
+    selenium = _selenium()
+    yield await selenium.driver_pool.run(selenium.scrape_olx_fast_selenium, url, max_pages=1)
+
+async def iter_olx_pages(url: str, max_pages: int = 3):
+    """Yield OLX result pages one at a time in page order.
+
+    For incremental crawls that stop as soon as they reach known
+    listings; each page uses the cheaper of the API and HTML while both
+    are healthy.
+    """
+    params = build_api_params(url)
+    first_page = get_current_page_number(url)
+    for page_num in range(first_page, first_page + max_pages):
+        items = error = None
+        for method in olx_strategies.plan(["api", "html"]):
+            health = olx_strategies.health(method)
+            if not health.available():
+                continue
+            started = time.perf_counter()
+            try:
+                if method == "api":
+                    items, total_pages = await fetch_olx_api_page(url, params, page_num - 1)
+                else:
+                    items, total_pages = await fetch_olx_page(create_page_url(url, page_num))
+            except Exception as e:
+                health.record(False)
+                print(f"OLX {method} page failed: {e}")
+                error = e
+                continue
+            health.record(True, time.perf_counter() - started)
+            break
+        if items is None:
+            raise error or NoHealthyMethod(f"No healthy OLX method for page {page_num}")
+        if not items:
+            return
+        yield items
+        if total_pages is not None and page_num >= total_pages:
+            return
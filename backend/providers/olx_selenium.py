@@ -3,13 +3,19 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
-from selectolax.parser import HTMLParser
-from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
+from selenium.common.exceptions import TimeoutException
+from lib.driver_pool import DriverPool, resolve_driver_path
+from urllib.parse import urlparse
 import time
-from concurrent.futures import ThreadPoolExecutor
 import asyncio
+from lib.accumulator import ResultAccumulator
+from lib.rate_limit import limiter_for
+from lib.metrics import stage
+from lib.parse_pool import pack, unpack, parse_blocking
+from lib.render import BLOCKED_URL_PATTERNS
+from lib.urls import create_page_url, get_current_page_number
+from providers.schemas import OLX_PLAN
 
 def setup_driver():
     """Setup Chrome driver with optimized settings"""
@@ -26,6 +32,8 @@ def setup_driver():
     chrome_options.add_argument("--disable-notifications")
     chrome_options.add_argument("--disable-javascript")  # Try without JS first
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+    # Return from driver.get at DOMContentLoaded, callers wait for listings themselves
+    chrome_options.page_load_strategy = "eager"
     
     # Performance optimizations
     chrome_options.add_experimental_option("prefs", {
@@ -40,39 +48,43 @@ def setup_driver():
         "profile.managed_default_content_settings.media_stream": 2,
     })
     
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=chrome_options)
+    service = Service(resolve_driver_path())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    
+    # Drop fonts, media and tracker requests at the network layer
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+# Warm browser sessions shared by every scrape in this process; chromedriver
+# is resolved on first use when the app skipped its warm-up
+driver_pool = DriverPool(setup_driver, prepare=resolve_driver_path)
 
 def scrape_olx_fast_selenium(url: str, max_pages: int = 3):
     """Optimized OLX scraper with faster loading"""
-    driver = setup_driver()
-    all_items = []
+    results = ResultAccumulator()
     current_page = get_current_page_number(url)
     
+    # First try without waiting for dynamic content (much faster)
     try:
-        # First try without JavaScript (much faster)
-        try:
-            print("Trying without JavaScript...")
+        print("Trying without JavaScript...")
+        with driver_pool.session() as driver:
             items_no_js = scrape_without_javascript(url, driver)
-            if items_no_js:
-                print(f"Found {len(items_no_js)} items without JavaScript")
-                return items_no_js
-        except Exception as e:
-            print(f"No-JS approach failed: {e}")
-        
-        # If no-JS failed, enable JavaScript and try properly
-        print("Enabling JavaScript for dynamic content...")
-        driver.quit()
-        driver = setup_driver()
-        # Re-enable JavaScript by updating preferences
-        driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': False})
-        
-        for page_num in range(current_page, current_page + max_pages):
-            try:
-                print(f"Scraping page {page_num}...")
-                
-                page_url = create_page_url(url, page_num)
-                driver.get(page_url)
+        if items_no_js:
+            print(f"Found {len(items_no_js)} items without JavaScript")
+            return items_no_js
+    except Exception as e:
+        print(f"No-JS approach failed: {e}")
+    
+    print("Waiting for dynamic content...")
+    for page_num in range(current_page, current_page + max_pages):
+        try:
+            print(f"Scraping page {page_num}...")
+            
+            page_url = create_page_url(url, page_num)
+            # Borrow a session per page so concurrent requests interleave fairly
+            with driver_pool.session() as driver:
+                load_page(driver, page_url)
                 
                 # Smart wait - check if products are loaded quickly
                 products = smart_wait_for_products(driver, timeout=8)
@@ -83,51 +95,54 @@ def scrape_olx_fast_selenium(url: str, max_pages: int = 3):
                 
                 # Extract items quickly
                 html = driver.page_source
-                items = extract_items_from_html(html)
-                print(f"Found {len(items)} items on page {page_num}")
-                
-                # Add unique items
-                for item in items:
-                    if item and not any(existing_item['url'] == item['url'] for existing_item in all_items):
-                        all_items.append(item)
-                
-                # Quick check for next page
-                if not has_next_page(driver) and page_num < (current_page + max_pages - 1):
-                    print("No more pages available.")
-                    break
-                
-                # Minimal delay between pages
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"Error on page {page_num}: {e}")
+                more_pages = has_next_page(driver)
+            
+            items = extract_items_from_html(html)
+            print(f"Found {len(items)} items on page {page_num}")
+            
+            # Add unique items
+            results.extend(items)
+            
+            # Quick check for next page
+            if not more_pages and page_num < (current_page + max_pages - 1):
+                print("No more pages available.")
                 break
-                
-    finally:
-        driver.quit()
+            
+        except Exception as e:
+            print(f"Error on page {page_num}: {e}")
+            break
     
-    return all_items
+    return results.items
 
 def scrape_without_javascript(url: str, driver):
     """Try to scrape without JavaScript (much faster)"""
-    driver.get(url)
-    time.sleep(2)  # Minimal wait
-    
-    html = driver.page_source
-    tree = HTMLParser(html)
-    
-    items = []
-    product_list = tree.css('ul._1aad128c li[aria-label="Listing"]')
-    
-    for li in product_list:
-        item = extract_olx_item_optimized(li)
-        if item:
-            items.append(item)
+    load_page(driver, url)
+    wait_for_listings(driver, timeout=2)
     
-    return items
+    return extract_items_from_html(driver.page_source)
+
+def load_page(driver, url: str):
+    """Navigate once the host's rate limiter allows another request"""
+    limiter_for(urlparse(url).netloc).acquire_sync()
+    with stage("olx", "navigation"):
+        driver.get(url)
+
+def wait_for_listings(driver, timeout=2):
+    """Wait until listings are in the DOM, at most `timeout` seconds"""
+    try:
+        with stage("olx", "wait"):
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'ul._1aad128c li[aria-label="Listing"]'))
+            )
+    except TimeoutException:
+        pass
 
 def smart_wait_for_products(driver, timeout=10):
     """Smart waiting for products to load"""
+    with stage("olx", "wait"):
+        return _poll_for_products(driver, timeout)
+
+def _poll_for_products(driver, timeout):
     start_time = time.time()
     while time.time() - start_time < timeout:
         try:
@@ -150,42 +165,16 @@ def smart_wait_for_products(driver, timeout=10):
 
 def extract_items_from_html(html):
     """Quick extraction from HTML"""
-    tree = HTMLParser(html)
-    items = []
-    
-    product_list = tree.css('ul._1aad128c li[aria-label="Listing"]')
-    for li in product_list:
-        item = extract_olx_item_optimized(li)
-        if item:
-            items.append(item)
-    
-    return items
+    with stage("olx", "parse"):
+        return unpack(parse_blocking(extract_olx_listings, html))
+
+def extract_olx_listings(html):
+    """Extract a page's listings for the parse pool, returns packed items"""
+    return pack(OLX_PLAN.extract_all(html))
 
 def extract_olx_item_optimized(card):
     """Optimized item extraction"""
-    try:
-        # Fast selectors
-        title_tag = card.css_first('div[aria-label="Title"] h2, [data-aut-id="itemTitle"]')
-        price_tag = card.css_first('div[aria-label="Price"] span, [data-aut-id="itemPrice"]')
-        a_tag = card.css_first('a[href*="/item/"]')
-        img_tag = card.css_first('img')
-        
-        title = title_tag.text().strip() if title_tag else "No title"
-        price = price_tag.text().strip() if price_tag else "Price not available"
-        href = a_tag.attributes.get("href") if a_tag else None
-        url = f"https://www.olx.com.pk{href}" if href else "#"
-        image_url = img_tag.attributes.get("src") if img_tag else None
-        
-        return {
-            "retailer": "OLX",
-            "title": title,
-            "price": price,
-            "currency": "PKR",
-            "url": url,
-            "image": image_url
-        }
-    except Exception as e:
-        return None
+    return OLX_PLAN.extract(card)
 
 def has_next_page(driver):
     """Quick check for next page"""
@@ -195,74 +184,40 @@ def has_next_page(driver):
     except:
         return False
 
-def get_current_page_number(url: str) -> int:
-    """Extract current page number from URL"""
-    parsed_url = urlparse(url)
-    query_params = parse_qs(parsed_url.query)
-    page_param = query_params.get('page', ['1'])
-    try:
-        return int(page_param[0])
-    except (ValueError, IndexError):
-        return 1
-
-def create_page_url(base_url: str, page: int) -> str:
-    """Create URL for specific page number"""
-    parsed_url = urlparse(base_url)
-    query_params = parse_qs(parsed_url.query)
-    
-    query_params['page'] = [str(page)]
-    new_query = urlencode(query_params, doseq=True)
-    
-    return urlunparse((
-        parsed_url.scheme,
-        parsed_url.netloc,
-        parsed_url.path,
-        parsed_url.params,
-        new_query,
-        parsed_url.fragment
-    ))
-
-# Async version for even better performance
-async def scrape_olx_async(url: str, max_pages: int = 3):
-    """Async version for better performance"""
-    loop = asyncio.get_event_loop()
+async def iter_olx_async(url: str, max_pages: int = 3):
+    """Scrape pages concurrently and yield each page's items as it finishes"""
+    current_page = get_current_page_number(url)
     
-    with ThreadPoolExecutor() as executor:
-        results = []
-        current_page = get_current_page_number(url)
-        
-        # Scrape pages concurrently
-        for page_num in range(current_page, current_page + max_pages):
-            page_url = create_page_url(url, page_num)
-            results.append(
-                loop.run_in_executor(
-                    executor, 
-                    scrape_single_page_fast, 
-                    page_url
-                )
-            )
-        
-        # Wait for all pages to complete
-        all_items = []
-        for future in results:
+    # Pages queue on the driver pool's own threads, one per session, so
+    # waiting for a browser never ties up the shared blocking executor
+    pages = [
+        asyncio.ensure_future(driver_pool.run(scrape_single_page_fast, create_page_url(url, page_num)))
+        for page_num in range(current_page, current_page + max_pages)
+    ]
+    error = None
+    loaded = 0
+    try:
+        for page in asyncio.as_completed(pages):
             try:
-                items = await future
-                for item in items:
-                    if item and not any(existing_item['url'] == item['url'] for existing_item in all_items):
-                        all_items.append(item)
+                items = await page
             except Exception as e:
                 print(f"Error scraping page: {e}")
-        
-        return all_items
+                error = e
+                continue
+            loaded += 1
+            yield items
+        if error is not None and not loaded:
+            # Every page failed, let the caller fall back to another method
+            raise error
+    finally:
+        for page in pages:
+            page.cancel()
 
 def scrape_single_page_fast(url: str):
     """Scrape a single page quickly"""
-    driver = setup_driver()
-    try:
-        driver.get(url)
-        time.sleep(2)  # Reduced wait time
+    with driver_pool.session() as driver:
+        load_page(driver, url)
+        wait_for_listings(driver, timeout=2)
         
         html = driver.page_source
-        return extract_items_from_html(html)
-    finally:
-        driver.quit()
\ No newline at end of file
+    return extract_items_from_html(html)
@@ -1,67 +1,55 @@
-import httpx
-from selectolax.parser import HTMLParser
-import json
-from urllib.parse import urljoin
-
-def scrape_pakwheels_search_httpx(url: str):
+from lib.page_cache import fetch_parsed
+from lib.metrics import record_attempt
+from lib.parse_pool import pack, unpack
+from providers.schemas import PAKWHEELS_PLAN
+from lib.urls import create_page_url, get_current_page_number
+from urllib.parse import quote
+
+async def scrape_pakwheels_search_httpx(url: str, max_pages: int = 1):
+    items = []
+    async for page_items in iter_pakwheels_search_httpx(url, max_pages=max_pages):
+        items.extend(page_items)
+    return items
+
+async def iter_pakwheels_search_httpx(url: str, max_pages: int = 1):
+    """Yield the listings of each PakWheels results page as it is parsed"""
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     }
 
+    first_page = get_current_page_number(url)
+    for page_num in range(first_page, first_page + max_pages):
+        page_url = url if page_num == first_page else create_page_url(url, page_num)
+        try:
+            items = unpack(await fetch_parsed(page_url, parse_pakwheels_page, headers=headers))
+        except Exception as e:
+            if page_num == first_page:
+                raise Exception(f"Scraping failed: {str(e)}")
+            print(f"Error scraping PakWheels page {page_num}: {e}")
+            break
+        if not items:
+            break
+        yield items
+
+async def iter_scrape_pakwheels(url: str):
+    """iter_pakwheels_search_httpx with its attempt recorded, for /scrape"""
+    count = 0
     try:
-        with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
-            tree = HTMLParser(response.text)
-
-            items = []
-
-            # Each listing card
-            listings = tree.css("li.search-listing-card")
-            for listing in listings:
-                script_tag = listing.css_first("script[type='application/ld+json']")
-                if not script_tag:
-                    continue
-
-                try:
-                    data = json.loads(script_tag.text())
-                    # Sometimes JSON-LD is a list, sometimes dict
-                    if isinstance(data, list):
-                        data = data[0]
-
-                    offer = data.get("offers", {})
-                    price = offer.get("price")
-                    currency = offer.get("priceCurrency", "PKR")
-                    item_url = offer.get("url") or data.get("url")
-                    image = data.get("image")
-                    title = data.get("name") or data.get("description", "No title available")
-
-                    # Normalize price display
-                    if price and currency:
-                        if len(str(price)) > 0:
-                            if int(price) > 1000000:
-                                display_price = f"Rs {int(price)/100000:.2f} Lacs"
-                            else:
-                                display_price = f"Rs {price}"
-                        else:
-                            display_price = "Price not available"
-                    else:
-                        display_price = "Price not available"
-
-                    items.append({
-                        "retailer": "PakWheels",
-                        "title": title,
-                        "price": display_price,
-                        "currency": currency,
-                        "url": item_url,
-                        "image": image
-                    })
-
-                except Exception as e:
-                    print(f"Error parsing JSON-LD: {e}")
-                    continue
-
-            return items
-
-    except Exception as e:
-        raise Exception(f"Scraping failed: {str(e)}")
+        async for items in iter_pakwheels_search_httpx(url):
+            count += len(items)
+            yield items
+    except Exception:
+        record_attempt("pakwheels", "html", "error", count)
+        raise
+    record_attempt("pakwheels", "html", "ok" if count else "empty", count)
+
+def parse_pakwheels_listings(html):
+    return PAKWHEELS_PLAN.extract_all(html)
+
+def parse_pakwheels_page(html):
+    """parse_pakwheels_listings for the parse pool, returns packed items"""
+    return pack(PAKWHEELS_PLAN.extract_all(html))
+
+async def search_pakwheels(query: str):
+    url = f"https://www.pakwheels.com/used-cars/search/-/?q={quote(query.strip())}"
+    return await scrape_pakwheels_search_httpx(url)
@@ -0,0 +1,92 @@
+from urllib.parse import urljoin
+
+from lib.http import fetch
+from lib.metrics import record_attempt, stage
+from lib.render import USER_AGENT, render
+from lib.structured_parser import parse_structured_data
+from lib.urls import retailer_for_url
+from providers.registry import product_provider
+
+# Product data is ready once either structured block is in the DOM
+PRODUCT_READY_SELECTOR = 'script[type="application/ld+json"], meta[property="og:title"]'
+
+RETAILER_NAMES = {"olx": "OLX", "pakwheels": "PakWheels", "daraz": "Daraz"}
+MAX_REDIRECTS = 3
+
+HTML_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+
+class UnsupportedRedirect(ValueError):
+    pass
+
+
+def is_product_url(url: str) -> bool:
+    return product_provider(url) is not None
+
+
+async def fetch_product_page(url: str):
+    """The product page response, refusing redirects off the registry allowlist"""
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await fetch(url, headers=HTML_HEADERS, follow_redirects=False)
+        if not response.is_redirect:
+            response.raise_for_status()
+            return response
+        url = urljoin(url, response.headers.get("location", ""))
+        if not is_product_url(url):
+            raise UnsupportedRedirect(f"Product page redirected off the supported sites: {url}")
+    raise UnsupportedRedirect("Too many product page redirects")
+
+
+def has_product_data(data: dict) -> bool:
+    """Enough for a price check: a title and a price"""
+    return bool(data and data.get("title") and data.get("price") not in (None, ""))
+
+
+def _finish(data: dict, url: str, provider: str) -> dict:
+    data["url"] = url
+    data["retailer"] = RETAILER_NAMES.get(provider) or data.get("retailer")
+    return data
+
+
+async def scrape_product(url: str, render_timeout: int = 60000):
+    """Product data from a page's JSON-LD / OG tags, returns (data, engine).
+
+    The plain HTML is tried first; the page is only rendered in the shared
+    browser when the server-sent markup lacks the structured data. Only
+    URLs of registered providers are fetched, and neither path follows a
+    redirect or navigation to any other host.
+    """
+    if not is_product_url(url):
+        raise ValueError(f"Unsupported website: {url}")
+    provider = retailer_for_url(url)
+    try:
+        response = await fetch_product_page(url)
+        with stage(provider, "product_parse"):
+            data = parse_structured_data(response.text)
+        if has_product_data(data):
+            record_attempt(provider, "product_static", "ok", 1)
+            return _finish(data, url, provider), "static"
+        record_attempt(provider, "product_static", "empty")
+    except UnsupportedRedirect:
+        # Rendering would only be sent to the same place
+        record_attempt(provider, "product_static", "error")
+        raise
+    except Exception as e:
+        record_attempt(provider, "product_static", "error")
+        print(f"Static product fetch failed for {url}, rendering: {e}")
+
+    try:
+        html = await render(url, wait_selector=PRODUCT_READY_SELECTOR, timeout=render_timeout,
+                            allow_navigation=is_product_url)
+    except Exception:
+        record_attempt(provider, "product_browser", "error")
+        raise
+    with stage(provider, "product_parse"):
+        data = parse_structured_data(html)
+    found = has_product_data(data)
+    record_attempt(provider, "product_browser", "ok" if found else "empty", int(found))
+    return _finish(data, url, provider), "browser"
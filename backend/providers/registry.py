@@ -0,0 +1,237 @@
+"""Retailer providers, declared up front and imported on first use.
+
+Each Provider names the domains it serves, what it can do and the cost
+tier of its default path. Entry points are "module:attribute" strings
+resolved the first time they're needed, so importing the app never pulls
+in Selenium or webdriver_manager, and a provider whose module fails to
+import only breaks requests for that provider.
+
+warm_up() (run from the app lifespan unless SEEKLY_WARMUP=0) does that
+loading before the first request instead: it imports every entry point,
+which compiles the extraction plans, runs the providers' warm hooks
+(e.g. resolving chromedriver) and, with SEEKLY_WARMUP_CONNECT=1, opens a
+keep-alive connection to each upstream host.
+"""
+import asyncio
+import importlib
+import inspect
+import os
+import sys
+from dataclasses import dataclass, field
+from operator import attrgetter
+from urllib.parse import urlparse
+
+WARMUP = os.getenv("SEEKLY_WARMUP", "1") != "0"
+WARMUP_CONNECT = os.getenv("SEEKLY_WARMUP_CONNECT", "0") == "1"
+
+# What a provider can be asked for:
+#   search   keyword search, `search(query)` (async generator or coroutine)
+#   scrape   every listing of a search URL, `scrape(url)` async generator
+#   pages    pages of a search URL in order, `pages(url, max_pages)`
+#   product  one product page, `product(url)` -> (data, engine)
+#   api      has a JSON API path
+#   render   may fall back to a browser
+CAPABILITIES = ("search", "scrape", "pages", "product", "api", "render")
+# Helpers a provider may also expose as entry points:
+#   search_url   `search_url(query)` -> the site's search URL for a keyword
+
+# Cost tier of a provider's default path, cheapest first
+COST_API = 1
+COST_HTML = 2
+COST_RENDER = 3
+
+
+class ProviderUnavailable(RuntimeError):
+    pass
+
+
+def _resolve(target: str):
+    module, _, attribute = target.partition(":")
+    return attrgetter(attribute)(importlib.import_module(module))
+
+
+@dataclass
+class Provider:
+    name: str  # retailer id, as in lib.urls.retailer_for_url
+    label: str  # display name used in responses
+    domains: tuple
+    capabilities: frozenset
+    cost: int
+    entry_points: dict  # capability -> "module:attribute"
+    hosts: tuple = ()  # upstream hosts worth a pre-opened connection
+    search_deadline: float = 6.0
+    warm: tuple = ()  # "module:attribute" callables run by warm_up()
+    close: tuple = ()  # "module:attribute" callables run at shutdown, if loaded
+    strategies: str = None  # "module:attribute" of the provider's StrategyRouter
+    _loaded: dict = field(default_factory=dict, repr=False)
+    _error: str = field(default=None, repr=False)
+
+    def matches(self, host: str) -> bool:
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+    def supports(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+    def load(self, capability: str):
+        """The entry point for a capability, imported on first use"""
+        loaded = self._loaded.get(capability)
+        if loaded is None:
+            target = self.entry_points.get(capability)
+            if target is None:
+                raise ValueError(f"{self.label} does not support {capability}")
+            try:
+                loaded = self._loaded[capability] = _resolve(target)
+            except ImportError as e:
+                self._error = f"{target}: {e}"
+                raise ProviderUnavailable(f"{self.label} is unavailable ({e})")
+            self._error = None
+        return loaded
+
+    def status(self) -> dict:
+        status = {
+            "capabilities": sorted(self.capabilities),
+            "cost": self.cost,
+            "loaded": sorted(self._loaded),
+        }
+        if self._error:
+            status["error"] = self._error
+        return status
+
+
+PROVIDERS = (
+    Provider(
+        name="olx",
+        label="OLX",
+        domains=("olx.com.pk", "olx.com"),
+        capabilities=frozenset({"search", "scrape", "pages", "product", "api", "render"}),
+        cost=COST_API,
+        entry_points={
+            "search": "providers.olx:iter_search_olx",
+            "scrape": "providers.olx:iter_scrape_olx",
+            "pages": "providers.olx:iter_olx_pages",
+            "product": "providers.products:scrape_product",
+            "search_url": "providers.olx:build_search_url",
+        },
+        hosts=("www.olx.com.pk",),
+        search_deadline=8.0,
+        warm=("lib.driver_pool:resolve_driver_path",),
+        close=("providers.olx_selenium:driver_pool.close",),
+        strategies="providers.olx:olx_strategies",
+    ),
+    Provider(
+        name="pakwheels",
+        label="PakWheels",
+        domains=("pakwheels.com",),
+        capabilities=frozenset({"search", "scrape", "pages", "product"}),
+        cost=COST_HTML,
+        entry_points={
+            "search": "providers.pakwheels:search_pakwheels",
+            "scrape": "providers.pakwheels:iter_scrape_pakwheels",
+            "pages": "providers.pakwheels:iter_pakwheels_search_httpx",
+            "product": "providers.products:scrape_product",
+        },
+        hosts=("www.pakwheels.com",),
+    ),
+    Provider(
+        name="daraz",
+        label="Daraz",
+        domains=("daraz.pk",),
+        capabilities=frozenset({"search", "product", "api", "render"}),
+        cost=COST_API,
+        entry_points={
+            "search": "providers.daraz:search_daraz",
+            "product": "providers.daraz:scrape_daraz",
+        },
+        hosts=("www.daraz.pk",),
+    ),
+)
+
+
+def get(name: str) -> Provider:
+    """The provider registered under a retailer id"""
+    for provider in PROVIDERS:
+        if provider.name == name:
+            return provider
+    raise KeyError(f"Unknown provider: {name}")
+
+
+def provider_for_url(url: str):
+    """The provider serving a URL's host, None when no provider does"""
+    host = urlparse(url).hostname or ""
+    return next((provider for provider in PROVIDERS if provider.matches(host)), None)
+
+
+def product_provider(url: str):
+    """The provider scraping a product URL, None for anything outside the registry.
+
+    Product URLs come straight from clients, so this is the allowlist that
+    keeps the server from fetching or rendering arbitrary hosts.
+    """
+    if urlparse(url).scheme not in ("http", "https"):
+        return None
+    provider = provider_for_url(url)
+    return provider if provider is not None and provider.supports("product") else None
+
+
+def providers_with(capability: str) -> list:
+    """Providers offering a capability, cheapest first"""
+    return sorted((provider for provider in PROVIDERS if provider.supports(capability)), key=attrgetter("cost"))
+
+
+async def _call(target: str):
+    from lib.executor import run_blocking
+
+    function = _resolve(target)
+    if inspect.iscoroutinefunction(function):
+        await function()
+    else:
+        await run_blocking(function)
+
+
+async def _connect(host: str):
+    from lib.http import fetch
+
+    # Any answer will do, the point is the pooled connection it leaves open
+    await fetch(f"https://{host}/", method="HEAD")
+
+
+async def warm_up(connect: bool = WARMUP_CONNECT):
+    """Load every provider and prepare what its first request would wait on"""
+    for provider in PROVIDERS:
+        for capability in provider.entry_points:
+            try:
+                provider.load(capability)
+            except ProviderUnavailable as e:
+                print(f"Warm-up: {e}")
+
+    steps = [(target, _call(target)) for provider in PROVIDERS for target in provider.warm]
+    if connect:
+        steps += [(host, _connect(host)) for provider in PROVIDERS for host in provider.hosts]
+    results = await asyncio.gather(*(step for _, step in steps), return_exceptions=True)
+    for (name, _), result in zip(steps, results):
+        if isinstance(result, Exception):
+            print(f"Warm-up step {name} failed: {result}")
+
+
+def close_providers():
+    """Run the shutdown hooks of provider modules that were actually imported"""
+    for provider in PROVIDERS:
+        for target in provider.close:
+            if target.partition(":")[0] in sys.modules:
+                try:
+                    _resolve(target)()
+                except Exception as e:
+                    print(f"Error closing {target}: {e}")
+
+
+def providers_status() -> dict:
+    return {provider.name: provider.status() for provider in PROVIDERS}
+
+
+def strategies_status() -> dict:
+    """Engine health of the providers whose strategy router is already imported"""
+    return {
+        provider.name: _resolve(provider.strategies).snapshot()
+        for provider in PROVIDERS
+        if provider.strategies and provider.strategies.partition(":")[0] in sys.modules
+    }
@@ -0,0 +1,67 @@
+from urllib.parse import urljoin
+from lib.listing import Listing
+from lib.schema import Field, Schema
+from lib.structured_parser import parse_json_ld, is_product
+
+OLX_BASE_URL = "https://www.olx.com.pk"
+
+# Covers the current listing grid and the older `_7e3920c1` layout the
+# Playwright scraper was written against
+OLX_SCHEMA = Schema(
+    name="OLX",
+    container='ul._1aad128c li[aria-label="Listing"], li._7e3920c1',
+    fields={
+        "title": Field('div[aria-label="Title"] h2, [data-aut-id="itemTitle"], ._2tW1I', default="No title available"),
+        "price": Field('div[aria-label="Price"] span, [data-aut-id="itemPrice"], ._89yzn', default="Price not available"),
+        "url": Field('a[href*="/item/"]', attr="href", post=lambda href: urljoin(OLX_BASE_URL, href), default="#"),
+        "image": Field("img", attr="src"),
+    },
+    static={"retailer": "OLX", "currency": "PKR"},
+    record=Listing,
+)
+
+
+def format_pakwheels_price(price, currency):
+    # Normalize price display
+    if price and currency:
+        if len(str(price)) > 0:
+            if int(price) > 1000000:
+                return f"Rs {int(price)/100000:.2f} Lacs"
+            return f"Rs {price}"
+    return "Price not available"
+
+
+def build_pakwheels_item(values):
+    nodes = values["listing"]
+    if not nodes:
+        return None
+
+    # Lists and @graph containers are already flattened
+    data = next((node for node in nodes if is_product(node)), nodes[0])
+
+    offer = data.get("offers") or {}
+    if isinstance(offer, list):
+        offer = offer[0] if offer else {}
+    currency = offer.get("priceCurrency", "PKR")
+
+    return Listing(
+        retailer="PakWheels",
+        title=data.get("name") or data.get("description", "No title available"),
+        price=format_pakwheels_price(offer.get("price"), currency),
+        currency=currency,
+        url=offer.get("url") or data.get("url"),
+        image=data.get("image"),
+    )
+
+
+PAKWHEELS_SCHEMA = Schema(
+    name="PakWheels",
+    container="li.search-listing-card",
+    fields={
+        "listing": Field("script[type='application/ld+json']", post=parse_json_ld, default=[]),
+    },
+    build=build_pakwheels_item,
+)
+
+OLX_PLAN = OLX_SCHEMA.compile()
+PAKWHEELS_PLAN = PAKWHEELS_SCHEMA.compile()
@@ -0,0 +1,47 @@
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, HTTPException
+from fastapi.responses import PlainTextResponse
+from lib.profiler import profiler
+
+# Admin endpoints exist only when a token is configured
+ADMIN_TOKEN = os.getenv("SEEKLY_ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiler")
+async def profiler_status():
+    """Profiler settings and the captured slow-request profiles, newest first"""
+    return profiler.status()
+
+@router.post("/profiler")
+async def configure_profiler(
+    enabled: Optional[bool] = Query(None, description="Turn sampling on or off"),
+    rate: Optional[float] = Query(None, ge=0, le=1, description="Fraction of /scrape and /search requests to profile"),
+    slow_ms: Optional[float] = Query(None, ge=0, description="Keep profiles of requests at least this slow"),
+):
+    profiler.configure(enabled=enabled, rate=rate, slow_ms=slow_ms)
+    return profiler.status()
+
+@router.delete("/profiler")
+async def clear_profiles():
+    profiler.clear()
+    return profiler.status()
+
+@router.get("/profiler/{profile_id}.folded", response_class=PlainTextResponse)
+async def collapsed_profile(profile_id: int):
+    """Collapsed stacks of one profile, for flamegraph.pl or speedscope"""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown or evicted profile")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="seekly-{profile_id}.folded"'},
+    )
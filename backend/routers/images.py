@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response
+from lib import thumbnails
+
+router = APIRouter(prefix="/img", tags=["Images"])
+
+# Thumbnails of a URL never change, so clients and CDNs may keep them for long
+CACHE_CONTROL = "public, max-age=604800, stale-while-revalidate=86400, immutable"
+
+@router.get("")
+async def image_thumbnail(
+    request: Request,
+    url: str = Query(..., description="Listing image URL"),
+    w: int = Query(thumbnails.DEFAULT_WIDTH, ge=16, le=2000, description="Bounding box in pixels, snapped to a supported size"),
+):
+    """Small WebP thumbnail of a retailer image"""
+    if not thumbnails.is_allowed(url):
+        raise HTTPException(status_code=400, detail="Images are only proxied from retailer hosts")
+    if not thumbnails.HAS_PILLOW:
+        return RedirectResponse(url, status_code=307)
+
+    width = thumbnails.snap_width(w)
+    etag = f'"{thumbnails.thumbnail_key(url, width)}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data, status = await thumbnails.get_thumbnail(url, width)
+    except thumbnails.ThumbnailError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Image fetch failed: {e}")
+    return Response(data, media_type="image/webp", headers={**headers, "X-Cache": status})
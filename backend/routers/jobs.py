@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Query, HTTPException
+from models import Job
+from lib.serialize import JSONBytesResponse
+from providers.registry import provider_for_url
+from services.dynamic import job_queue, decode_job_result
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+def job_response(record: dict, status_code: int = 200) -> JSONBytesResponse:
+    job = {key: value for key, value in record.items() if key != "result"}
+    if record["status"] == "done":
+        job["data"] = decode_job_result(record["result"])
+        job["count"] = len(job["data"])
+    return JSONBytesResponse(job, status_code=status_code)
+
+@router.post("", response_model=Job, status_code=202)
+async def submit_job(url: str = Query(..., description="URL to scrape")):
+    """Queue a scrape and return at once, poll GET /jobs/{id} for the result"""
+    provider = provider_for_url(url)
+    if provider is None or not provider.supports("scrape"):
+        raise HTTPException(status_code=422, detail=f"Unsupported website: {url}")
+    job_id = await job_queue.enqueue(url)
+    return job_response(await job_queue.get(job_id), status_code=202)
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for the job to finish"),
+):
+    record = await (job_queue.wait(job_id, wait) if wait else job_queue.get(job_id))
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job_response(record)
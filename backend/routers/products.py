@@ -0,0 +1,22 @@
+from typing import Literal
+from fastapi import APIRouter, Query, HTTPException
+from models import ProductBatchRequest
+from lib.streaming import stream_events
+from services.products import iter_product_batch, unsupported_urls, MAX_BATCH_URLS
+
+router = APIRouter(prefix="/products", tags=["Products"])
+
+@router.post("/batch")
+async def scrape_product_batch(
+    batch: ProductBatchRequest,
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="Stream encoding"),
+):
+    """Price-check many product pages, streaming each result as it finishes"""
+    if not batch.urls:
+        raise HTTPException(status_code=422, detail="urls is empty")
+    if len(batch.urls) > MAX_BATCH_URLS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_URLS} urls per batch")
+    rejected = unsupported_urls(batch.urls)
+    if rejected:
+        raise HTTPException(status_code=400, detail=f"Only retailer product pages are supported: {', '.join(rejected[:5])}")
+    return stream_events(iter_product_batch(batch.urls), format)
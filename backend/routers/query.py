@@ -0,0 +1,32 @@
+import time
+from typing import Literal, Optional
+from fastapi import APIRouter, Query, HTTPException
+from models import QueryResponse
+from services.listings import query_listings
+
+router = APIRouter(prefix="/query", tags=["Query"])
+
+@router.get("", response_model=QueryResponse)
+async def query_stored_listings(
+    q: Optional[str] = Query(None, description="Keywords matched against listing titles"),
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest price in rupees"),
+    max_price: Optional[float] = Query(None, ge=0, description="Highest price in rupees"),
+    retailer: Optional[str] = Query(None, description="OLX, PakWheels or Daraz"),
+    sort: Literal["relevance", "newest", "price_asc", "price_desc"] = Query("relevance"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Answer from listings already scraped, without going upstream"""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=422, detail="min_price is above max_price")
+    started = time.perf_counter()
+    results = await query_listings(
+        text=q, min_price=min_price, max_price=max_price, retailer=retailer,
+        sort=sort, limit=limit, offset=offset,
+    )
+    return {
+        "success": True,
+        "data": results,
+        "count": len(results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -1,11 +1,90 @@
-from fastapi import APIRouter, Query
-from services.scraper import scrape_pakwheels, scrape_olx
+from typing import Literal, Optional
+from fastapi import APIRouter, Query, HTTPException
+from models import SearchResponse
+from lib.streaming import stream_events
+from lib.serialize import JSONBytesResponse
+from lib.pagination import CursorError, CursorExpired, paginate, parse_fields, resume
+from services.dynamic import scrape_dynamic_cached, iter_dynamic_events
+from services.search import search_all, iter_search_all
+from services.crawler import stored_results
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
-@router.get("/")
-def search_all(q: str = Query(..., description="Search term")):
-    results = []
-    results.extend(scrape_pakwheels(q))
-    results.extend(scrape_olx(q))
-    return results
+def paged_response(payload: dict, limit: Optional[int], fields) -> JSONBytesResponse:
+    return JSONBytesResponse(paginate(payload, limit, fields))
+
+def parse_fields_or_422(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except CursorError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def resume_or_error(cursor: str, limit: Optional[int], fields) -> JSONBytesResponse:
+    try:
+        return JSONBytesResponse(resume(cursor, limit, fields))
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+@router.get("", response_model=SearchResponse)
+async def search_items(
+    q: Optional[str] = Query(None, description="Search term, queries every provider"),
+    url: Optional[str] = Query(None, description="URL to scrape"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size, returns a next_cursor when more remain"),
+    cursor: Optional[str] = Query(None, description="next_cursor of a previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated listing fields to return"),
+):
+    projection = parse_fields_or_422(fields)
+    if cursor:
+        return resume_or_error(cursor, limit, projection)
+
+    # Watched searches are answered from what the crawler already stored
+    if q or url:
+        stored = await stored_results(url=url if not q else None, query=q)
+        if stored is not None:
+            return paged_response({
+                "success": True,
+                "data": stored,
+                "count": len(stored),
+                "source": "Store",
+                "cached": True,
+                "cache": "store",
+            }, limit, projection)
+
+    if q:
+        results, providers = await search_all(q)
+        return paged_response({
+            "success": any(p["status"] == "ok" for p in providers.values()),
+            "data": results,
+            "count": len(results),
+            "source": "All",
+            "providers": providers,
+        }, limit, projection)
+    if not url:
+        raise HTTPException(status_code=422, detail="Either q or url is required")
+
+    try:
+        result, cache_status = await scrape_dynamic_cached(url)
+        return paged_response({
+            "success": True,
+            "data": result,
+            "count": len(result),
+            "source": "OLX" if "olx" in url.lower() else "Unknown",
+            "cached": cache_status != "miss",
+            "cache": cache_status,
+        }, limit, projection)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+@router.get("/stream")
+async def search_items_stream(
+    q: Optional[str] = Query(None, description="Search term, queries every provider"),
+    url: Optional[str] = Query(None, description="URL to scrape"),
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="Stream encoding"),
+):
+    if q:
+        return stream_events(iter_search_all(q), format)
+    if not url:
+        raise HTTPException(status_code=422, detail="Either q or url is required")
+    return stream_events(iter_dynamic_events(url), format)
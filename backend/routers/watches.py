@@ -0,0 +1,50 @@
+from typing import List, Optional
+from fastapi import APIRouter, Query, HTTPException
+from models import Watch
+from services.crawler import crawler, normalize_query, watch_urls_for_query, CRAWL_INTERVAL, CRAWL_MAX_PAGES
+
+router = APIRouter(prefix="/watches", tags=["Watches"])
+
+@router.get("", response_model=List[Watch])
+async def list_watches(q: Optional[str] = Query(None, description="Only watches registered for this term")):
+    return await crawler.watches(normalize_query(q) if q else None)
+
+@router.post("", response_model=List[Watch])
+async def add_watch(
+    q: Optional[str] = Query(None, description="Search term, watched on every crawlable provider"),
+    url: Optional[str] = Query(None, description="Search URL to watch"),
+    priority: int = Query(10, ge=0, description="Lower values are crawled first"),
+    interval: float = Query(CRAWL_INTERVAL, ge=60, description="Seconds between refreshes"),
+    max_pages: int = Query(CRAWL_MAX_PAGES, ge=1, le=10, description="Pages fetched per refresh"),
+):
+    if q:
+        query = normalize_query(q)
+        urls = watch_urls_for_query(query)
+    elif url:
+        query, urls = None, [url]
+    else:
+        raise HTTPException(status_code=422, detail="Either q or url is required")
+    try:
+        return [
+            await crawler.watch(watch_url, query, priority=priority, interval=interval, max_pages=max_pages)
+            for watch_url in urls
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.delete("")
+async def remove_watch(url: str = Query(..., description="Watched search URL")):
+    if not await crawler.unwatch(url):
+        raise HTTPException(status_code=404, detail="Not watched")
+    return {"success": True}
+
+@router.post("/refresh", response_model=Watch)
+async def refresh_watch(url: str = Query(..., description="Watched search URL")):
+    watch = await crawler.refresh(url)
+    if watch is None:
+        raise HTTPException(status_code=404, detail="Not watched")
+    return watch
+
+@router.get("/status")
+async def crawler_status():
+    return crawler.status()
@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import os
+import random
+import time
+from urllib.parse import urlparse, quote
+
+from lib.executor import run_blocking
+from lib.store import ListingStore
+from lib.thumbnails import rewrite_images
+from services.listings import get_listing_store
+from providers import registry
+from providers.registry import provider_for_url
+
+CRAWL_TICK = float(os.getenv("SEEKLY_CRAWL_TICK", "5"))
+CRAWL_CONCURRENCY = int(os.getenv("SEEKLY_CRAWL_CONCURRENCY", "4"))
+CRAWL_JITTER = float(os.getenv("SEEKLY_CRAWL_JITTER", "0.1"))
+CRAWL_INTERVAL = float(os.getenv("SEEKLY_CRAWL_INTERVAL", "600"))
+CRAWL_MAX_PAGES = int(os.getenv("SEEKLY_CRAWL_MAX_PAGES", "3"))
+CRAWL_TIMEOUT = float(os.getenv("SEEKLY_CRAWL_TIMEOUT", "60"))
+
+# How many crawls may hit one upstream at once, on top of its rate limiter
+HOST_BUDGETS = {
+    "www.olx.com.pk": 2,
+    "www.pakwheels.com": 1,
+}
+DEFAULT_BUDGET = 1
+
+# Manual refreshes jump ahead of every scheduled crawl
+URGENT_PRIORITY = -1
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def watch_urls_for_query(query: str) -> list:
+    """Search URLs registered when a keyword (rather than a URL) is watched"""
+    return [
+        registry.get("olx").load("search_url")(query),
+        f"https://www.pakwheels.com/used-cars/search/-/?q={quote(query.strip())}",
+    ]
+
+
+async def iter_pages(url: str, max_pages: int):
+    """Yield result pages of a search URL strictly in page order"""
+    provider = provider_for_url(url)
+    if provider is None or not provider.supports("pages"):
+        raise ValueError(f"Unsupported website: {url}")
+    async for items in provider.load("pages")(url, max_pages=max_pages):
+        yield items
+
+
+class CrawlScheduler:
+    """Background refresh of watched searches into the listing store.
+
+    Every tick, due watches are pushed onto a priority queue (lower
+    priority value first). `concurrency` workers each take the most urgent
+    queued watch once they are free, so priority decides what runs next.
+    A crawl waits for its host's budget and walks the first `max_pages`
+    pages in order; listings already stored are upserted, not duplicated.
+    The search URLs don't promise newest-first results, so a known listing
+    is no sign the later pages hold nothing new. The next run is scheduled
+    one interval later, with jitter so watches don't synchronize.
+
+    Without a `store` the shared listing store is used, opened on first use.
+    """
+
+    def __init__(self, store: ListingStore = None, concurrency: int = CRAWL_CONCURRENCY, tick: float = CRAWL_TICK):
+        self._store = store
+        self._tick = tick
+        self._concurrency = concurrency
+        self._budgets = {}
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        # url -> (priority, order) of its live queue entry; entries replaced
+        # by a more urgent one stay in the queue and are skipped when taken
+        self._pending = {}
+        self._running = set()
+        self._workers = []
+        self._runner = None
+
+    @property
+    def store(self) -> ListingStore:
+        return self._store if self._store is not None else get_listing_store()
+
+    def start(self):
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self._concurrency)]
+
+    async def stop(self):
+        tasks = [task for task in (self._runner, *self._workers) if task is not None]
+        self._runner = None
+        self._workers = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def watch(self, url: str, query: str = None, priority: int = 10,
+                    interval: float = CRAWL_INTERVAL, max_pages: int = CRAWL_MAX_PAGES) -> dict:
+        provider = provider_for_url(url)
+        if provider is None or not provider.supports("pages"):
+            raise ValueError(f"Unsupported website: {url}")
+        watch = await run_blocking(self.store.add_watch, url, query, priority, interval, max_pages)
+        self._enqueue(watch)
+        return watch
+
+    async def watches(self, query: str = None) -> list:
+        return await run_blocking(self.store.list_watches, query)
+
+    async def unwatch(self, url: str) -> bool:
+        return await run_blocking(self.store.remove_watch, url)
+
+    async def refresh(self, url: str):
+        """Queue a watch ahead of everything else, returns it or None"""
+        watch = await run_blocking(self.store.get_watch, url)
+        if watch is not None:
+            self._enqueue(watch, URGENT_PRIORITY)
+        return watch
+
+    def status(self) -> dict:
+        return {
+            "running": self._runner is not None,
+            "queued": len(self._pending),
+            "in_flight": len(self._running),
+        }
+
+    def _enqueue(self, watch: dict, priority: int = None):
+        url = watch["url"]
+        priority = watch["priority"] if priority is None else priority
+        queued = self._pending.get(url)
+        if url in self._running or (queued is not None and queued[0] <= priority):
+            return
+        # A more urgent request for a queued watch goes in as a new entry,
+        # which a free worker takes right away
+        entry = self._pending[url] = (priority, next(self._order))
+        self._queue.put_nowait((*entry, url))
+
+    async def _run(self):
+        while True:
+            try:
+                for watch in await run_blocking(self.store.due_watches, time.time()):
+                    self._enqueue(watch)
+            except Exception as e:
+                print(f"Crawl scheduler error: {e}")
+            await asyncio.sleep(self._tick)
+
+    async def _work(self):
+        while True:
+            priority, order, url = await self._queue.get()
+            if self._pending.get(url) != (priority, order):
+                continue  # superseded by a more urgent entry
+            del self._pending[url]
+            self._running.add(url)
+            try:
+                await self._crawl(url)
+            except Exception as e:
+                print(f"Crawl scheduler error: {e}")
+            finally:
+                self._running.discard(url)
+
+    def _budget(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        budget = self._budgets.get(host)
+        if budget is None:
+            budget = self._budgets[host] = asyncio.Semaphore(HOST_BUDGETS.get(host, DEFAULT_BUDGET))
+        return budget
+
+    async def _crawl(self, url: str):
+        async with self._budget(url):
+            watch = await run_blocking(self.store.get_watch, url)
+            if watch is None:
+                return
+            new_count, error = 0, None
+            try:
+                async with asyncio.timeout(CRAWL_TIMEOUT):
+                    new_count = await self._crawl_watch(watch)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                print(f"Crawl of {url} failed: {error}")
+            jitter = random.uniform(-CRAWL_JITTER, CRAWL_JITTER)
+            next_run = time.time() + watch["interval"] * (1 + jitter)
+            await run_blocking(self.store.finish_run, url, next_run, new_count, error)
+
+    async def _crawl_watch(self, watch: dict) -> int:
+        url = watch["url"]
+        new_count = 0
+        async for items in iter_pages(url, watch["max_pages"]):
+            new_count += await run_blocking(self.store.save, url, items)
+        print(f"Crawled {url}: {new_count} new listings")
+        return new_count
+
+
+crawler = CrawlScheduler()
+
+
+async def stored_results(url: str = None, query: str = None):
+    """Listings the crawler holds for a watched URL or keyword.
+
+    Returns None when nothing matching is watched or no crawl has finished
+    yet, so callers fall back to a live scrape.
+    """
+    if url is not None:
+        watch = await run_blocking(get_listing_store().get_watch, url)
+        watches = [watch] if watch else []
+    else:
+        watches = await run_blocking(get_listing_store().list_watches, normalize_query(query))
+    crawled = [watch["url"] for watch in watches if watch["last_run"] is not None]
+    if not crawled:
+        return None
+    return rewrite_images(await run_blocking(get_listing_store().results, crawled))
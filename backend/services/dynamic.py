@@ -1,21 +1,97 @@
-from providers.olx_selenium_optimized import scrape_olx_fast_selenium, scrape_olx_async
-from providers.pakwheels import scrape_pakwheels_search_httpx
-import asyncio
-
-def scrape_dynamic(url: str):
-    if "olx.com.pk" in url or "olx.com" in url:
-        try:
-            # Use the optimized synchronous version
-            # return scrape_olx_fast_selenium(url, max_pages=3)
-            
-            # Or use async version for even better performance:
-            return asyncio.run(scrape_olx_async(url, max_pages=5))
-            
-        except Exception as e:
-            print(f"Optimized OLX scraping failed: {e}")
-            # Fallback to basic method
-            return scrape_olx_fast_selenium(url, max_pages=1)
-    elif "pakwheels.com" in url:
-        return scrape_pakwheels_search_httpx(url)
-    else:
-        raise ValueError(f"Unsupported website: {url}")
\ No newline at end of file
+from providers.registry import provider_for_url
+from lib.cache import ResultCache
+from lib.jobs import JOB_WORKERS, JobWorker, create_job_queue
+from lib.accumulator import ResultAccumulator
+from lib.listing import Listing
+from lib.thumbnails import rewrite_images
+from services.listings import ingest_later
+from lib.metrics import CACHE_LOOKUPS, stage
+import os
+import time
+
+result_cache = ResultCache(decode=lambda rows: [Listing.from_dict(row) for row in rows])
+
+# POST /jobs scrapes always run as queued jobs. /scrape (and /search?url=)
+# go through the queue too when it is shared (Redis), so scraping happens
+# on the worker fleet; with the in-process queue they stay inline, where a
+# job would only add the queue's caps and backoff in front of the caller
+job_queue = create_job_queue()
+# How long a queued /scrape waits on its job, retries included
+JOB_WAIT = float(os.getenv("SEEKLY_JOB_WAIT", "180"))
+
+async def scrape_dynamic(url: str):
+    results = ResultAccumulator()
+    async for items in iter_dynamic(url):
+        with stage("dynamic", "dedup"):
+            results.extend(items)
+    return results.items
+
+async def iter_dynamic(url: str):
+    """Yield scraped items in batches (one per page) as they arrive"""
+    async for items in _iter_dynamic(url):
+        ingest_later(items)
+        yield rewrite_images(items)
+
+async def _iter_dynamic(url: str):
+    provider = provider_for_url(url)
+    if provider is None or not provider.supports("scrape"):
+        raise ValueError(f"Unsupported website: {url}")
+    async for items in provider.load("scrape")(url):
+        yield items
+
+async def iter_dynamic_events(url: str):
+    """Stream events for a URL scrape: one "batch" per page, then "done"."""
+    started = time.perf_counter()
+    results = ResultAccumulator()
+    batches = 0
+    error = None
+    try:
+        async for items in iter_dynamic(url):
+            with stage("dynamic", "dedup"):
+                new_items = results.extend(items)
+            batches += 1
+            yield {
+                "type": "batch",
+                "items": new_items,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+    except Exception as e:
+        error = str(e)
+    done = {
+        "type": "done",
+        "success": error is None,
+        "count": len(results),
+        "duplicates": results.duplicates,
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    if error:
+        done["error"] = error
+    yield done
+
+def decode_job_result(rows):
+    """Job results come back as dicts from a shared backend"""
+    return [Listing.from_dict(row) if isinstance(row, dict) else row for row in rows or ()]
+
+def create_job_worker(concurrency: int = JOB_WORKERS):
+    return JobWorker(job_queue, scrape_dynamic, concurrency)
+
+async def scrape_dynamic_job(url: str):
+    """scrape_dynamic through the shared job queue, waiting for the job to finish"""
+    job_id = await job_queue.enqueue(url)
+    record = await job_queue.wait(job_id, JOB_WAIT)
+    if record is None or record["status"] not in ("done", "failed"):
+        raise TimeoutError(f"Scrape job {job_id} is still {record['status'] if record else 'unknown'}")
+    if record["status"] == "failed":
+        raise Exception(record["error"])
+    return decode_job_result(record["result"])
+
+async def scrape_dynamic_cached(url: str):
+    """A URL scrape behind the result cache, returns (items, cache status).
+
+    Runs as a job on the shared queue when there is one, inline otherwise.
+    """
+    fetcher = scrape_dynamic if job_queue.name == "memory" else scrape_dynamic_job
+    items, status = await result_cache.get_or_fetch(url, fetcher)
+    CACHE_LOOKUPS.inc(status=status)
+    return items, status
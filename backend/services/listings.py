@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+from lib.executor import run_blocking
+from lib.store import ListingStore
+from lib.thumbnails import rewrite_images
+
+_listing_store = None
+_listing_store_lock = threading.Lock()
+_pending = set()
+
+
+def get_listing_store() -> ListingStore:
+    """The shared listing store, opened on first use rather than at import"""
+    global _listing_store
+    if _listing_store is None:
+        with _listing_store_lock:
+            if _listing_store is None:
+                _listing_store = ListingStore()
+    return _listing_store
+
+
+def close():
+    global _listing_store
+    with _listing_store_lock:
+        if _listing_store is not None:
+            _listing_store.close()
+            _listing_store = None
+
+
+def ingest_later(items):
+    """Persist scraped items in the background, never delaying the response"""
+    if not items:
+        return
+    task = asyncio.create_task(_ingest(list(items)))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _ingest(items):
+    try:
+        await run_blocking(get_listing_store().ingest, items)
+    except Exception as e:
+        print(f"Could not store scraped listings: {e}")
+
+
+async def query_listings(**filters) -> list:
+    return rewrite_images(await run_blocking(get_listing_store().query, **filters))
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+
+from lib.thumbnails import proxied
+from providers.registry import product_provider
+
+# Product pages worked on at once; browser renders are further capped by
+# the render context pool
+BATCH_CONCURRENCY = int(os.getenv("SEEKLY_BATCH_CONCURRENCY", "16"))
+MAX_BATCH_URLS = int(os.getenv("SEEKLY_BATCH_MAX_URLS", "500"))
+
+
+def unsupported_urls(urls) -> list:
+    """URLs no registered provider scrapes, which a batch must not fetch"""
+    return [url for url in urls if product_provider(url) is None]
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def iter_product_batch(urls, concurrency: int = BATCH_CONCURRENCY):
+    """Scrape product pages concurrently and yield events as they finish.
+
+    Yields one `{"type": "product", "url", "success", "engine", "data" |
+    "error", "elapsed_ms"}` per distinct URL in completion order, then a
+    `{"type": "done", ...}` summary.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(url: str):
+        async with semaphore:
+            page_started = time.perf_counter()
+            try:
+                data, engine = await product_provider(url).load("product")(url)
+                data["image"] = proxied(data.get("image"))
+            except Exception as e:
+                return {"type": "product", "url": url, "success": False, "error": str(e),
+                        "elapsed_ms": _elapsed_ms(page_started)}
+            return {"type": "product", "url": url, "success": True, "engine": engine, "data": data,
+                    "elapsed_ms": _elapsed_ms(page_started)}
+
+    tasks = [asyncio.create_task(one(url)) for url in dict.fromkeys(urls)]
+    engines = {}
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event = await next_done
+            if event["success"]:
+                engines[event["engine"]] = engines.get(event["engine"], 0) + 1
+            else:
+                failed += 1
+            yield event
+    finally:
+        # The client went away mid-stream, stop scraping for it
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "type": "done",
+        "count": len(tasks) - failed,
+        "failed": failed,
+        "engines": engines,
+        "elapsed_ms": _elapsed_ms(started),
+    }
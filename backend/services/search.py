@@ -0,0 +1,110 @@
+import asyncio
+import inspect
+import os
+import time
+
+from lib.accumulator import ResultAccumulator
+from providers.registry import providers_with
+from services.listings import ingest_later
+from lib.metrics import record_attempt
+from lib.thumbnails import rewrite_images
+
+SEARCH_BUDGET = float(os.getenv("SEEKLY_SEARCH_BUDGET", "10"))
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _provider_batches(search, query: str):
+    # Async generator functions stream one batch per page, plain coroutines
+    # produce a single batch
+    if inspect.isasyncgenfunction(search):
+        async for items in search(query):
+            yield items
+    else:
+        yield await search(query)
+
+
+async def _pump_provider(provider, query: str, deadline: float, queue: asyncio.Queue):
+    """Forward a provider's batches to the queue, then its final status"""
+    name = provider.label
+    started = time.perf_counter()
+    count = 0
+    status = {"status": "ok"}
+    try:
+        async with asyncio.timeout(deadline):
+            async for items in _provider_batches(provider.load("search"), query):
+                count += len(items)
+                ingest_later(items)
+                await queue.put(("batch", name, rewrite_images(items)))
+    except TimeoutError:
+        status = {"status": "timeout"}
+    except Exception as e:
+        status = {"status": "error", "error": str(e)}
+    status.update(count=count, elapsed_ms=_elapsed_ms(started))
+    record_attempt(provider.name, "search", status["status"], count)
+    await queue.put(("status", name, status))
+
+
+async def iter_search_all(query: str, budget: float = SEARCH_BUDGET):
+    """Query every provider concurrently and yield events as they happen.
+
+    Yields `{"type": "batch", "provider", "items", "elapsed_ms"}` for every
+    page a provider parses, then one `{"type": "done", ...}` event with the
+    per-provider statuses. Each provider runs under its own deadline; any
+    still running when the overall budget is spent are cancelled and
+    reported as timeouts.
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + budget
+    queue = asyncio.Queue()
+    tasks = {
+        provider.label: asyncio.create_task(_pump_provider(provider, query, min(provider.search_deadline, budget), queue))
+        for provider in providers_with("search")
+    }
+
+    providers = {}
+    results = ResultAccumulator()
+    try:
+        while len(providers) < len(tasks):
+            remaining = give_up_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                kind, name, payload = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if kind == "status":
+                providers[name] = payload
+            else:
+                # Drop listings already sent, including cross-retailer reposts
+                new_items = results.extend(payload)
+                if new_items:
+                    yield {"type": "batch", "provider": name, "items": new_items, "elapsed_ms": _elapsed_ms(started)}
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    for name in tasks:
+        providers.setdefault(name, {"status": "timeout", "elapsed_ms": _elapsed_ms(started)})
+    yield {
+        "type": "done",
+        "count": len(results),
+        "duplicates": results.duplicates,
+        "providers": providers,
+        "elapsed_ms": _elapsed_ms(started),
+    }
+
+
+async def search_all(query: str, budget: float = SEARCH_BUDGET):
+    """Collect iter_search_all into (results, per-provider statuses)"""
+    results = []
+    providers = {}
+    async for event in iter_search_all(query, budget):
+        if event["type"] == "batch":
+            results.extend(event["items"])
+        else:
+            providers = event["providers"]
+    return results, providers
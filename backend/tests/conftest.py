@@ -0,0 +1,13 @@
+import pytest
+
+from lib.store import ListingStore
+from services import listings
+
+
+@pytest.fixture(autouse=True)
+def listing_store(monkeypatch):
+    """A fresh in-memory listing store per test, never the on-disk default"""
+    store = ListingStore(":memory:")
+    monkeypatch.setattr(listings, "_listing_store", store)
+    yield store
+    store.close()
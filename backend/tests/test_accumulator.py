@@ -0,0 +1,44 @@
+from lib.accumulator import ResultAccumulator
+from lib.listing import Listing
+from lib.urls import canonical_listing_url
+
+
+def listing(url, title="Honda Civic 2018", price="Rs 45,00,000", retailer="OLX"):
+    return Listing(retailer=retailer, title=title, price=price, currency="PKR", url=url)
+
+
+def test_same_olx_listing_under_different_slugs_and_tracking():
+    a = "https://www.olx.com.pk/item/honda-civic-2018-iid-1234567890"
+    b = "https://olx.com.pk/item/civic-reborn-iid-1234567890/?utm_source=fb"
+    assert canonical_listing_url(a) == canonical_listing_url(b) == "olx:1234567890"
+
+
+def test_drops_url_duplicates_and_counts_them():
+    results = ResultAccumulator(fingerprints=False)
+    first = listing("https://www.olx.com.pk/item/a-iid-1")
+    new = results.extend([first, listing("https://www.olx.com.pk/item/b-iid-1?fbclid=x"), None])
+    assert new == [first]
+    assert results.duplicates == 1
+    assert len(results) == 1
+
+
+def test_fingerprint_catches_reposts_across_retailers():
+    results = ResultAccumulator()
+    results.add(listing("https://www.olx.com.pk/item/a-iid-1"))
+    assert not results.add(listing("https://www.pakwheels.com/used-cars/civic-99", title="Honda  civic 2018!", retailer="PakWheels"))
+    assert results.duplicates == 1
+
+
+def test_placeholder_prices_are_not_fingerprinted():
+    results = ResultAccumulator()
+    results.add(listing("https://www.olx.com.pk/item/a-iid-1", price="Price not available"))
+    assert results.add(listing("https://www.olx.com.pk/item/b-iid-2", price="Price not available"))
+    assert len(results) == 2
+
+
+def test_extend_returns_only_new_items_in_order():
+    results = ResultAccumulator()
+    batch = [listing(f"https://www.olx.com.pk/item/x-iid-{n}", title=f"Car {n}") for n in range(3)]
+    assert results.extend(batch) == batch
+    assert results.extend(batch) == []
+    assert results.items == batch
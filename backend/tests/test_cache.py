@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from lib.cache import ResultCache
+
+URL = "https://www.olx.com.pk/items/q-civic"
+
+
+def test_concurrent_misses_share_one_fetch():
+    calls = 0
+
+    async def fetcher(url):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["listing"]
+
+    async def run():
+        cache = ResultCache(disk_path=None)
+        results = await asyncio.gather(*(cache.get_or_fetch(URL, fetcher) for _ in range(5)))
+        return results, await cache.get_or_fetch(URL, fetcher)
+
+    results, again = asyncio.run(run())
+    assert calls == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 4 + ["miss"]
+    assert again == (["listing"], "hit")
+
+
+def test_waiters_share_the_leaders_error():
+    async def fetcher(url):
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        cache = ResultCache(disk_path=None)
+        return await asyncio.gather(*(cache.get_or_fetch(URL, fetcher) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_leader_does_not_strand_waiters():
+    calls = 0
+
+    async def fetcher(url):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [calls]
+
+    async def run():
+        cache = ResultCache(disk_path=None)
+        leader = asyncio.create_task(cache.get_or_fetch(URL, fetcher))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch(URL, fetcher))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        value = await asyncio.wait_for(waiter, 1)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return value, len(cache._flights)
+
+    (value, status), inflight = asyncio.run(run())
+    assert value == [2] and status == "miss"
+    assert inflight == 0
+
+
+def test_failed_background_refresh_is_logged(monkeypatch, capsys):
+    async def run():
+        cache = ResultCache(disk_path=None)
+        await cache.get_or_fetch(URL, lambda url: asyncio.sleep(0, ["old"]))
+        entry = cache._entries[next(iter(cache._entries))]
+        entry.fresh_until = 0
+
+        async def failing(url):
+            raise RuntimeError("refresh broke")
+
+        value = await cache.get_or_fetch(URL, failing)
+        await asyncio.gather(*cache._refreshing, return_exceptions=True)
+        await asyncio.sleep(0)
+        return value
+
+    assert asyncio.run(run()) == (["old"], "stale")
+    assert "refresh broke" in capsys.readouterr().out
+
+
+def test_concurrent_stale_hits_share_one_refresh():
+    calls = 0
+
+    async def fetcher(url):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["new"]
+
+    async def run():
+        cache = ResultCache(disk_path=None)
+        await cache.get_or_fetch(URL, lambda url: asyncio.sleep(0, ["old"]))
+        cache._entries[next(iter(cache._entries))].fresh_until = 0
+        results = await asyncio.gather(*(cache.get_or_fetch(URL, fetcher) for _ in range(5)))
+        await asyncio.gather(*cache._refreshing)
+        return results, await cache.get_or_fetch(URL, fetcher)
+
+    results, again = asyncio.run(run())
+    assert results == [(["old"], "stale")] * 5
+    assert calls == 1
+    assert again == (["new"], "hit")
+
+
+def test_disk_hits_respect_the_entry_limit(tmp_path):
+    async def run():
+        path = str(tmp_path / "cache.db")
+        writer = ResultCache(disk_path=path)
+        for n in range(3):
+            await writer.get_or_fetch(f"{URL}-{n}", lambda url: asyncio.sleep(0, [url]))
+        writer.close()
+
+        reader = ResultCache(max_entries=2, disk_path=path)
+        for n in range(3):
+            assert (await reader.get_or_fetch(f"{URL}-{n}", None))[1] == "hit"
+        reader.close()
+        return len(reader._entries)
+
+    assert asyncio.run(run()) == 2
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from lib.listing import Listing
+from lib.store import ListingStore
+from services import crawler
+from services.crawler import CrawlScheduler
+
+OLX = "https://www.olx.com.pk/cars_c84/q-{}"
+
+
+def _scheduler(concurrency=1):
+    scheduler = CrawlScheduler(ListingStore(":memory:"), concurrency=concurrency, tick=3600)
+    crawled = []
+
+    async def crawl_watch(watch):
+        crawled.append(watch["url"])
+        await asyncio.sleep(0.01)
+        return 0
+
+    scheduler._crawl_watch = crawl_watch
+    return scheduler, crawled
+
+
+async def _drain(scheduler, count, crawled):
+    scheduler.start()
+    try:
+        while len(crawled) < count or scheduler.status()["in_flight"]:
+            await asyncio.sleep(0.005)
+    finally:
+        await scheduler.stop()
+
+
+def test_workers_take_watches_in_priority_order():
+    async def run():
+        scheduler, crawled = _scheduler()
+        for name, priority in (("civic", 10), ("corolla", 1), ("city", 5)):
+            await scheduler.watch(OLX.format(name), priority=priority)
+        await _drain(scheduler, 3, crawled)
+        return crawled
+
+    assert asyncio.run(run()) == [OLX.format("corolla"), OLX.format("city"), OLX.format("civic")]
+
+
+def test_urgent_refresh_jumps_ahead_of_a_pending_watch():
+    async def run():
+        scheduler, crawled = _scheduler()
+        for name, priority in (("civic", 10), ("corolla", 1), ("city", 5)):
+            await scheduler.watch(OLX.format(name), priority=priority)
+        await scheduler.refresh(OLX.format("civic"))
+        assert scheduler.status()["queued"] == 3
+        await _drain(scheduler, 3, crawled)
+        return crawled
+
+    # Crawled once, first, and its superseded entry is skipped
+    assert asyncio.run(run()) == [OLX.format("civic"), OLX.format("corolla"), OLX.format("city")]
+
+
+def test_refresh_while_idle_runs_without_waiting_for_a_tick():
+    async def run():
+        scheduler, crawled = _scheduler(concurrency=2)
+        scheduler.start()
+        try:
+            await asyncio.sleep(0.01)
+            await asyncio.to_thread(scheduler.store.add_watch, OLX.format("alto"))
+            assert await scheduler.refresh(OLX.format("alto")) is not None
+            async with asyncio.timeout(1):
+                while not crawled:
+                    await asyncio.sleep(0.005)
+        finally:
+            await scheduler.stop()
+        return crawled
+
+    assert asyncio.run(run()) == [OLX.format("alto")]
+
+
+def test_finished_crawl_schedules_the_next_run():
+    async def run():
+        scheduler, crawled = _scheduler()
+        await scheduler.watch(OLX.format("civic"), interval=600)
+        await _drain(scheduler, 1, crawled)
+        return scheduler.store.get_watch(OLX.format("civic"))
+
+    watch = asyncio.run(run())
+    assert watch["last_run"] is not None
+    assert watch["next_run"] > watch["last_run"] + 500
+
+
+def test_crawl_walks_every_page_past_known_listings(monkeypatch):
+    def page(*ids):
+        return [Listing("OLX", f"Civic {n}", f"Rs {n}", "PKR", f"https://www.olx.com.pk/item/civic-iid-{n}") for n in ids]
+
+    async def pages(url, max_pages):
+        # Not newest first: a known listing leads, the new ones follow
+        for items in (page(1, 2), page(3), page(4))[:max_pages]:
+            yield items
+
+    monkeypatch.setattr(crawler, "iter_pages", pages)
+
+    async def run():
+        scheduler = CrawlScheduler(ListingStore(":memory:"), tick=3600)
+        watch = await scheduler.watch(OLX.format("civic"), max_pages=3)
+        scheduler.store.save(watch["url"], page(1))
+        return await scheduler._crawl_watch(watch)
+
+    assert asyncio.run(run()) == 3
+
+
+def test_importing_the_app_opens_no_store(tmp_path):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "SEEKLY_STORE_DB": str(tmp_path / "store.db")}
+    subprocess.run([sys.executable, "-c", "import main, worker"], cwd=backend, env=env, check=True)
+    assert not (tmp_path / "store.db").exists()
@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from lib.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.healthy = True
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("session gone")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+
+    return DriverPool(factory, **kwargs), created
+
+
+def test_reuses_warm_session():
+    pool, created = make_pool(size=2)
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second
+    assert len(created) == 1
+
+
+def test_recycles_after_max_pages():
+    pool, created = make_pool(size=1, max_pages=2)
+    for _ in range(3):
+        with pool.session():
+            pass
+    assert len(created) == 2
+    assert created[0].quit_called
+
+
+def test_replaces_unhealthy_session():
+    pool, created = make_pool(size=1)
+    with pool.session() as driver:
+        pass
+    driver.healthy = False
+    with pool.session() as replacement:
+        pass
+    assert replacement is not driver
+    assert driver.quit_called
+
+
+def test_size_caps_concurrent_sessions():
+    pool, _ = make_pool(size=1)
+    borrowed = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.session():
+            borrowed.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    borrowed.wait(5)
+    with pytest.raises(TimeoutError):
+        with pool.session(timeout=0.05):
+            pass
+    release.set()
+    holder.join()
+    with pool.session(timeout=0.05):
+        pass
+
+
+def test_close_quits_idle_sessions_and_refuses_new_ones():
+    pool, created = make_pool(size=2)
+    with pool.session():
+        pass
+    pool.close()
+    assert created[0].quit_called
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            pass
+
+
+def test_prepare_runs_once_on_first_use_and_retries_after_failure():
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("chromedriver download failed")
+
+    pool, created = make_pool(size=2, prepare=prepare)
+    assert calls == []
+    with pytest.raises(OSError):
+        with pool.session():
+            pass
+    assert created == []
+    with pool.session():
+        pass
+    with pool.session(), pool.session():
+        pass
+    assert len(calls) == 2
+    assert len(created) == 2
+
+
+def test_browser_work_waits_on_its_own_threads():
+    import asyncio
+    import time
+
+    from lib.executor import run_blocking
+
+    pool, _ = make_pool(size=2)
+    started_pages = []
+
+    def load_page():
+        started_pages.append(1)
+        with pool.session():
+            time.sleep(0.2)
+        return 1
+
+    async def run():
+        pages = [asyncio.ensure_future(pool.run(load_page)) for _ in range(12)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await run_blocking(lambda: None)
+        waited = time.perf_counter() - started
+        # Pages nobody waits for any more never start
+        for page in pages[4:]:
+            page.cancel()
+        done = await asyncio.gather(*pages[:4])
+        await asyncio.gather(*pages[4:], return_exceptions=True)
+        return waited, done
+
+    waited, done = asyncio.run(run())
+    pool.close()
+    assert waited < 0.1
+    assert done == [1, 1, 1, 1]
+    assert len(started_pages) <= 6
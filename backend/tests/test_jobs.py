@@ -0,0 +1,194 @@
+import asyncio
+import secrets
+
+import pytest
+
+from lib import jobs
+from lib.jobs import JobWorker, MemoryJobQueue, PermanentJobError, RedisJobQueue
+
+OLX = "https://www.olx.com.pk/items/q-civic"
+
+
+@pytest.fixture(autouse=True)
+def quick_retries(monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(jobs, "backoff", lambda attempts: 0.01)
+
+
+def _flaky(failures: int, error=RuntimeError):
+    calls = []
+
+    async def handler(url):
+        calls.append(url)
+        if len(calls) <= failures:
+            raise error("upstream hiccup")
+        return [{"url": url}]
+
+    return handler, calls
+
+
+async def _run_job(queue, handler, url=OLX, timeout=10):
+    worker = JobWorker(queue, handler, concurrency=2)
+    worker.start()
+    try:
+        job_id = await queue.enqueue(url)
+        return await queue.wait(job_id, timeout)
+    finally:
+        await worker.stop()
+        await queue.close()
+
+
+def test_failed_jobs_are_retried_until_they_succeed():
+    handler, calls = _flaky(2)
+    record = asyncio.run(_run_job(MemoryJobQueue(), handler))
+    assert record["status"] == "done"
+    assert record["attempts"] == 3
+    assert record["result"] == [{"url": OLX}]
+    assert len(calls) == 3
+
+
+def test_jobs_fail_once_attempts_run_out():
+    handler, calls = _flaky(10)
+    record = asyncio.run(_run_job(MemoryJobQueue(), handler))
+    assert record["status"] == "failed"
+    assert record["attempts"] == 3
+    assert record["error"] == "upstream hiccup"
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("error", [ValueError, PermanentJobError])
+def test_permanent_errors_are_not_retried(error):
+    handler, calls = _flaky(10, error)
+    record = asyncio.run(_run_job(MemoryJobQueue(), handler))
+    assert record["status"] == "failed"
+    assert len(calls) == 1
+
+
+def test_per_retailer_cap_limits_running_jobs():
+    running = peak = 0
+
+    async def handler(url):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return []
+
+    async def run():
+        queue = MemoryJobQueue(caps={"olx": 2})
+        worker = JobWorker(queue, handler, concurrency=6)
+        worker.start()
+        try:
+            ids = [await queue.enqueue(f"{OLX}-{n}") for n in range(6)]
+            return [await queue.wait(job_id, 5) for job_id in ids]
+        finally:
+            await worker.stop()
+
+    records = asyncio.run(run())
+    assert all(record["status"] == "done" for record in records)
+    assert peak == 2
+
+
+@pytest.fixture(scope="module")
+def redis_url():
+    from bench import redis_stub
+
+    return f"redis://127.0.0.1:{redis_stub.start()}/0"
+
+
+def _redis_queue(redis_url, caps=None):
+    return RedisJobQueue(redis_url, caps=caps or {"olx": 4}, prefix=f"test:{secrets.token_hex(4)}:")
+
+
+def test_redis_queue_retries_through_the_stub(redis_url):
+    handler, calls = _flaky(1)
+    record = asyncio.run(_run_job(_redis_queue(redis_url), handler))
+    assert record["status"] == "done"
+    assert record["attempts"] == 2
+    assert record["result"] == [{"url": OLX}]
+    assert len(calls) == 2
+
+
+def test_redis_queue_fails_permanent_errors_at_once(redis_url):
+    handler, calls = _flaky(10, ValueError)
+    record = asyncio.run(_run_job(_redis_queue(redis_url), handler))
+    assert record["status"] == "failed"
+    assert record["attempts"] == 1
+    assert len(calls) == 1
+
+
+def test_redis_queue_reports_status(redis_url):
+    async def run():
+        queue = _redis_queue(redis_url)
+        try:
+            await queue.enqueue(OLX)
+            return await queue.status()
+        finally:
+            await queue.close()
+
+    status = asyncio.run(run())
+    assert status["backend"] == "redis"
+    assert status["queued"]["olx"] == 1
+    assert status["running"]["olx"] == 0
+
+
+def test_slow_job_keeps_its_lease(redis_url, monkeypatch):
+    # The sweep runs about once a second; without renewal it would take
+    # the job back from its still-running worker and queue a retry
+    monkeypatch.setattr(jobs, "JOB_LEASE", 0.3)
+    queue = _redis_queue(redis_url)
+    job = {}
+    seen = []
+
+    async def slow(url):
+        await asyncio.sleep(1.5)
+        seen.append((await queue.get(job["id"]))["status"])
+        return []
+
+    async def run():
+        worker = JobWorker(queue, slow, concurrency=2)
+        worker.start()
+        try:
+            job["id"] = await queue.enqueue(OLX)
+            return await queue.wait(job["id"], 10)
+        finally:
+            await worker.stop()
+            await queue.close()
+
+    record = asyncio.run(run())
+    assert seen == ["running"]
+    assert record["status"] == "done"
+    assert record["attempts"] == 1
+
+
+def test_url_scrapes_use_the_queue_only_when_it_is_shared(redis_url, monkeypatch):
+    from services import dynamic
+
+    async def scrape(url):
+        return [dynamic.Listing("OLX", "Civic", "Rs 1", "PKR", url)]
+
+    monkeypatch.setattr(dynamic, "scrape_dynamic", scrape)
+
+    async def run(queue):
+        enqueued = []
+        enqueue = queue.enqueue
+
+        async def counting_enqueue(url):
+            enqueued.append(url)
+            return await enqueue(url)
+
+        queue.enqueue = counting_enqueue
+        monkeypatch.setattr(dynamic, "job_queue", queue)
+        monkeypatch.setattr(dynamic, "result_cache", dynamic.ResultCache(disk_path=None))
+        worker = JobWorker(queue, scrape, concurrency=1)
+        worker.start()
+        try:
+            items, _ = await dynamic.scrape_dynamic_cached(OLX)
+            return [item.url for item in items], enqueued
+        finally:
+            await worker.stop()
+            await queue.close()
+
+    assert asyncio.run(run(MemoryJobQueue())) == ([OLX], [])
+    assert asyncio.run(run(_redis_queue(redis_url))) == ([OLX], [OLX])
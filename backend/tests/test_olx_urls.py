@@ -0,0 +1,31 @@
+from lib.urls import create_page_url, get_current_page_number
+from providers.olx import build_api_params, build_search_url, extract_query_from_url
+
+
+def test_query_comes_from_the_path():
+    assert extract_query_from_url("/items/q-honda-civic") == "honda civic"
+    assert extract_query_from_url("/lahore_g4060673/q-city%202018") == "city 2018"
+    assert extract_query_from_url("/cars_c84") == ""
+
+
+def test_api_params_from_a_search_url():
+    params = build_api_params("https://www.olx.com.pk/lahore_g4060673/cars_c84/q-civic?sorting=desc-price")
+    assert params["query"] == "civic"
+    assert params["category"] == "84"
+    assert params["location"] == "4060673"
+    assert params["sorting"] == "desc-price"
+
+
+def test_explicit_q_param_wins():
+    assert build_api_params("https://www.olx.com.pk/items/q-civic?q=corolla")["query"] == "corolla"
+
+
+def test_keyword_round_trips_through_the_search_url():
+    assert build_api_params(build_search_url("honda civic"))["query"] == "honda civic"
+
+
+def test_page_number_round_trips_through_the_url():
+    url = create_page_url("https://www.olx.com.pk/items/q-civic?sorting=desc-price", 3)
+    assert url == "https://www.olx.com.pk/items/q-civic?sorting=desc-price&page=3"
+    assert get_current_page_number(url) == 3
+    assert get_current_page_number("https://www.pakwheels.com/used-cars/search/-/?page=x") == 1
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from lib import http, page_cache
+
+HOST = "pages.example"
+URL = f"https://{HOST}/search?page=1"
+
+parsed_bodies = []
+
+
+def parse_titles(body: bytes):
+    parsed_bodies.append(body)
+    return body.decode().split(",")
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Serve URL from a list of handlers, one per request, on a fresh page cache"""
+    handlers = []
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return handlers.pop(0)(request)
+
+    parsed_bodies.clear()
+    monkeypatch.setattr(http, "UPSTREAM_OVERRIDE", None)
+    monkeypatch.setitem(http._stats, HOST, http.HostStats())
+    monkeypatch.setitem(http._clients, HOST, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    cache = page_cache.PageCache(":memory:")
+    monkeypatch.setattr(page_cache, "_page_cache", cache)
+    yield handlers, requests
+    cache.close()
+
+
+def _fetch_twice():
+    async def run():
+        return [await page_cache.fetch_parsed(URL, parse_titles) for _ in range(2)]
+
+    return asyncio.run(run())
+
+
+def test_not_modified_reuses_the_stored_result(upstream):
+    handlers, requests = upstream
+    handlers.append(lambda request: httpx.Response(200, content=b"civic,city", headers={"ETag": '"v1"'}))
+    handlers.append(lambda request: httpx.Response(304))
+
+    assert _fetch_twice() == [["civic", "city"], ["civic", "city"]]
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert len(parsed_bodies) == 1
+
+
+def test_unchanged_body_is_not_parsed_again(upstream):
+    handlers, requests = upstream
+    handlers.append(lambda request: httpx.Response(200, content=b"civic,city"))
+    handlers.append(lambda request: httpx.Response(200, content=b"civic,city", headers={"ETag": '"v2"'}))
+
+    assert _fetch_twice() == [["civic", "city"], ["civic", "city"]]
+    assert "If-None-Match" not in requests[1].headers
+    assert len(parsed_bodies) == 1
+    # The new validator is kept for the next revalidation
+    assert page_cache.get_page_cache().get(URL).etag == '"v2"'
+
+
+def test_changed_body_is_parsed(upstream):
+    handlers, _ = upstream
+    handlers.append(lambda request: httpx.Response(200, content=b"civic,city", headers={"ETag": '"v1"'}))
+    handlers.append(lambda request: httpx.Response(200, content=b"corolla", headers={"ETag": '"v2"'}))
+
+    assert _fetch_twice() == [["civic", "city"], ["corolla"]]
+    assert len(parsed_bodies) == 2
+
+
+def test_cache_opens_on_first_use(monkeypatch):
+    monkeypatch.setattr(page_cache, "_page_cache", None)
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_PATH", "")
+    assert page_cache.get_page_cache() is None
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_PATH", ":memory:")
+    cache = page_cache.get_page_cache()
+    assert cache is page_cache.get_page_cache()
+    page_cache.close()
+    assert page_cache._page_cache is None
+
+
+def test_importing_the_app_opens_no_cache_file(tmp_path):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "SEEKLY_PAGE_CACHE_DB": str(tmp_path / "pages.db")}
+    subprocess.run([sys.executable, "-c", "import main, worker, providers.olx"], cwd=backend, env=env, check=True)
+    assert not (tmp_path / "pages.db").exists()
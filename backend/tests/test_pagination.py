@@ -0,0 +1,75 @@
+import base64
+
+import pytest
+
+from lib import pagination
+from lib.listing import Listing
+from lib.pagination import CursorError, CursorExpired, ResultSets, paginate, parse_fields, resume
+
+
+@pytest.fixture(autouse=True)
+def fresh_sets(monkeypatch):
+    monkeypatch.setattr(pagination, "result_sets", ResultSets(ttl=60, max_sets=4))
+
+
+def _payload(count=7):
+    items = [
+        Listing(retailer="OLX", title=f"Car {n}", price=f"Rs {n}", currency="PKR", url=f"https://www.olx.com.pk/item/{n}")
+        for n in range(count)
+    ]
+    return {"success": True, "data": items, "count": count, "cache": "miss"}
+
+
+def _walk(first, limit=None):
+    pages = [first]
+    while pages[-1]["next_cursor"]:
+        pages.append(resume(pages[-1]["next_cursor"], limit))
+    return pages
+
+
+def test_cursors_walk_every_item_once_in_order():
+    pages = _walk(paginate(_payload(), limit=3))
+    assert [page["count"] for page in pages] == [3, 3, 1]
+    assert [item.title for page in pages for item in page["data"]] == [f"Car {n}" for n in range(7)]
+    assert all(page["total"] == 7 and page["cache"] == "miss" for page in pages)
+
+
+def test_small_results_have_no_cursor():
+    page = paginate(_payload(3), limit=3)
+    assert page["next_cursor"] is None
+    assert page["total"] == 3
+
+
+def test_resume_can_change_page_size_and_project_fields():
+    first = paginate(_payload(), limit=2, fields=parse_fields("title"))
+    assert first["data"] == [{"title": "Car 0"}, {"title": "Car 1"}]
+    rest = resume(first["next_cursor"], limit=10, fields=parse_fields("title,price"))
+    assert rest["data"][0] == {"title": "Car 2", "price": "Rs 2"}
+    assert rest["count"] == 5 and rest["next_cursor"] is None
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(CursorError):
+        parse_fields("title,secret")
+
+
+@pytest.mark.parametrize("raw", ["garbage", "id:x:3", "id:-3:3", "id:3:0"])
+def test_malformed_cursors_are_rejected(raw):
+    cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    with pytest.raises(CursorError):
+        resume(cursor)
+
+
+def test_cursor_expires_with_its_result_set(monkeypatch):
+    first = paginate(_payload(), limit=3)
+    clock = pagination.time.monotonic() + 61
+    monkeypatch.setattr(pagination.time, "monotonic", lambda: clock)
+    with pytest.raises(CursorExpired):
+        resume(first["next_cursor"])
+
+
+def test_oldest_result_sets_are_dropped_beyond_the_cap():
+    cursors = [paginate(_payload(), limit=3)["next_cursor"] for _ in range(5)]
+    with pytest.raises(CursorExpired):
+        resume(cursors[0])
+    assert resume(cursors[-1])["count"] == 3
@@ -0,0 +1,26 @@
+import pytest
+
+from lib.prices import parse_price
+
+
+@pytest.mark.parametrize("price, expected", [
+    ("PKR 1,250,000", 1_250_000),
+    ("Rs 7,50,000", 750_000),
+    ("Rs 45 lakh", 4_500_000),
+    ("Rs 12.50 Lacs", 1_250_000),
+    ("1 Lac", 100_000),
+    ("Rs. 1.2 crore", 12_000_000),
+    ("2 Cr", 20_000_000),
+    ("Rs 1 arab", 1_000_000_000),
+    ("3.5 million", 3_500_000),
+    ("1.5mn", 1_500_000),
+    ("Rs 500k", 500_000),
+    (1200, 1200),
+])
+def test_display_prices_normalize_to_rupees(price, expected):
+    assert parse_price(price) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("price", [None, "", "Price not available", "Call for price"])
+def test_prices_without_an_amount_are_none(price):
+    assert parse_price(price) is None
@@ -0,0 +1,143 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from lib import http, render
+from providers import products
+from providers.products import scrape_product
+from services.products import unsupported_urls
+
+ALLOWED = [
+    "https://www.daraz.pk/products/earbuds-i123.html",
+    "https://www.olx.com.pk/item/honda-civic-iid-1",
+    "http://pakwheels.com/used-cars/honda-civic-1",
+]
+REJECTED = [
+    "http://169.254.169.254/latest/meta-data/",
+    "http://localhost:8000/admin/profiler",
+    "https://www.olx.com.pk.evil.example/item/1",
+    "https://www.olx.com.pk@127.0.0.1/item/1",
+    "file:///etc/passwd",
+    "ftp://www.daraz.pk/products/1",
+]
+
+
+def test_only_registry_product_urls_are_supported():
+    assert unsupported_urls(ALLOWED + REJECTED) == REJECTED
+
+
+def test_scrape_product_refuses_other_hosts():
+    with pytest.raises(ValueError):
+        asyncio.run(scrape_product("http://127.0.0.1:6379/"))
+
+
+def test_batch_rejects_urls_outside_the_registry():
+    import main
+
+    client = TestClient(main.app)
+    response = client.post("/products/batch", json={"urls": [ALLOWED[0], REJECTED[0]]})
+    assert response.status_code == 400
+    assert REJECTED[0] in response.json()["detail"]
+
+
+def test_hosts_past_the_cap_share_one_pool(monkeypatch):
+    monkeypatch.setattr(http, "_stats", {})
+    monkeypatch.setattr(http, "MAX_HOSTS", 2)
+    assert http.pool_key("a.example") == "a.example"
+    http._stats["a.example"] = http.HostStats()
+    http._stats["b.example"] = http.HostStats()
+    assert http.pool_key("c.example") == http.OTHER_HOSTS
+    assert http.pool_key("a.example") == "a.example"
+    assert http.pool_key("www.olx.com.pk") == "www.olx.com.pk"
+
+
+PRODUCT_HOST = "www.daraz.pk"
+PRODUCT_HTML = (
+    '<meta property="og:title" content="Earbuds">'
+    '<meta property="product:price:amount" content="2500">'
+)
+
+
+@pytest.fixture
+def product_upstream(monkeypatch):
+    """Route requests for PRODUCT_HOST to handlers set by the test, with rendering off"""
+    routes = {}
+
+    def handler(request):
+        return routes[request.url.path](request)
+
+    async def no_render(url, **kwargs):
+        raise AssertionError(f"rendered {url}")
+
+    monkeypatch.setattr(http, "UPSTREAM_OVERRIDE", None)
+    monkeypatch.setitem(http._stats, PRODUCT_HOST, http.HostStats())
+    monkeypatch.setitem(http._clients, PRODUCT_HOST, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(products, "render", no_render)
+    return routes
+
+
+def test_product_redirect_off_the_allowlist_is_refused(product_upstream):
+    product_upstream["/products/a"] = lambda request: httpx.Response(
+        302, headers={"Location": "http://169.254.169.254/latest/meta-data/"}
+    )
+    with pytest.raises(products.UnsupportedRedirect):
+        asyncio.run(scrape_product(f"https://{PRODUCT_HOST}/products/a"))
+
+
+def test_product_redirect_within_the_allowlist_is_followed(product_upstream):
+    product_upstream["/products/a"] = lambda request: httpx.Response(301, headers={"Location": "/products/b"})
+    product_upstream["/products/b"] = lambda request: httpx.Response(200, text=PRODUCT_HTML)
+    data, engine = asyncio.run(scrape_product(f"https://{PRODUCT_HOST}/products/a"))
+    assert (data["title"], data["price"], engine) == ("Earbuds", "2500", "static")
+
+
+class _Request:
+    def __init__(self, url, frame, navigation=True):
+        self.url = url
+        self.frame = frame
+        self._navigation = navigation
+
+    def is_navigation_request(self):
+        return self._navigation
+
+
+class _Route:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "abort"
+
+    async def fallback(self):
+        self.outcome = "fallback"
+
+
+class _Page:
+    main_frame = object()
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+def test_render_guard_blocks_navigation_off_the_allowlist():
+    async def run():
+        page, blocked = _Page(), []
+        await render._guard_navigation(page, products.is_product_url, blocked)
+        outcomes = []
+        for request in (
+            _Request(f"https://{PRODUCT_HOST}/products/b", page.main_frame),
+            _Request("http://127.0.0.1:6379/", page.main_frame),
+            _Request("https://ads.example/frame", object()),
+            _Request("https://cdn.example/app.js", page.main_frame, navigation=False),
+        ):
+            route = _Route(request)
+            await page.handler(route)
+            outcomes.append(route.outcome)
+        return outcomes, blocked
+
+    outcomes, blocked = asyncio.run(run())
+    assert outcomes == ["fallback", "abort", "fallback", "fallback"]
+    assert blocked == ["http://127.0.0.1:6379/"]
@@ -0,0 +1,57 @@
+import pytest
+
+from lib import rate_limit
+from lib.rate_limit import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_spaced_reservations(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert bucket._reserve() == 0
+    assert bucket._reserve() == 0
+    # Concurrent callers queue up one interval apart instead of all at once
+    assert bucket._reserve() == pytest.approx(0.5)
+    assert bucket._reserve() == pytest.approx(1.0)
+
+
+def test_tokens_refill_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    bucket._reserve()
+    bucket._reserve()
+    clock[0] += 10
+    assert bucket._reserve() == 0
+    assert bucket._reserve() == 0
+    assert bucket._reserve() > 0
+
+
+def test_penalize_halves_rate_and_honours_retry_after(clock):
+    bucket = TokenBucket(rate=4.0, burst=4)
+    bucket.penalize(retry_after=3)
+    assert bucket.rate == 2.0
+    assert bucket._reserve() == pytest.approx(3.0)
+
+
+def test_rate_has_a_floor_and_recovers(clock):
+    bucket = TokenBucket(rate=4.0, burst=4)
+    for _ in range(10):
+        bucket.penalize()
+    assert bucket.rate == pytest.approx(4.0 * rate_limit.MIN_RATE_FACTOR)
+    for _ in range(100):
+        bucket.reward()
+    assert bucket.rate == 4.0
+
+
+def test_observe_status_feeds_the_hosts_bucket(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "_buckets", {})
+    rate_limit.observe_status("example.test", 429, "2")
+    bucket = rate_limit.limiter_for("example.test")
+    assert bucket.rate == rate_limit.DEFAULT_RATE[0] / 2
+    assert bucket.blocked_until == pytest.approx(102.0)
+    rate_limit.observe_status("example.test", 200)
+    assert bucket.rate > rate_limit.DEFAULT_RATE[0] / 2
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from providers import registry
+
+
+def test_importing_the_app_loads_no_provider_module():
+    code = (
+        "import sys, main; "
+        "print(','.join(sorted(m for m in sys.modules if m.startswith(('providers.', 'PIL', 'selenium')))))"
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True, check=True).stdout
+    assert out.strip().split(",") == ["providers.registry"]
+
+
+def test_get_and_url_lookup():
+    assert registry.get("olx").label == "OLX"
+    assert registry.provider_for_url("https://www.pakwheels.com/used-cars/search/-/").name == "pakwheels"
+    assert registry.provider_for_url("https://example.com/") is None
+    with pytest.raises(KeyError):
+        registry.get("ebay")
+
+
+def test_search_url_entry_point():
+    assert registry.get("olx").load("search_url")("honda civic") == "https://www.olx.com.pk/items/q-honda-civic"
+
+
+def test_strategies_status_lists_loaded_routers_only(monkeypatch):
+    monkeypatch.delitem(sys.modules, "providers.olx", raising=False)
+    assert "olx" not in registry.strategies_status()
+    monkeypatch.undo()
+    import providers.olx  # noqa: F401
+    assert "api" in registry.strategies_status()["olx"]
@@ -0,0 +1,87 @@
+import pytest
+from selectolax.parser import HTMLParser
+
+from lib.schema import Field, Schema, SelectorError, compile_selector
+
+CARDS = """
+<ul>
+  <li class="card">
+    <a href="/item/1"><img src="/1.jpg"></a>
+    <div aria-label="Title"><h2>Honda <b>Civic</b>
+      2018</h2></div>
+    <span data-aut-id="itemPrice">Rs 4,500,000</span>
+    <div aria-label="Price"><span>Rs 4.5 Lacs</span></div>
+  </li>
+  <li class="card">
+    <span class="_2tW1I">Toyota Corolla</span>
+    <div data-aut-id="itemTitle">Corolla GLi</div>
+    <a class="x" href="/other">Other</a>
+  </li>
+  <li class="card"><p>Nothing to see</p></li>
+</ul>
+<div aria-label="Title"><h2>Outside every card</h2></div>
+"""
+
+SELECTORS = [
+    'div[aria-label="Title"] h2',
+    'div[aria-label="Title"] h2, [data-aut-id="itemTitle"], ._2tW1I',
+    'div[aria-label="Price"] span, [data-aut-id="itemPrice"]',
+    'a[href*="/item/"]',
+    "a[href^='/oth']",
+    "li img",
+    "span",
+    "h2",
+]
+
+
+def _plan(selector, attr=None):
+    return Schema(name="test", container="li.card", fields={"value": Field(selector, attr=attr)}).compile()
+
+
+@pytest.mark.parametrize("selector", SELECTORS)
+def test_plan_picks_the_node_css_first_returns(selector):
+    plan = _plan(selector, attr="data-node")
+    tree = HTMLParser(CARDS)
+    for i, node in enumerate(tree.css("*")):
+        node.attrs["data-node"] = str(i)
+    for card in plan.cards(tree):
+        expected = card.css_first(selector)
+        value = plan.extract(card)["value"]
+        assert value == (expected.attributes["data-node"] if expected else None)
+
+
+def test_alternatives_rank_in_selector_order():
+    # A later alternative earlier in the card loses to an earlier one, as with css_first
+    plan = _plan('div[data-aut-id="itemTitle"], ._2tW1I')
+    assert plan.extract_all(CARDS)[1]["value"] == "Corolla GLi"
+
+
+def test_text_keeps_word_boundaries_between_children():
+    plan = _plan('div[aria-label="Title"] h2')
+    records = plan.extract_all(CARDS)
+    assert records[0]["value"] == "Honda Civic 2018"
+
+
+def test_plan_stays_inside_the_card():
+    plan = _plan('div[aria-label="Title"] h2')
+    assert [record["value"] for record in plan.extract_all(CARDS)] == ["Honda Civic 2018", None, None]
+
+
+def test_defaults_and_post_processors():
+    schema = Schema(
+        name="test",
+        container="li.card",
+        fields={
+            "url": Field('a[href*="/item/"]', attr="href", post=lambda href: "https://example.com" + href, default="#"),
+            "title": Field("h2", default="No title"),
+        },
+        static={"retailer": "Test"},
+    )
+    records = schema.compile().extract_all(CARDS)
+    assert records[0] == {"retailer": "Test", "url": "https://example.com/item/1", "title": "Honda Civic 2018"}
+    assert records[1] == {"retailer": "Test", "url": "#", "title": "No title"}
+
+
+def test_unsupported_combinators_are_rejected():
+    with pytest.raises(SelectorError):
+        compile_selector("ul > li")
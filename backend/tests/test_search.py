@@ -0,0 +1,128 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from lib.listing import Listing
+from providers.registry import Provider
+from services import search
+
+
+def stub_provider(name, search_fn, deadline=1.0):
+    return Provider(
+        name=name,
+        label=name.title(),
+        domains=(f"{name}.example",),
+        capabilities=frozenset({"search"}),
+        cost=1,
+        entry_points={"search": f"stub:{name}"},
+        search_deadline=deadline,
+        _loaded={"search": search_fn},
+    )
+
+
+def listing(retailer, n):
+    return Listing(retailer, f"{retailer} item {n}", f"Rs {n}000", "PKR", f"https://{retailer}.example/item/{n}")
+
+
+async def fast_pages(query):
+    yield [listing("fast", 1), listing("fast", 2)]
+    yield [listing("fast", 3)]
+
+
+async def slow_pages(query):
+    yield [listing("slow", 1)]
+    await asyncio.sleep(5)
+    yield [listing("slow", 2)]
+
+
+async def broken(query):
+    raise RuntimeError("upstream said no")
+
+
+def use_providers(monkeypatch, *providers):
+    monkeypatch.setattr(search, "providers_with", lambda capability: list(providers))
+    monkeypatch.setattr(search, "ingest_later", lambda items: None)
+
+
+def test_fan_out_keeps_partial_results(monkeypatch):
+    use_providers(
+        monkeypatch,
+        stub_provider("fast", fast_pages),
+        stub_provider("slow", slow_pages, deadline=0.1),
+        stub_provider("broken", broken),
+    )
+
+    results, providers = asyncio.run(search.search_all("civic", budget=1))
+
+    assert sorted(item.url for item in results) == [
+        "https://fast.example/item/1",
+        "https://fast.example/item/2",
+        "https://fast.example/item/3",
+        "https://slow.example/item/1",
+    ]
+    assert {name: status["status"] for name, status in providers.items()} == {
+        "Fast": "ok",
+        "Slow": "timeout",
+        "Broken": "error",
+    }
+    assert providers["Fast"]["count"] == 3
+    assert providers["Slow"]["count"] == 1
+    assert providers["Broken"]["error"] == "upstream said no"
+
+
+def test_budget_cancels_providers_still_running(monkeypatch):
+    use_providers(monkeypatch, stub_provider("fast", fast_pages), stub_provider("slow", slow_pages, deadline=10))
+
+    async def run():
+        events = [event async for event in search.iter_search_all("civic", budget=0.2)]
+        await asyncio.sleep(0)
+        return events, len(asyncio.all_tasks())
+
+    events, tasks_left = asyncio.run(run())
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["count"] == 4
+    assert done["providers"]["Slow"]["status"] == "timeout"
+    assert tasks_left == 1
+
+
+def test_search_route_reports_partial_success(monkeypatch):
+    import main
+    from routers import search as search_router
+
+    async def nothing_stored(url=None, query=None):
+        return None
+
+    monkeypatch.setattr(search_router, "stored_results", nothing_stored)
+    use_providers(monkeypatch, stub_provider("fast", fast_pages), stub_provider("broken", broken))
+
+    response = TestClient(main.app).get("/search", params={"q": "civic"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["source"] == "All"
+    assert body["count"] == len(body["data"]) == 3
+    assert set(body["data"][0]) == {"retailer", "title", "price", "currency", "url", "image"}
+    assert body["providers"]["Fast"]["status"] == "ok"
+    assert body["providers"]["Broken"] == {
+        "status": "error",
+        "error": "upstream said no",
+        "count": 0,
+        "elapsed_ms": body["providers"]["Broken"]["elapsed_ms"],
+    }
+
+
+def test_search_route_fails_when_every_provider_does(monkeypatch):
+    import main
+    from routers import search as search_router
+
+    async def nothing_stored(url=None, query=None):
+        return None
+
+    monkeypatch.setattr(search_router, "stored_results", nothing_stored)
+    use_providers(monkeypatch, stub_provider("broken", broken))
+
+    body = TestClient(main.app).get("/search", params={"q": "civic"}).json()
+    assert body["success"] is False
+    assert body["count"] == 0
+    assert body["providers"]["Broken"]["status"] == "error"
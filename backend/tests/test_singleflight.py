@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from lib.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    calls = []
+
+    async def work(n):
+        calls.append(n)
+        await asyncio.sleep(0.01)
+        return n * 2
+
+    async def run():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("key", work, n) for n in range(4))), len(flights)
+
+    results, left = asyncio.run(run())
+    assert calls == [0]
+    assert results == [(0, False), (0, True), (0, True), (0, True)]
+    assert left == 0
+
+
+def test_waiters_share_the_error():
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_one_waiter_takes_over_from_a_cancelled_leader():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def run():
+        flights = SingleFlight()
+        leader = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(flights.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        async with asyncio.timeout(1):
+            return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+    assert calls == 2
+    assert sorted(results) == [(2, False), (2, True), (2, True)]
+
+
+def test_claimed_key_is_in_flight_before_the_run_starts():
+    async def run():
+        flights = SingleFlight()
+        future = flights.claim("key")
+        joined = asyncio.create_task(flights.do("key", asyncio.sleep, 0, "other"))
+        await asyncio.sleep(0)
+        assert "key" in flights
+        value = await flights.run("key", asyncio.sleep, 0, "mine", future=future)
+        return value, await joined
+
+    assert asyncio.run(run()) == ("mine", ("mine", True))
@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+
+from lib.listing import Listing
+from lib.store import ListingStore
+
+LISTINGS = [
+    Listing("OLX", "Honda Civic 2018 Oriel", "Rs 45 lakh", "PKR", "https://www.olx.com.pk/item/civic-iid-1"),
+    Listing("PakWheels", "Honda Civic 2016", "PKR 3,200,000", "PKR", "https://www.pakwheels.com/used-cars/civic-2"),
+    Listing("OLX", "Toyota Corolla GLi", "Rs. 1.1 crore", "PKR", "https://www.olx.com.pk/item/corolla-iid-3"),
+    Listing("OLX", "Civic wheel covers", "Price not available", "PKR", "https://www.olx.com.pk/item/covers-iid-4"),
+]
+
+
+def _store():
+    store = ListingStore(":memory:")
+    # One ingest per listing so first_seen orders them
+    for item in LISTINGS:
+        store.ingest([item])
+    return store
+
+
+def _titles(rows):
+    return [row["title"] for row in rows]
+
+
+def test_keywords_match_titles():
+    store = _store()
+    assert sorted(_titles(store.query(text="civic"))) == [
+        "Civic wheel covers", "Honda Civic 2016", "Honda Civic 2018 Oriel",
+    ]
+    assert _titles(store.query(text="corolla gli")) == ["Toyota Corolla GLi"]
+
+
+def test_price_range_uses_normalized_prices():
+    store = _store()
+    rows = store.query(min_price=3_000_000, max_price=5_000_000, sort="price_asc")
+    assert _titles(rows) == ["Honda Civic 2016", "Honda Civic 2018 Oriel"]
+    assert [row["price_value"] for row in rows] == [3_200_000, 4_500_000]
+
+
+def test_retailer_filter_ignores_case():
+    assert _titles(_store().query(retailer="pakwheels")) == ["Honda Civic 2016"]
+
+
+def test_sorts_keep_unpriced_listings_last():
+    store = _store()
+    assert _titles(store.query(sort="price_desc")) == [
+        "Toyota Corolla GLi", "Honda Civic 2018 Oriel", "Honda Civic 2016", "Civic wheel covers",
+    ]
+    assert _titles(store.query(sort="price_asc"))[-1] == "Civic wheel covers"
+    assert _titles(store.query(sort="newest")) == [item.title for item in reversed(LISTINGS)]
+
+
+def test_limit_and_offset_page_through_results():
+    store = _store()
+    assert _titles(store.query(sort="newest", limit=2, offset=1)) == ["Toyota Corolla GLi", "Honda Civic 2016"]
+
+
+def test_query_route(listing_store):
+    import main
+
+    for item in LISTINGS:
+        listing_store.ingest([item])
+    client = TestClient(main.app)
+
+    body = client.get("/query", params={"q": "civic", "max_price": 4_000_000}).json()
+    assert body["success"] is True
+    assert body["count"] == 1
+    assert body["data"][0]["title"] == "Honda Civic 2016"
+    assert body["data"][0]["price_value"] == 3_200_000
+
+    assert client.get("/query", params={"min_price": 5, "max_price": 1}).status_code == 422
+    assert client.get("/query", params={"sort": "cheapest"}).status_code == 422
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from lib.strategy import BlockedPage, NoHealthyMethod, StrategyRouter
+
+
+def _router():
+    return StrategyRouter("test", {"cheap": 0.1, "costly": 1.0})
+
+
+async def _batches(*batches, delay=0.0):
+    for batch in batches:
+        await asyncio.sleep(delay)
+        yield batch
+
+
+async def _failing(error):
+    raise error
+    yield  # pragma: no cover
+
+
+def _collect(router, engines, pause=0.0):
+    async def run():
+        batches = []
+        async for items in router.run(engines):
+            batches.append(items)
+            await asyncio.sleep(pause)
+        return batches
+    return asyncio.run(run())
+
+
+def test_clean_empty_result_is_final():
+    calls = []
+    router = _router()
+
+    def costly():
+        calls.append("costly")
+        return _batches(["x"])
+
+    assert _collect(router, {"cheap": lambda: _batches(), "costly": costly}) == []
+    assert calls == []
+    assert router.health("cheap").snapshot()["state"] == "closed"
+
+
+def test_errors_and_blocked_pages_fall_through():
+    for error in (RuntimeError("boom"), BlockedPage("challenge")):
+        router = _router()
+        engines = {"cheap": lambda: _failing(error), "costly": lambda: _batches(["a"], ["b"])}
+        assert _collect(router, engines) == [["a"], ["b"]]
+
+
+def test_last_error_is_raised_when_nothing_was_produced():
+    router = _router()
+    with pytest.raises(BlockedPage):
+        _collect(router, {"cheap": lambda: _failing(RuntimeError("boom")),
+                          "costly": lambda: _failing(BlockedPage("challenge"))})
+
+
+def test_open_circuits_raise_no_healthy_method():
+    router = StrategyRouter("test", {"cheap": 0.1}, min_samples=1, max_failure_rate=0.5)
+    router.record("cheap", False)
+    with pytest.raises(NoHealthyMethod):
+        _collect(router, {"cheap": lambda: _batches(["a"])})
+
+
+def test_latency_excludes_time_spent_by_the_consumer():
+    router = _router()
+    _collect(router, {"cheap": lambda: _batches(["a"], ["b"], delay=0.01)}, pause=0.1)
+    latency = router.health("cheap").latency
+    assert 0.015 < latency < 0.1
+
+
+def test_olx_challenge_page_is_blocked():
+    from bench import fixtures
+    from lib.parse_pool import unpack
+    from providers.olx import parse_olx_page
+
+    with pytest.raises(BlockedPage):
+        parse_olx_page(fixtures.load("olx_challenge.html"), "https://www.olx.com.pk/items/q-civic")
+    empty = "<html><head><title>Civic | OLX</title></head><body><ul class='_1aad128c'></ul></body></html>"
+    packed, _ = parse_olx_page(empty, "https://www.olx.com.pk/items/q-civic")
+    assert unpack(packed) == []
@@ -0,0 +1,35 @@
+from lib.structured_parser import extract_structured_data, parse_structured_data
+
+
+def test_duplicate_meta_keys_keep_the_last_value():
+    html = (
+        '<meta property="og:title" content="Placeholder">'
+        '<meta property="og:title" content="Honda Civic 2018">'
+    )
+    _, meta = extract_structured_data(html)
+    assert meta["og:title"] == "Honda Civic 2018"
+
+
+def test_quoted_gt_does_not_end_a_tag():
+    html = (
+        '<meta name="description" content="Price > 2M, mileage < 50k">'
+        "<script data-note='a > b' type=\"application/ld+json\">"
+        '{"@type": "Product", "name": "Civic", "offers": {"price": "4500000", "priceCurrency": "PKR"}}'
+        "</script>"
+    )
+    nodes, meta = extract_structured_data(html)
+    assert meta["description"] == "Price > 2M, mileage < 50k"
+    assert [node["name"] for node in nodes] == ["Civic"]
+
+
+def test_og_fallback_when_no_product_node():
+    html = (
+        '<script type="application/ld+json">{"@type": "BreadcrumbList"}</script>'
+        '<meta property="og:title" content="Corolla">'
+        '<meta property="product:price:amount" content="3900000">'
+        '<meta property="og:site_name" content="PakWheels">'
+    )
+    data = parse_structured_data(html)
+    assert data["title"] == "Corolla"
+    assert data["price"] == "3900000"
+    assert data["retailer"] == "PakWheels"
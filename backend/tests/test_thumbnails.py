@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from lib import http, thumbnails
+
+IMAGE_HOST = "images.olx.com.pk"
+
+
+@pytest.mark.parametrize("url, allowed", [
+    ("https://images.olx.com.pk/thumbnails/1-240x180.webp", True),
+    ("http://cache3.pakwheels.com/ad_pictures/1.jpg", True),
+    ("https://img.lazcdn.com/g/p/1.jpg", True),
+    ("https://olx.com.pk.evil.example/1.jpg", False),
+    ("https://evilolx.com.pk/1.jpg", False),
+    ("http://169.254.169.254/latest/meta-data/", False),
+    ("ftp://images.olx.com.pk/1.jpg", False),
+    ("file:///etc/passwd", False),
+])
+def test_is_allowed(url, allowed):
+    assert thumbnails.is_allowed(url) is allowed
+
+
+def test_img_endpoint_rejects_other_hosts():
+    import main
+
+    response = TestClient(main.app).get("/img", params={"url": "http://127.0.0.1:8000/metrics"})
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route requests for IMAGE_HOST to a handler set by the test"""
+    routes = {}
+
+    def handler(request):
+        return routes[request.url.path](request)
+
+    monkeypatch.setattr(http, "UPSTREAM_OVERRIDE", None)
+    monkeypatch.setitem(http._stats, IMAGE_HOST, http.HostStats())
+    monkeypatch.setitem(http._clients, IMAGE_HOST, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return routes
+
+
+def test_redirect_off_the_allowlist_is_not_followed(upstream):
+    upstream["/a.jpg"] = lambda request: httpx.Response(302, headers={"Location": "http://127.0.0.1/secret"})
+    with pytest.raises(thumbnails.ThumbnailError, match="redirected"):
+        asyncio.run(thumbnails._download(f"https://{IMAGE_HOST}/a.jpg"))
+
+
+def test_redirect_within_the_allowlist_is_followed(upstream):
+    upstream["/a.jpg"] = lambda request: httpx.Response(301, headers={"Location": "/b.jpg"})
+    upstream["/b.jpg"] = lambda request: httpx.Response(200, content=b"image")
+    assert asyncio.run(thumbnails._download(f"https://{IMAGE_HOST}/a.jpg")) == b"image"
+
+
+def test_oversized_body_is_cut_off_while_streaming(upstream, monkeypatch):
+    monkeypatch.setattr(thumbnails, "MAX_SOURCE_BYTES", 1000)
+
+    async def chunks():
+        for _ in range(100):
+            yield b"x" * 100
+
+    # No Content-Length, the cap has to hold while reading
+    upstream["/big.jpg"] = lambda request: httpx.Response(200, content=chunks())
+    with pytest.raises(thumbnails.ThumbnailError, match="too large"):
+        asyncio.run(thumbnails._download(f"https://{IMAGE_HOST}/big.jpg"))
+
+
+def test_cancelled_leader_releases_coalesced_waiters(monkeypatch, tmp_path):
+    monkeypatch.setattr(thumbnails, "_disk", thumbnails.DiskLRU(str(tmp_path)))
+    builds = []
+
+    async def build(url, width):
+        builds.append(url)
+        await asyncio.sleep(0.05)
+        return b"webp"
+
+    monkeypatch.setattr(thumbnails, "_build", build)
+    url = f"https://{IMAGE_HOST}/c.jpg"
+
+    async def run():
+        leader = asyncio.create_task(thumbnails.get_thumbnail(url, 240))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(thumbnails.get_thumbnail(url, 240))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        async with asyncio.timeout(1):
+            return await waiter
+
+    assert asyncio.run(run()) == (b"webp", "miss")
+    assert len(builds) == 2
+    assert len(thumbnails._flights) == 0
+
+
+def test_disk_index_is_built_off_the_event_loop(monkeypatch, tmp_path):
+    import threading
+
+    threads = []
+    DiskLRU = thumbnails.DiskLRU
+
+    def disk():
+        threads.append(threading.current_thread())
+        return DiskLRU(str(tmp_path))
+
+    monkeypatch.setattr(thumbnails, "DiskLRU", disk)
+    monkeypatch.setattr(thumbnails, "_disk", None)
+
+    async def build(url, width):
+        return b"webp"
+
+    monkeypatch.setattr(thumbnails, "_build", build)
+    result = asyncio.run(thumbnails.get_thumbnail(f"https://{IMAGE_HOST}/d.jpg", 240))
+    assert result == (b"webp", "miss")
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,51 @@
+"""Standalone scrape worker consuming the shared job queue.
+
+    cd backend
+    SEEKLY_JOB_QUEUE=redis://127.0.0.1:6379/0 python -m worker --concurrency 8
+
+Run as many as the scraping load needs, on any node that reaches Redis.
+"""
+import argparse
+import asyncio
+import signal
+
+from lib import executor, http, page_cache, parse_pool, render
+from lib.jobs import JOB_QUEUE
+from providers import registry
+from services.dynamic import job_queue, create_job_worker
+from services import listings
+
+
+async def run(concurrency: int):
+    http.init_clients()
+    if registry.WARMUP:
+        await registry.warm_up()
+    worker = create_job_worker(concurrency)
+    worker.start()
+    print(f"Worker consuming {JOB_QUEUE} with {concurrency} slots")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await stopping.wait()
+
+    # Jobs cut off here are retried elsewhere once their lease runs out
+    await worker.stop()
+    await job_queue.close()
+    await http.close_clients()
+    await render.close_browser()
+    registry.close_providers()
+    page_cache.close()
+    listings.close()
+    executor.shutdown()
+    parse_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seekly scrape worker")
+    parser.add_argument("--concurrency", type=int, default=8, help="jobs run at once (per-retailer caps still apply)")
+    args = parser.parse_args()
+    if JOB_QUEUE == "memory":
+        parser.error("SEEKLY_JOB_QUEUE must point at a shared backend, e.g. redis://127.0.0.1:6379/0")
+    asyncio.run(run(args.concurrency))